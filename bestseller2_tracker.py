@@ -20,6 +20,9 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
+from ps_store import load_page, print_wait_stats
+from history_store import is_jsonl, load_history, append_record, write_header
+
 # =============================================================================
 # 설정
 # =============================================================================
@@ -223,8 +226,7 @@ def crawl_country(driver, country):
             return None, "no_url"
 
         try:
-            driver.get(url)
-            time.sleep(3)
+            load_page(driver, url)
 
             links = driver.find_elements(By.CSS_SELECTOR, "a[href*='/concept/']")
 
@@ -286,6 +288,10 @@ def get_emoji(diff_text):
 # =============================================================================
 
 def load_history_safe():
+    # <name>.jsonl 이 있으면 JSONL 저장소에서 읽음 (history_store)
+    if is_jsonl(HISTORY_FILE):
+        return load_history(HISTORY_FILE)
+
     def _try_load(path):
         if not os.path.exists(path):
             return None
@@ -329,7 +335,16 @@ def save_history(history, schedule_meta=None):
         "history": [ ... ]
       }
     또는 schedule_meta가 None이면 기존 schedule 값을 유지합니다.
+
+    JSONL 모드(<name>.jsonl 존재)에서는 마지막 레코드만 append 하고
+    schedule은 헤더 파일에 저장합니다 (history_store). 대시보드는 JSONL 을 직접 읽습니다.
     """
+    if is_jsonl(HISTORY_FILE):
+        if history:
+            append_record(HISTORY_FILE, history[-1])
+        write_header(HISTORY_FILE, schedule=schedule_meta)
+        return
+
     if os.path.exists(HISTORY_FILE):
         shutil.copy2(HISTORY_FILE, BACKUP_FILE)
 
@@ -552,6 +567,7 @@ def main():
 
     elapsed = (time.time() - start_time) / 60
     print(f"\n⏱️  소요 시간: {elapsed:.1f}분")
+    print_wait_stats()
 
     combined_avg = calculate_avg({c: r for c, r in results.items() if c not in skipped})
 
@@ -7,6 +7,7 @@ pages/browse/{page} 에서 concept ID로 게임을 찾을 때까지 페이지를
 
 import time
 import os
+import re
 import json
 import shutil
 import requests
@@ -20,6 +21,14 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
+from ps_store import (
+    load_page, print_wait_stats, parse_backend_arg, http_session, fetch_grid_http,
+    crawl_concept_ranks, load_browse_snapshot, snapshot_pages, rank_from_pages,
+    predictive_rank, predict_start_page, print_search_stats, SEARCH_STATS,
+    CrawlScheduler, crawl_deadline,
+)
+from history_store import is_jsonl, load_history, append_record, write_header
+
 # =============================================================================
 # 설정
 # =============================================================================
@@ -190,6 +199,13 @@ def read_schedule_meta() -> dict:
 
 # 게임 미발견 시 최대 탐색 페이지 (200위까지 = 약 9페이지 x 24개)
 MAX_PAGES = 9
+# 예측 탐색: 지난 순위를 찾을 최근 레코드 수 (그 안에 순위가 없으면 1페이지부터 선형 탐색)
+RANK_LOOKBACK = 3
+# 국가별 browse 페이지 concept 수 기록 (예측 탐색의 절대 순위 계산용)
+# 1페이지부터 선형으로 센 지 PAGE_COUNTS_MAX_AGE_H 시간이 지나면 다시 선형 탐색으로 갱신
+# (앞 페이지에 product 타일이 들고 나면 받지 않은 페이지 수가 바뀌어 순위가 1~3 어긋날 수 있어 짧게 유지)
+PAGE_COUNTS_FILE = "bestseller_page_counts.json"
+PAGE_COUNTS_MAX_AGE_H = int(os.getenv("PS_PAGE_COUNTS_MAX_AGE_H", "6"))
 
 # =============================================================================
 # 드라이버
@@ -214,48 +230,126 @@ def get_browse_url(country, page=1):
         return None
     return f"https://store.playstation.com/{locale}/pages/browse/{page}"
 
-def crawl_country(driver, country):
+_CONCEPT_HREF_RE = re.compile(r"/concept/(\d+)")
+
+def _predict_first(country, load_ids, cache, last_rank, page_counts):
+    """predictive_rank 시도 + SEARCH_STATS 집계. 반환: (rank, "found") or None (→ 선형 탐색)"""
+    counts = fresh_page_counts(page_counts, country) if page_counts is not None else None
+    outcome = predictive_rank(country, load_ids, CONCEPT_ID, last_rank, counts, MAX_PAGES)
+    if outcome is None:
+        SEARCH_STATS["fallback"] += 1
+        return None
+    SEARCH_STATS["predicted"] += 1
+    SEARCH_STATS["predicted_loads"] += len(cache)
+    SEARCH_STATS["linear_loads"] += min(p for p, ids in cache.items() if ids and CONCEPT_ID in ids)
+    return outcome
+
+def crawl_country(driver, country, last_rank=None, page_counts=None):
     """
     pages/browse/{page} 에서 /concept/CONCEPT_ID 링크를 찾을 때까지 순회.
+    last_rank(지난 순위)와 page_counts 기록이 있으면 그 페이지와 이웃부터 확인 (predictive_rank),
+    순위를 확정하지 못하면 1페이지부터 선형 탐색 (이미 받은 페이지는 재사용).
+    받은 페이지의 concept 수는 page_counts 에 반영.
     반환: (rank or None, status)
       status: "found" | "not_found" | "error" | "no_url"
     """
-    total_rank = 0
-    target = f"/concept/{CONCEPT_ID}"
-
-    for page in range(1, MAX_PAGES + 1):
-        url = get_browse_url(country, page)
-        if not url:
-            return None, "no_url"
-
-        try:
-            driver.get(url)
-            time.sleep(3)
-
+    if not get_browse_url(country):
+        return None, "no_url"
+    cache = {}   # page → concept id 목록
+
+    def load_ids(page):
+        if page not in cache:
+            SEARCH_STATS["loads"] += 1
+            load_page(driver, get_browse_url(country, page))
             links = driver.find_elements(By.CSS_SELECTOR, "a[href*='/concept/']")
+            hrefs = [link.get_attribute("href") or "" for link in links]
+            cache[page] = [m.group(1) for m in map(_CONCEPT_HREF_RE.search, hrefs) if m]
+        return cache[page]
 
-            if not links:
-                print(f"    ↳ {country}: {page}p 아이템 없음 → 탐색 종료")
-                return None, "not_found"
-
-            for link in links:
-                href = link.get_attribute("href") or ""
-                if "/concept/" not in href:
-                    continue
-                total_rank += 1
-
-                if target in href:
-                    print(f"    ✅ {country}: {total_rank}위 발견 (page {page})")
-                    return total_rank, "found"
+    def load_ids_or_none(page):
+        try:
+            return load_ids(page)
+        except Exception as e:
+            print(f"    ⚠️ {country} page {page} 오류: {e}")
+            return None
 
-            print(f"    {country}: page {page} 완료 ({total_rank}위까지 확인)...")
+    outcome = _predict_first(country, load_ids_or_none, cache, last_rank, page_counts)
+    if outcome is None:
+        outcome = _scan_selenium(country, load_ids)
+    remember_page_counts(page_counts, country, cache)
+    return outcome
 
+def _scan_selenium(country, load_ids):
+    """1페이지부터 선형 탐색 (selenium)"""
+    total_rank = 0
+    for page in range(1, MAX_PAGES + 1):
+        try:
+            ids = load_ids(page)
         except Exception as e:
             print(f"    ⚠️ {country} page {page} 오류: {e}")
             if page == 1:
                 return None, "error"
             break
 
+        if not ids:
+            print(f"    ↳ {country}: {page}p 아이템 없음 → 탐색 종료")
+            return None, "not_found"
+
+        if CONCEPT_ID in ids:
+            total_rank += ids.index(CONCEPT_ID) + 1
+            print(f"    ✅ {country}: {total_rank}위 발견 (page {page})")
+            return total_rank, "found"
+        total_rank += len(ids)
+
+        print(f"    {country}: page {page} 완료 ({total_rank}위까지 확인)...")
+
+    print(f"    ↳ {country}: {MAX_PAGES}p({total_rank}위)까지 미발견")
+    return None, "not_found"
+
+def crawl_country_http(session, country, last_rank=None, page_counts=None):
+    """
+    HTTP 백엔드: pages/browse/{page} 임베디드 JSON의 concept 순서로 순위 계산.
+    탐색 순서는 crawl_country 와 같음 (지난 순위 페이지 → 선형 fallback).
+    반환: crawl_country와 동일한 (rank or None, status)
+          JSON 파싱 실패 시 None → 호출부에서 selenium으로 fallback
+    """
+    if not get_browse_url(country):
+        return None, "no_url"
+    cache = {}   # page → concept id 목록 (None = 파싱 실패)
+
+    def load_ids(page):
+        if page not in cache:
+            SEARCH_STATS["loads"] += 1
+            tiles = fetch_grid_http(get_browse_url(country, page), session)
+            cache[page] = None if tiles is None else [t["id"] for t in tiles if t["kind"] == "concept"]
+        return cache[page]
+
+    outcome = _predict_first(country, load_ids, cache, last_rank, page_counts)
+    if outcome is None:
+        outcome = _scan_http(country, load_ids)
+    remember_page_counts(page_counts, country, cache)
+    return outcome
+
+def _scan_http(country, load_ids):
+    """1페이지부터 선형 탐색 (http). 파싱 실패 시 None"""
+    total_rank = 0
+    for page in range(1, MAX_PAGES + 1):
+        ids = load_ids(page)
+        if ids is None or (page == 1 and not ids):
+            return None   # 파싱 실패 / 1페이지에 concept 없음 → selenium
+
+        if not ids:
+            print(f"    ↳ {country}: {page}p 아이템 없음 → 탐색 종료")
+            return None, "not_found"
+
+        if CONCEPT_ID in ids:
+            total_rank += ids.index(CONCEPT_ID) + 1
+            print(f"    ✅ {country}: {total_rank}위 발견 (page {page}, http)")
+            return total_rank, "found"
+        total_rank += len(ids)
+
+        print(f"    {country}: page {page} 완료 ({total_rank}위까지 확인)...")
+
     print(f"    ↳ {country}: {MAX_PAGES}p({total_rank}위)까지 미발견")
     return None, "not_found"
 
@@ -318,6 +412,10 @@ def get_emoji(diff_text):
 # =============================================================================
 
 def load_history_safe():
+    # <name>.jsonl 이 있으면 JSONL 저장소에서 읽음 (history_store)
+    if is_jsonl(HISTORY_FILE):
+        return load_history(HISTORY_FILE)
+
     def _try_load(path):
         if not os.path.exists(path):
             return None
@@ -349,6 +447,72 @@ def load_history_safe():
     print("ℹ️  히스토리 없음 → 새로 시작")
     return [], False
 
+def last_known_ranks(history, lookback=RANK_LOOKBACK):
+    """최근 lookback 개 레코드에서 국가별 가장 최근 순위 (예측 탐색 시작 페이지용)"""
+    ranks = {}
+    for entry in reversed(history[-lookback:]):
+        for country, rank in (entry.get("raw_results") or {}).items():
+            if country not in ranks and predict_start_page(rank, MAX_PAGES) is not None:
+                ranks[country] = rank
+    return ranks
+
+def load_page_counts():
+    """{국가: {"scanned": ISO 시각, "counts": {page: concept 수}}} (없거나 깨졌으면 빈 dict)"""
+    try:
+        with open(PAGE_COUNTS_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    page_counts = {}
+    for country, entry in data.items():
+        try:
+            counts = {int(p): int(n) for p, n in entry["counts"].items()}
+            page_counts[country] = {"scanned": entry.get("scanned"), "counts": counts}
+        except (AttributeError, KeyError, TypeError, ValueError):
+            continue
+    return page_counts
+
+def save_page_counts(page_counts):
+    data = {
+        c: {"scanned": e.get("scanned"), "counts": {str(p): n for p, n in sorted(e["counts"].items())}}
+        for c, e in page_counts.items()
+    }
+    try:
+        with open(PAGE_COUNTS_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"⚠️  {PAGE_COUNTS_FILE} 저장 실패: {e}")
+
+def fresh_page_counts(page_counts, country):
+    """선형으로 센 지 PAGE_COUNTS_MAX_AGE_H 이내인 국가의 {page: concept 수}, 아니면 None"""
+    entry = page_counts.get(country)
+    if not entry or not entry.get("scanned"):
+        return None
+    try:
+        scanned = datetime.fromisoformat(entry["scanned"])
+    except (TypeError, ValueError):
+        return None
+    if datetime.now(KST) - scanned > timedelta(hours=PAGE_COUNTS_MAX_AGE_H):
+        return None
+    return entry["counts"]
+
+def remember_page_counts(page_counts, country, pages):
+    """
+    이번에 받은 {page: concept id 목록} 의 개수를 기록.
+    1페이지부터 빠짐없이 받았으면(선형 탐색) scanned 시각도 갱신.
+    """
+    if page_counts is None:
+        return
+    loaded = {p: len(ids) for p, ids in pages.items() if ids}
+    if not loaded:
+        return
+    entry = page_counts.setdefault(country, {"scanned": None, "counts": {}})
+    entry["counts"].update(loaded)
+    if all(p in loaded for p in range(1, max(loaded) + 1)):
+        entry["scanned"] = datetime.now(KST).isoformat()
+
 def save_history(history, schedule_meta=None):
     """
     history 리스트를 JSON으로 저장합니다.
@@ -361,7 +525,16 @@ def save_history(history, schedule_meta=None):
         "history": [ ... ]
       }
     또는 schedule_meta가 None이면 기존 schedule 값을 유지합니다.
+
+    JSONL 모드(<name>.jsonl 존재)에서는 마지막 레코드만 append 하고
+    schedule은 헤더 파일에 저장합니다 (history_store). 대시보드는 JSONL 을 직접 읽습니다.
     """
+    if is_jsonl(HISTORY_FILE):
+        if history:
+            append_record(HISTORY_FILE, history[-1])
+        write_header(HISTORY_FILE, schedule=schedule_meta)
+        return
+
     if os.path.exists(HISTORY_FILE):
         shutil.copy2(HISTORY_FILE, BACKUP_FILE)
 
@@ -404,7 +577,8 @@ def save_baseline(combined_avg):
 # Discord 알림
 # =============================================================================
 
-def send_discord(results, combined_avg, skipped_countries, history, is_partial=False, missing_rate=0.0):
+def send_discord(results, combined_avg, skipped_countries, history, is_partial=False, missing_rate=0.0,
+                 shed=None):
     if not DISCORD_WEBHOOK:
         print("ℹ️  DISCORD_WEBHOOK 미설정, 알림 스킵")
         return
@@ -424,6 +598,8 @@ def send_discord(results, combined_avg, skipped_countries, history, is_partial=F
             return
         print(f"🔔 기준점 대비 변화 감지 (기준: {baseline_avg:.1f} → 현재: {combined_avg:.1f}, 차이: {diff:.2f}) - 알림 발송")
 
+    # 시간 예산으로 생략한 국가는 알림에서 스킵 국가처럼 취급 (순위 밖으로 떨어진 게 아님)
+    skipped_countries = set(skipped_countries) | set(shed or ())
     tracked = sum(1 for c in results if c not in skipped_countries)
     found   = sum(1 for c, r in results.items() if c not in skipped_countries and r is not None)
 
@@ -451,6 +627,8 @@ def send_discord(results, combined_avg, skipped_countries, history, is_partial=F
     desc = ""
     if is_partial:
         desc += f"⚠️ **데이터 불완전** (결측률 {missing_rate*100:.1f}%) — 평균값 참고용\n"
+    if shed:
+        desc += f"⏱️ 시간 예산 부족으로 {len(shed)}개국 생략 (가중치 낮은 순)\n"
     if combined_avg:
         desc += f"📊 **전체 가중 평균**: `{combined_avg:.1f}위`"
         if avg_diff:
@@ -553,43 +731,120 @@ def send_discord(results, combined_avg, skipped_countries, history, is_partial=F
 # =============================================================================
 
 def main():
+    backend = parse_backend_arg()
+
     print("=" * 60)
     print(f"🎮 Crimson Desert 전체 베스트셀러 순위 추적")
-    print(f"   Concept ID: {CONCEPT_ID} | 최대 {MAX_PAGES}페이지")
+    print(f"   Concept ID: {CONCEPT_ID} | 최대 {MAX_PAGES}페이지 | backend: {backend}")
     print("=" * 60)
 
     start_time = time.time()
-    driver = setup_driver()
+    session = http_session() if backend == "http" else None
+    driver = None  # selenium은 필요할 때만 기동 (http 백엔드에서 전부 성공하면 Chrome 미사용)
 
     results = {}
     skipped = set(SKIP_COUNTRIES)
+    shed = []   # 시간 예산 부족으로 생략한 국가 (status "shed", 결측률에서 제외)
+
+    # 지난 순위 + 페이지별 concept 수 기록 → 그 페이지부터 탐색 (crawl_country / crawl_country_http)
+    history, _ = load_history_safe()
+    last_ranks = last_known_ranks(history)
+    page_counts = load_page_counts()
 
     try:
         all_countries = [c for region in REGIONS.values() for c in region]
 
-        for country in all_countries:
-            if country in SKIP_COUNTRIES:
-                print(f"⏭️  스킵: {country}")
-                results[country] = None
-                continue
-
-            print(f"🔍 {country}...")
-            rank, status = crawl_country(driver, country)
-
+        # 같은 슬롯에 ps_browse_snapshot.py 가 받아둔 스냅샷이 있으면 그대로 사용
+        snapshot = load_browse_snapshot()
+        prefetched = {}
+        for c in all_countries:
+            pages = snapshot_pages(snapshot, LOCALE_MAP.get(c), MAX_PAGES)
+            if c not in SKIP_COUNTRIES and pages is not None:
+                prefetched[c] = rank_from_pages(c, pages, CONCEPT_ID, MAX_PAGES)
+                remember_page_counts(page_counts, c, {
+                    p: [t for t in tiles if t["kind"] == "concept"] for p, tiles in enumerate(pages, start=1)
+                })
+
+        # http 백엔드: 스냅샷에 없는 국가의 browse 페이지를 aiohttp로 한 번에 요청 (aiohttp 없으면 빈 dict)
+        # 예측 탐색(predictive_rank)은 스냅샷·prefetch 로 못 끝낸 국가를 1개국씩 크롤링할 때만 사용
+        # (워크플로에서는 경쟁작 트래커가 1페이지~발견 페이지 타일을 모두 쓰므로 스냅샷이 전부 받음)
+        if session is not None:
+            prefetched.update(crawl_concept_ranks({
+                c: [get_browse_url(c, p) for p in range(1, MAX_PAGES + 1)]
+                for c in all_countries
+                if c not in SKIP_COUNTRIES and c not in prefetched and LOCALE_MAP.get(c)
+            }, CONCEPT_ID))
+        if prefetched:
+            print(f"⚡ 스냅샷/비동기 크롤링 완료: {sum(1 for v in prefetched.values() if v)}/{len(prefetched)}개국 "
+                  f"({time.time() - start_time:.1f}초)")
+
+        def record(country, outcome):
+            rank, status = outcome
             if status in ("error", "no_url"):
                 print(f"    ⚠️  접근 불가 → 자동 스킵")
                 skipped.add(country)
                 results[country] = None
+            elif status == "shed":
+                shed.append(country)
+                results[country] = None
             else:
                 results[country] = rank
 
+        to_crawl = []
+        for country in all_countries:
+            if country in SKIP_COUNTRIES:
+                print(f"⏭️  스킵: {country}")
+                results[country] = None
+            elif prefetched.get(country) is not None:
+                record(country, prefetched[country])
+            else:
+                to_crawl.append(country)
+
+        # 나머지는 가중치 높은 국가부터, 시간 예산(PS_CRAWL_BUDGET_MIN)을 넘길 것 같으면 남은 국가 생략
+        scheduler = CrawlScheduler(to_crawl, MARKET_WEIGHTS, crawl_deadline(start_time))
+        for country in scheduler:
+            country_start = time.time()
+            print(f"🔍 {country}...")
+            outcome = None
+            if session is not None:
+                outcome = crawl_country_http(session, country, last_ranks.get(country), page_counts)
+            if outcome is None:
+                if session is not None:
+                    print(f"    ↳ JSON 파싱 실패 → selenium fallback")
+                try:
+                    if driver is None:
+                        driver = setup_driver()
+                    outcome = crawl_country(driver, country, last_ranks.get(country), page_counts)
+                except Exception as e:
+                    # Chrome 이 죽어도 나머지 국가는 새 드라이버로 계속 (이 국가는 "error" → 스킵, 결측 아님)
+                    print(f"    ⚠️  {country} 크롤링 중단: {e}")
+                    if driver is not None:
+                        try:
+                            driver.quit()
+                        except Exception:
+                            pass
+                    driver = None
+                    outcome = (None, "error")
+            record(country, outcome)
+            scheduler.done(time.time() - country_start)
+
+        for country in scheduler.shed:
+            record(country, (None, "shed"))
+        # 히스토리/알림의 국가 순서는 REGIONS 선언 순 그대로
+        results = {c: results[c] for c in all_countries if c in results}
+
     finally:
-        driver.quit()
+        if driver is not None:
+            driver.quit()
+        save_page_counts(page_counts)
 
     elapsed = (time.time() - start_time) / 60
     print(f"\n⏱️  소요 시간: {elapsed:.1f}분")
+    print_wait_stats()
+    print_search_stats()
 
-    active_results = {c: r for c, r in results.items() if c not in skipped}
+    # 접근 불가·크롤링 오류(skipped)와 시간 예산 생략(shed)은 실제 미발견이 아니므로 평균·결측률에서 제외
+    active_results = {c: r for c, r in results.items() if c not in skipped and c not in shed}
     combined_avg = calculate_avg(active_results)
     missing_rate = calculate_missing_rate(active_results)
     is_partial = missing_rate > PARTIAL_THRESHOLD
@@ -609,6 +864,8 @@ def main():
             flag = FLAGS.get(country, "")
             if country in skipped:
                 print(f"  {flag} {country}: 스킵")
+            elif country in shed:
+                print(f"  {flag} {country}: 생략 (시간 예산)")
             else:
                 rank = results.get(country)
                 print(f"  {flag} {country}: {rank}위" if rank else f"  {flag} {country}: 미발견")
@@ -617,7 +874,6 @@ def main():
         partial_tag = " [PARTIAL]" if is_partial else ""
         print(f"\n전체 가중 평균: {combined_avg:.1f}위{partial_tag}")
 
-    history, _ = load_history_safe()
     schedule_meta = read_schedule_meta()  # yml에서 cron 파싱
     new_entry = {
         "timestamp": datetime.now(KST).isoformat(),
@@ -625,6 +881,7 @@ def main():
         "missing_rate": round(missing_rate, 4),
         "is_partial": is_partial,
         "skipped": list(skipped),
+        "shed": shed,
         "raw_results": results
     }
 
@@ -635,7 +892,7 @@ def main():
         save_history(history, schedule_meta)
         print(f"\n✅  {HISTORY_FILE} 저장 완료 (총 {len(history)}개 레코드)")
 
-    send_discord(results, combined_avg, skipped, history, is_partial, missing_rate)
+    send_discord(results, combined_avg, skipped, history, is_partial, missing_rate, shed)
 
 if __name__ == "__main__":
     main()
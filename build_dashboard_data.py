@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+대시보드용 사전 집계 데이터 (index.html / best.html)
+트래커 히스토리 전체(수 MB)를 브라우저가 받아 다시 계산하던 것을 작은 정적 JSON 샤드로 미리 만들어 둡니다.
+
+  data/{src}.json                  : 매니페스트 (샤드 이름 → 내용 해시가 붙은 파일명, 매번 새로 받음)
+  data/{src}_latest.<hash>.json    : 최근 2개 스냅샷 + 국가별 최고/평균 순위 + 순위 유지 일수 + schedule
+  data/{src}_trend.<hash>.json     : 실행별 평균 순위 (추이 차트 / Steam 평균·최고 표시)
+  data/{src}_daily.<hash>.json     : 일별(KST) 순위 구간 분포 (1위 / 2~3위 / 4~10위 / 11위+ 국가 수)
+  data/{src}_countries.<hash>.json : 국가별 일별 순위 합계·횟수 (Top5+한국 차트, 지역별 가중평균)
+  src = ps (bestseller_history.json) / steam (steam_topseller_history.json)
+
+지역 가중평균은 합계·횟수만 있으면 대시보드의 지역 매핑/가중치로 그대로 계산되므로 따로 만들지 않음.
+대시보드는 샤드와 전체 히스토리를 동시에 요청하고, 집계 차트는 샤드로 그립니다.
+전체 히스토리는 실행별 스냅샷이 필요한 화면(스파크라인, 국가 모달, 판매량 추정, CSV)용.
+
+샤드 파일명에 내용 해시가 들어가므로 바뀐 샤드만 새로 받고 나머지는 브라우저 캐시 사용.
+이전 매니페스트가 가리키던 샤드까지는 남겨 두고(열려 있는 페이지용), 그보다 오래된 샤드는 삭제.
+
+CLI:
+  python build_dashboard_data.py          # ps + steam
+  python build_dashboard_data.py steam    # 한쪽만 (각 트래커 워크플로에서 실행)
+"""
+
+import os
+import sys
+import json
+import math
+import hashlib
+from datetime import datetime, timezone, timedelta
+
+from history_store import load_payload
+from steam_markets import TARGET_COUNTRIES, STEAM_WEIGHTS
+
+KST = timezone(timedelta(hours=9))
+
+DATA_DIR = "data"
+SOURCES = {
+    "ps":    "bestseller_history.json",
+    "steam": "steam_topseller_history.json",
+}
+HASH_LEN = 10
+NO_RANK  = 999       # 대시보드 getRank 의 '순위 밖'
+STEAM_AVG_MAX_RANK = 20   # index.html stsAvg: 20위 밖 제외 (best.html 은 제외 없음 → avg_all)
+
+
+# ======================
+# 공통 계산
+# ======================
+def day_key(ts):
+    return datetime.fromisoformat(ts).astimezone(KST).strftime("%Y-%m-%d")
+
+def js_round(value, digits=0):
+    """JS Math.round(x * 10^d) / 10^d 와 같은 반올림 (파이썬 round 는 짝수 반올림)"""
+    scale = 10 ** digits
+    return math.floor(value * scale + 0.5) / scale if digits else math.floor(value + 0.5)
+
+def weighted_avg(ranks, weights):
+    """{국가: 순위} 가중평균 (None 제외)"""
+    total_w = total = 0.0
+    for name, rank in ranks.items():
+        if rank is None:
+            continue
+        w = weights.get(name, 1.0)
+        total += rank * w
+        total_w += w
+    return total / total_w if total_w > 0 else None
+
+def days_at_rank(history, rank_of, current):
+    """
+    index.html getDaysAtRank 와 같은 계산: 최신부터 같은 순위가 이어진 스냅샷 구간의 길이(일)
+    """
+    count = 0
+    for h in reversed(history):
+        if rank_of(h) != current:
+            break
+        count += 1
+    if count < 2 or len(history) < 2:
+        return 1 if count > 0 else 0
+    first = datetime.fromisoformat(history[-count]["timestamp"])
+    last = datetime.fromisoformat(history[-1]["timestamp"])
+    diff = (last - first).total_seconds() / 86400
+    return (1 if diff > 0 else 0) if diff < 1 else round(diff)
+
+def country_sums(history, ranks_of):
+    """
+    국가별 일별 순위 합계·횟수 (순위 밖 제외).
+    평균 = sum/cnt, 지역 가중평균 = Σ(w·sum) / Σ(w·cnt) → 스냅샷 단위로 더한 것과 같은 값
+    """
+    days = {}
+    for h in history:
+        bucket = days.setdefault(day_key(h["timestamp"]), {})
+        for name, rank in ranks_of(h):
+            if rank is None or rank >= NO_RANK:
+                continue
+            s = bucket.setdefault(name, [0, 0])
+            s[0] += rank
+            s[1] += 1
+    dates = sorted(days)
+    names = sorted({name for bucket in days.values() for name in bucket})
+    return {
+        "dates": dates,
+        "sum": {n: [days[d].get(n, (0, 0))[0] for d in dates] for n in names},
+        "cnt": {n: [days[d].get(n, (0, 0))[1] for d in dates] for n in names},
+    }
+
+def rank_distribution(history, ranks_of):
+    """대시보드 '일자별 순위 분포': 날짜별 구간 국가 수의 스냅샷 평균 (반올림)"""
+    days = {}
+    for h in history:
+        e = days.setdefault(day_key(h["timestamp"]), [0, 0, 0, 0, 0])
+        for _, rank in ranks_of(h):
+            if not rank or rank >= NO_RANK:
+                continue
+            e[0 if rank == 1 else 1 if rank <= 3 else 2 if rank <= 10 else 3] += 1
+        e[4] += 1
+    dates = sorted(days)
+    dist = {key: [js_round(days[d][i] / days[d][4]) for d in dates]
+            for i, key in enumerate(("r1", "r23", "r410", "r11"))}
+    return {"dates": dates, "dist": dist}
+
+
+# ======================
+# PS Store (bestseller_history.json)
+# ======================
+def ps_rank(entry, name):
+    """index.html getRank: 에디션별 dict 면 최솟값, 없으면 999"""
+    r = entry.get("raw_results", {}).get(name)
+    if isinstance(r, dict):
+        values = [v for v in r.values() if v is not None]
+        return min(values) if values else NO_RANK
+    return NO_RANK if r is None else r
+
+def ps_ranks(entry):
+    return ((name, ps_rank(entry, name)) for name in entry.get("raw_results", {}))
+
+def build_ps(payload):
+    history = payload.get("history", [])
+    if not history:
+        return {}
+    names = list(history[-1].get("raw_results", {}))
+
+    best, avg, days = {}, {}, {}
+    for name in names:
+        ranks = [r for r in (ps_rank(h, name) for h in history) if r != NO_RANK]
+        best[name] = min(ranks) if ranks else NO_RANK
+        avg[name] = round(sum(ranks) / len(ranks), 2) if ranks else NO_RANK
+        current = ps_rank(history[-1], name)
+        days[name] = 0 if current >= NO_RANK else days_at_rank(history, lambda h: ps_rank(h, name), current)
+
+    return {
+        "latest": {
+            "schedule": payload.get("schedule"),
+            "count": len(history),
+            "first": history[0]["timestamp"],
+            "history": history[-2:],
+            "country_best": best,
+            "country_avg": avg,
+            "days_at_rank": days,
+        },
+        "trend": {
+            "t": [h["timestamp"] for h in history],
+            "avg": [(h.get("averages") or {}).get("combined") for h in history],
+            "partial": [i for i, h in enumerate(history) if h.get("is_partial")],
+        },
+        "daily": rank_distribution(history, ps_ranks),
+        "countries": country_sums(history, ps_ranks),
+    }
+
+
+# ======================
+# Steam (steam_topseller_history.json)
+# ======================
+def steam_rank(entry, name):
+    return ((entry.get("results") or {}).get(name) or {}).get("rank")
+
+def steam_ranks(entry):
+    return ((name, steam_rank(entry, name)) for name in (entry.get("results") or {}))
+
+def build_steam(payload):
+    history = payload.get("history", [])
+    if not history:
+        return {}
+    names = list(history[-1].get("results") or {})
+    weights = {name: STEAM_WEIGHTS.get(cc, 1.0) for cc, name in TARGET_COUNTRIES.items()}
+
+    def steam_avg(h, max_rank=None):
+        """index.html / best.html stsAvg (max_rank 밖 제외, 소수 1자리)"""
+        value = weighted_avg({n: r for n, r in steam_ranks(h)
+                              if r and (max_rank is None or r <= max_rank)}, weights)
+        return None if value is None else js_round(value, 1)
+
+    days = {}
+    for name in names:
+        current = steam_rank(history[-1], name)
+        days[name] = days_at_rank(history, lambda h: steam_rank(h, name), current) if current else 0
+
+    return {
+        "latest": {
+            "schedule": payload.get("schedule"),
+            "count": len(history),
+            "first": history[0]["timestamp"],
+            "history": history[-2:],
+            "days_at_rank": days,
+        },
+        "trend": {
+            "t": [h["timestamp"] for h in history],
+            "avg": [steam_avg(h, STEAM_AVG_MAX_RANK) for h in history],
+            "avg_all": [steam_avg(h) for h in history],
+        },
+        "daily": rank_distribution(history, steam_ranks),
+        "countries": country_sums(history, steam_ranks),
+    }
+
+
+BUILDERS = {"ps": build_ps, "steam": build_steam}
+
+
+# ======================
+# 샤드 쓰기
+# ======================
+def manifest_path(src):
+    return os.path.join(DATA_DIR, f"{src}.json")
+
+def read_manifest(src):
+    try:
+        with open(manifest_path(src), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_shards(src, shards):
+    """샤드들을 해시 파일명으로 쓰고 매니페스트 갱신. 반환: 새 매니페스트"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    previous = read_manifest(src)
+    files = {}
+    for name, body in shards.items():
+        text = json.dumps(body, ensure_ascii=False, separators=(",", ":"))
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:HASH_LEN]
+        filename = f"{src}_{name}.{digest}.json"
+        path = os.path.join(DATA_DIR, filename)
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        files[name] = filename
+
+    if previous.get("shards") == files:
+        return previous   # 내용 그대로 → 매니페스트도 건드리지 않음 (불필요한 git diff 방지)
+    manifest = {"generated": datetime.now(KST).isoformat(), "shards": files}
+    with open(manifest_path(src), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    keep = set(files.values()) | set((previous.get("shards") or {}).values())
+    for filename in os.listdir(DATA_DIR):
+        if filename.startswith(f"{src}_") and filename.endswith(".json") and filename not in keep:
+            os.remove(os.path.join(DATA_DIR, filename))
+    return manifest
+
+def build(src):
+    path = SOURCES[src]
+    try:
+        payload = load_payload(path)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  {src}: {path} 읽기 실패 → 스킵 ({e})")
+        return None
+    shards = BUILDERS[src](payload)
+    if not shards:
+        print(f"⚠️  {src}: 히스토리 없음 → 스킵")
+        return None
+    manifest = write_shards(src, shards)
+    sizes = ", ".join(f"{name} {os.path.getsize(os.path.join(DATA_DIR, fn)) / 1024:.1f}KB"
+                      for name, fn in manifest["shards"].items())
+    print(f"📦 {src}: {sizes}")
+    return manifest
+
+
+def main(argv):
+    targets = argv[1:] or list(SOURCES)
+    unknown = [t for t in targets if t not in SOURCES]
+    if unknown:
+        print(f"사용법: python {os.path.basename(argv[0])} [{' | '.join(SOURCES)}]")
+        return 2
+    for src in targets:
+        build(src)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
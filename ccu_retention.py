@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Steam 동접 히스토리 티어 보존 (steam_concurrent_tracker 공용)
+원본 히스토리(5분 샘플 전체)는 그대로 두고, 대시보드가 줌 단계별로 받아 갈 티어 파일을 증분 갱신합니다.
+
+  {history}.raw.json    : 최근 RAW_DAYS 일의 5분 원본 샘플   [{"timestamp", "players"}]
+  {history}.hourly.json : RAW_DAYS ~ HOURLY_DAYS 일 전의 시간별 집계
+  {history}.daily.json  : 전체 기간 일별 집계 (하루 1줄)
+  집계 행: {"ts": "YYYY-MM-DDTHH" 또는 "YYYY-MM-DD", "min", "max", "avg", "sum", "cnt"}  (KST 기준)
+
+raw 에서 밀려난 샘플은 hourly 로 접히고, HOURLY_DAYS 를 지난 시간 행은 버림 (daily 에 이미 반영됨)
+→ 추적 기간과 무관하게 raw/hourly 크기는 일정, daily 만 하루 1줄씩 증가.
+
+CLI:
+  python ccu_retention.py steam_history_crimsondesert.json   # 원본에서 티어 재생성
+"""
+
+import os
+import sys
+import json
+from datetime import datetime
+
+RAW_DAYS    = int(os.getenv("CCU_RAW_DAYS", "7"))
+HOURLY_DAYS = int(os.getenv("CCU_HOURLY_DAYS", "90"))
+TIERS = ("raw", "hourly", "daily")
+
+
+def tier_path(history_path, tier):
+    root, ext = os.path.splitext(history_path)
+    return f"{root}.{tier}{ext}"
+
+def new_tiers():
+    return {tier: {"tier": tier, "count": 0, "rows": []} for tier in TIERS}
+
+
+# ======================
+# 증분 갱신
+# ======================
+def _epoch(sample):
+    return datetime.fromisoformat(sample["timestamp"]).timestamp()
+
+def _fold(rows, key, players):
+    """key 가 마지막 행과 같으면 갱신, 아니면 새 행 (샘플은 시간순으로 들어옴)"""
+    if rows and rows[-1]["ts"] == key:
+        row = rows[-1]
+        row["min"] = min(row["min"], players)
+        row["max"] = max(row["max"], players)
+        row["sum"] += players
+        row["cnt"] += 1
+    else:
+        row = {"ts": key, "min": players, "max": players, "sum": players, "cnt": 1}
+        rows.append(row)
+    row["avg"] = round(row["sum"] / row["cnt"])
+
+def push_sample(tiers, sample):
+    """샘플 1개 반영. 기준 시각 = 샘플 시각 (원본 재생과 실시간 갱신 결과가 같음)"""
+    ts = sample["timestamp"]
+    players = sample["players"]
+    now = _epoch(sample)
+
+    tiers["daily"]["count"] += 1
+    _fold(tiers["daily"]["rows"], ts[:10], players)
+
+    raw = tiers["raw"]
+    raw["count"] += 1
+    raw["rows"].append({"timestamp": ts, "players": players})
+
+    hourly = tiers["hourly"]
+    cutoff = now - RAW_DAYS * 86400
+    expired = 0
+    while expired < len(raw["rows"]) and _epoch(raw["rows"][expired]) < cutoff:
+        old = raw["rows"][expired]
+        hourly["count"] += 1
+        _fold(hourly["rows"], old["timestamp"][:13], old["players"])
+        expired += 1
+    if expired:
+        del raw["rows"][:expired]
+
+    tz = datetime.fromisoformat(ts).tzinfo
+    hour_cutoff = datetime.fromtimestamp(now - HOURLY_DAYS * 86400, tz).strftime("%Y-%m-%dT%H")
+    drop = 0
+    while drop < len(hourly["rows"]) and hourly["rows"][drop]["ts"] < hour_cutoff:
+        drop += 1
+    if drop:
+        del hourly["rows"][:drop]
+
+def rebuild_tiers(history):
+    tiers = new_tiers()
+    for sample in history:
+        push_sample(tiers, sample)
+    return tiers
+
+
+# ======================
+# 파일 입출력
+# ======================
+def load_tiers(history_path):
+    """세 티어 모두 읽으면 dict, 하나라도 없거나 깨졌으면 None"""
+    tiers = {}
+    for tier in TIERS:
+        try:
+            with open(tier_path(history_path, tier), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("tier") != tier or not isinstance(data.get("rows"), list):
+            return None
+        tiers[tier] = data
+    return tiers
+
+def save_tiers(history_path, tiers):
+    paths = []
+    for tier in TIERS:
+        path = tier_path(history_path, tier)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(tiers[tier], f, ensure_ascii=False, separators=(",", ":"))
+        paths.append(path)
+    return paths
+
+def _load_history(history_path):
+    try:
+        with open(history_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else []
+    except (OSError, ValueError):
+        return []
+
+def update_tiers(history_path, sample, total):
+    """
+    원본에 sample 을 이어 쓴 직후 호출. total = 원본의 샘플 수 (sample 포함).
+    티어가 없거나 원본과 개수가 안 맞으면 원본 전체에서 재생성. 반환: 기록한 파일 경로들
+    """
+    tiers = load_tiers(history_path)
+    if tiers is not None and tiers["daily"]["count"] == total - 1:
+        push_sample(tiers, sample)
+    else:
+        history = _load_history(history_path)
+        print(f"  🔄 동접 티어 재생성 ({len(history)}개 샘플)")
+        tiers = rebuild_tiers(history)
+    try:
+        return save_tiers(history_path, tiers)
+    except OSError as e:
+        print(f"  ⚠️ 동접 티어 저장 실패: {e}")
+        return []
+
+
+def main(argv):
+    if len(argv) != 2:
+        print(f"사용법: python {os.path.basename(argv[0])} <history.json>")
+        return 2
+    history = _load_history(argv[1])
+    if not history:
+        print(f"❌ 히스토리 없음: {argv[1]}")
+        return 1
+    tiers = rebuild_tiers(history)
+    for path in save_tiers(argv[1], tiers):
+        print(f"💾 {path} ({os.path.getsize(path) / 1024:.1f}KB)")
+    print(f"📊 raw {len(tiers['raw']['rows'])} / hourly {len(tiers['hourly']['rows'])} / "
+          f"daily {len(tiers['daily']['rows'])}행 (원본 {len(history)}개)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
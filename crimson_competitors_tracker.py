@@ -12,6 +12,10 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
+from ps_store import (
+    load_page, print_wait_stats, parse_backend_arg, http_session, fetch_grid_http,
+)
+
 # =============================================================================
 # 설정
 # =============================================================================
@@ -156,8 +160,7 @@ def get_games_above_crimson(driver, country, url):
     # 최대 3페이지 크롤링
     for page in range(1, 4):
         try:
-            driver.get(url.replace("/1", f"/{page}"))
-            time.sleep(3)
+            load_page(driver, url.replace("/1", f"/{page}"))
             items = driver.find_elements(By.CSS_SELECTOR, "li[data-qa*='grid-item'], a[href*='/product/']")
             
             for item in items:
@@ -198,6 +201,36 @@ def get_games_above_crimson(driver, country, url):
     else:
         return [], None
 
+def get_games_above_crimson_http(session, country, url):
+    """
+    HTTP 백엔드: 카테고리 페이지 임베디드 JSON의 상품 순서로 get_games_above_crimson과 같은 결과 반환.
+    파싱 실패 시 None → 호출부에서 selenium으로 fallback
+    """
+    terms = SEARCH_TERMS.get(country, ["crimson desert"])
+    all_games = []
+    crimson_rank = None
+
+    for page in range(1, 4):
+        tiles = fetch_grid_http(url.replace("/1", f"/{page}"), session)
+        if tiles is None:
+            return None
+        if page == 1 and not any(t["kind"] == "product" for t in tiles):
+            return None  # 카테고리 1페이지에 상품이 없음 = 그리드를 잘못 읽음 → selenium
+        for tile in tiles:
+            if tile["kind"] != "product":
+                continue
+            game_name = tile["title"] or "Unknown"
+            all_games.append(game_name)
+            if any(t.lower() in game_name.lower() for t in terms):
+                crimson_rank = len(all_games)
+                break
+        if crimson_rank is not None:
+            break
+
+    if crimson_rank:
+        return all_games[:crimson_rank - 1], crimson_rank
+    return [], None
+
 def load_history():
     """과거 히스토리 로드"""
     if os.path.exists(HISTORY_FILE):
@@ -280,12 +313,16 @@ def send_discord_message(content):
         print(f"Error sending Discord message: {e}")
 
 def main():
+    backend = parse_backend_arg()
+
     print("=" * 60)
     print("🎮 Crimson Desert 경쟁 게임 추적")
+    print(f"   backend: {backend}")
     print("=" * 60)
     
     start_time = time.time()
-    driver = setup_driver()
+    session = http_session() if backend == "http" else None
+    driver = None  # selenium은 필요할 때만 기동
     
     history = load_history()
     current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S KST')
@@ -307,7 +344,14 @@ def main():
             
             print(f"  크롤링 중: {country}...")
             
-            games_above, crimson_rank = get_games_above_crimson(driver, country, url)
+            outcome = get_games_above_crimson_http(session, country, url) if session is not None else None
+            if outcome is None:
+                if session is not None:
+                    print(f"    JSON 파싱 실패 → selenium fallback")
+                if driver is None:
+                    driver = setup_driver()
+                outcome = get_games_above_crimson(driver, country, url)
+            games_above, crimson_rank = outcome
             
             if crimson_rank is None:
                 print(f"    Crimson Desert를 찾을 수 없음")
@@ -357,13 +401,15 @@ def main():
                 print(f"    ✓ 변화 감지: 신규 {len(true_new_entries)}개, 순위변동 {rank_change}")
     
     finally:
-        driver.quit()
+        if driver is not None:
+            driver.quit()
     
     # 히스토리 저장
     save_history(new_history)
     
     elapsed = (time.time() - start_time) / 60
     print(f"\n⏱️ 소요 시간: {elapsed:.1f}분")
+    print_wait_stats()
     print(f"📊 변화 감지: {len(countries_with_changes)}개국")
     
     # 디스코드 알림 (변화가 있을 때만)
@@ -5,6 +5,7 @@ import time
 import re
 import os
 import json
+import threading
 import requests
 from datetime import datetime, timezone, timedelta
 
@@ -16,6 +17,12 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
+from ps_store import (
+    load_page, is_driver_alive, print_wait_stats, parse_backend_arg, http_session, fetch_grid_http,
+    CrawlScheduler, crawl_deadline,
+)
+from history_store import is_jsonl, load_history, append_record, write_header
+
 try:
     import matplotlib
     matplotlib.use('Agg')
@@ -166,6 +173,10 @@ BASELINE_FILE   = "crimson_discord_baseline.json"  # 마지막 알림 발송 시
 HISTORY_FILE    = "rank_history.json"
 WORKFLOW_FILE   = ".github/workflows/combined_tracker.yml"  # 스케줄 소스
 
+# 병렬 크롤링: 동시에 띄울 headless Chrome 수 (워크플로 env CRAWL_WORKERS로 조정)
+CRAWL_WORKERS = max(1, int(os.getenv("CRAWL_WORKERS", "3")))
+CRAWL_RETRIES = 1  # 드라이버가 죽었을 때 국가별 재시도 횟수 (드라이버 재생성 후)
+
 
 # =============================================================================
 # 스케줄 파싱 (yml → JSON 메타 → 대시보드)
@@ -287,13 +298,18 @@ def get_active_url(country):
 # 유틸리티
 # =============================================================================
 
-def setup_driver():
+def setup_driver(driver_path=None):
+    """
+    headless Chrome 생성.
+    driver_path를 넘기면 ChromeDriverManager 다운로드를 건너뜀
+    (병렬 워커가 동시에 install()을 호출해 경합하는 것 방지).
+    """
     options = Options()
     options.add_argument('--headless=new')
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
     options.add_argument('--window-size=1920,1080')
-    service = Service(ChromeDriverManager().install())
+    service = Service(driver_path or ChromeDriverManager().install())
     return webdriver.Chrome(service=service, options=options)
 
 def crawl_country(driver, country, url):
@@ -303,8 +319,7 @@ def crawl_country(driver, country, url):
     
     for page in range(1, 4):
         try:
-            driver.get(url.replace("/1", f"/{page}"))
-            time.sleep(3)
+            load_page(driver, url.replace("/1", f"/{page}"))
             items = driver.find_elements(By.CSS_SELECTOR, "li[data-qa*='grid-item'], a[href*='/product/']")
             for item in items:
                 try:
@@ -326,6 +341,39 @@ def crawl_country(driver, country, url):
         except:
             continue
 
+    return classify_editions(found_products)
+
+def crawl_country_http(session, country, url):
+    """
+    HTTP 백엔드: 페이지의 임베디드 JSON에서 상품 순서를 읽어 crawl_country와 같은 결과 반환.
+    파싱 실패 시 None → 호출부에서 selenium으로 fallback.
+    """
+    terms = SEARCH_TERMS.get(country, ["crimson desert"])
+    found_products = []
+    total_rank = 0
+
+    for page in range(1, 4):
+        tiles = fetch_grid_http(url.replace("/1", f"/{page}"), session)
+        if tiles is None:
+            return None
+        if page == 1 and not any(t["kind"] == "product" for t in tiles):
+            return None  # 카테고리 1페이지에 상품이 없음 = 그리드를 잘못 읽음 → selenium
+        for tile in tiles:
+            if tile["kind"] != "product":
+                continue
+            total_rank += 1
+            title = (tile["title"] or "").lower()
+            if any(t.lower() in title for t in terms):
+                found_products.append({'rank': total_rank, 'href': tile["url"]})
+                if len(found_products) >= 2:
+                    break
+        if len(found_products) >= 2:
+            break
+
+    return classify_editions(found_products)
+
+def classify_editions(found_products):
+    """발견된 상품 목록({rank, href}) → {"standard": rank, "deluxe": rank}"""
     # Product ID 기반 에디션 자동 구분 (국가별 예외처리 불필요)
     DELUXE_IDS   = {"0655875232157653", "0347209645474317"}  # 글로벌 디럭스, 한국 디럭스
     STANDARD_IDS = {"0470822165475407", "0469040252458022"}  # 글로벌 스탠다드, 한국 스탠다드
@@ -345,6 +393,103 @@ def crawl_country(driver, country, url):
         res["standard"] = found_products[0]["rank"]
     return res
 
+def crawl_all_countries(countries, workers=CRAWL_WORKERS, backend="selenium", deadline=None):
+    """
+    국가 작업 큐 + headless Chrome 워커 풀로 병렬 크롤링.
+    - backend="http"이면 먼저 HTTP(임베디드 JSON)로 시도하고, 파싱 실패한 국가만 Chrome 풀로 넘김
+    - 워커마다 드라이버 1개를 띄워 큐가 빌 때까지 국가를 하나씩 가져감
+    - 크롤링 중 드라이버가 죽으면 재생성 후 CRAWL_RETRIES 만큼 재시도
+    - 큐는 MARKET_WEIGHTS 높은 국가부터 (CrawlScheduler), deadline(time.time() 기준)을
+      넘길 것 같으면 남은 국가는 시작하지 않고 생략
+    - 반환: ({country: {"standard": .., "deluxe": ..}} (순서는 countries 순서 그대로), 생략한 국가 목록)
+    """
+    empty = {"standard": None, "deluxe": None}
+    found = {}
+    shed = []
+    if deadline is None:
+        deadline = crawl_deadline(time.time())
+
+    urls = {}
+    for country in countries:
+        url = get_active_url(country)
+        if not url:
+            print(f"URL 없음: {country}")
+            continue
+        urls[country] = url
+
+    session = http_session() if backend == "http" else None
+    if session is not None:
+        fallback = []
+        http_work = CrawlScheduler(list(urls), MARKET_WEIGHTS, deadline)
+        for country in http_work:
+            country_start = time.time()
+            print(f"크롤링 중: {country}... (http)")
+            res = crawl_country_http(session, country, urls[country])
+            http_work.done(time.time() - country_start)
+            if res is not None:
+                found[country] = res
+                continue
+            print(f"    ↳ {country}: JSON 파싱 실패 → selenium fallback")
+            fallback.append(country)
+        shed.extend(http_work.shed)
+    else:
+        fallback = list(urls)
+
+    if not fallback:
+        return {c: found.get(c, dict(empty)) for c in countries}, shed
+    work = CrawlScheduler(fallback, MARKET_WEIGHTS, deadline)
+
+    lock = threading.Lock()
+    driver_path = ChromeDriverManager().install()  # 한 번만 다운로드
+
+    def worker(worker_id):
+        driver = None
+        try:
+            while True:
+                country = work.take()
+                if country is None:
+                    return
+                url = urls[country]
+                country_start = time.time()
+                res = None
+                for attempt in range(CRAWL_RETRIES + 1):
+                    try:
+                        if driver is None:
+                            driver = setup_driver(driver_path)
+                        print(f"크롤링 중: {country}... (worker {worker_id})")
+                        res = crawl_country(driver, country, url)
+                    except Exception as e:
+                        print(f"⚠️  {country} 크롤링 오류 (worker {worker_id}): {e}")
+                        res = None
+                    if res is not None and is_driver_alive(driver):
+                        break
+                    # 드라이버 비정상 → 폐기 후 재생성해서 재시도
+                    if driver is not None:
+                        try:
+                            driver.quit()
+                        except Exception:
+                            pass
+                        driver = None
+                    if attempt < CRAWL_RETRIES:
+                        print(f"🔁 {country} 재시도 ({attempt + 1}/{CRAWL_RETRIES})")
+                with lock:
+                    found[country] = res or dict(empty)
+                work.done(time.time() - country_start)
+        finally:
+            if driver is not None:
+                driver.quit()
+
+    n = max(1, min(workers, len(work.pending)))
+    print(f"🧵 워커 {n}개로 {len(work.pending)}개국 병렬 크롤링")
+    threads = [threading.Thread(target=worker, args=(i + 1,), daemon=True) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    shed.extend(work.shed)
+
+    return {c: found.get(c, dict(empty)) for c in countries}, shed
+
 def calculate_combined_rank(standard, deluxe):
     """두 에디션을 하나의 순위로 통합 (더 좋은 순위 선택)"""
     if standard and deluxe:
@@ -412,9 +557,13 @@ def load_history_safe(history_file):
     - 읽기/파싱 실패 시 .backup 파일로 자동 복구 시도
     - .backup도 실패하면 RuntimeError를 raise해 호출부에서 스크립트를 중단
     - 성공 시 (history 리스트, 복구 여부 bool) 튜플 반환
+    - <name>.jsonl 이 있으면 JSONL 저장소에서 읽음 (history_store)
     """
     import shutil
 
+    if is_jsonl(history_file):
+        return load_history(history_file)
+
     backup_file = history_file + ".backup"
 
     def _try_load(path):
@@ -483,7 +632,7 @@ def generate_csv_buffer(results):
     return BytesIO(buf.getvalue().encode("utf-8-sig"))
 
 
-def send_discord(results, combined_avg):
+def send_discord(results, combined_avg, shed=None):
     if not DISCORD_WEBHOOK:
         return
 
@@ -512,33 +661,40 @@ def send_discord(results, combined_avg):
         "averages": {"combined": combined_avg},
         "raw_results": results
     }
+    if shed:
+        new_entry["shed"] = shed   # 시간 예산 부족으로 생략한 국가 (raw_results 는 None)
     history.append(new_entry)
 
-    # 저장 전에 현재 파일을 backup으로 먼저 복사 (다음 실패 시 복구용)
-    if os.path.exists(history_file):
-        shutil.copy2(history_file, backup_file)
-
     # schedule 메타 읽기 (yml → JSON에 포함시켜 대시보드가 활용)
     schedule_meta = read_schedule_meta_from_yml(WORKFLOW_FILE)
 
-    # 기존 파일에서 schedule 유지 (메타 파싱 실패 시)
-    existing_schedule = None
-    if os.path.exists(history_file):
-        try:
-            with open(history_file, "r", encoding="utf-8") as _f:
-                _existing = json.load(_f)
-            if isinstance(_existing, dict):
-                existing_schedule = _existing.get("schedule")
-        except Exception:
-            pass
-    final_schedule = schedule_meta if schedule_meta is not None else existing_schedule
-
-    payload = {"history": history}
-    if final_schedule:
-        payload["schedule"] = final_schedule
-
-    with open(history_file, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2, ensure_ascii=False)
+    if is_jsonl(history_file):
+        # JSONL 모드: 새 레코드 1줄만 append, schedule은 헤더 파일에 (변경 시에만 씀)
+        append_record(history_file, new_entry)
+        write_header(history_file, schedule=schedule_meta)
+    else:
+        # 저장 전에 현재 파일을 backup으로 먼저 복사 (다음 실패 시 복구용)
+        if os.path.exists(history_file):
+            shutil.copy2(history_file, backup_file)
+
+        # 기존 파일에서 schedule 유지 (메타 파싱 실패 시)
+        existing_schedule = None
+        if os.path.exists(history_file):
+            try:
+                with open(history_file, "r", encoding="utf-8") as _f:
+                    _existing = json.load(_f)
+                if isinstance(_existing, dict):
+                    existing_schedule = _existing.get("schedule")
+            except Exception:
+                pass
+        final_schedule = schedule_meta if schedule_meta is not None else existing_schedule
+
+        payload = {"history": history}
+        if final_schedule:
+            payload["schedule"] = final_schedule
+
+        with open(history_file, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
 
 
     if was_recovered:
@@ -564,7 +720,7 @@ def send_discord(results, combined_avg):
 
         # 가중치 순으로 정렬
         sorted_countries = sorted(
-            [c for c in region_countries if c in results],
+            [c for c in region_countries if c in results and c not in (shed or ())],  # 생략 국가는 변동 없음으로
             key=lambda x: MARKET_WEIGHTS.get(x, 0),
             reverse=True
         )
@@ -725,8 +881,11 @@ def send_discord(results, combined_avg):
 
 
 def main():
+    backend = parse_backend_arg()
+
     print("=" * 60)
     print("🎮 Crimson Desert PS Store 순위 추적")
+    print(f"   backend: {backend}")
     print("=" * 60)
 
     if is_post_release():
@@ -737,33 +896,29 @@ def main():
     print()
 
     start_time = time.time()
-    driver = setup_driver()
 
-    results = {}
+    all_countries = []
+    for region_countries in REGIONS.values():
+        all_countries.extend(region_countries)
 
-    try:
-        all_countries = []
-        for region_countries in REGIONS.values():
-            all_countries.extend(region_countries)
-
-        for country in all_countries:
-            if country in SKIP_COUNTRIES:
-                print(f"⏭️  스킵: {country} (추적 제외 국가)")
-                results[country] = {"standard": None, "deluxe": None}
-                continue
+    crawl_targets = []
+    for country in all_countries:
+        if country in SKIP_COUNTRIES:
+            print(f"⏭️  스킵: {country} (추적 제외 국가)")
+            continue
+        crawl_targets.append(country)
+
+    # 가중치 높은 국가부터, 시간 예산(PS_CRAWL_BUDGET_MIN)을 넘길 것 같으면 남은 국가 생략
+    crawled, shed = crawl_all_countries(crawl_targets, backend=backend, deadline=crawl_deadline(start_time))
+
+    # 국가 순서(REGIONS 선언 순)를 그대로 유지 → send_discord / 히스토리 포맷 동일
+    results = {}
+    for country in all_countries:
+        results[country] = crawled.get(country) or {"standard": None, "deluxe": None}
 
-            url = get_active_url(country)
-            if url:
-                print(f"크롤링 중: {country}...")
-                results[country] = crawl_country(driver, country, url) or {"standard": None, "deluxe": None}
-            else:
-                print(f"URL 없음: {country}")
-                results[country] = {"standard": None, "deluxe": None}
-    finally:
-        driver.quit()
-    
     elapsed = (time.time() - start_time) / 60
     print(f"\n⏱️ 소요 시간: {elapsed:.1f}분")
+    print_wait_stats()
     
     # Combined 평균 계산
     combined_avg = calculate_avg(results)
@@ -779,13 +934,16 @@ def main():
             if country in results:
                 data = results[country] or {}
                 combined = calculate_combined_rank(data.get('standard'), data.get('deluxe'))
+                if country in shed:
+                    print(f"  {country}: 생략 (시간 예산)")
+                    continue
                 print(f"  {country}: S {data.get('standard', '-')}위 / D {data.get('deluxe', '-')}위 → {combined or '-'}위")
     
     if combined_avg:
         print(f"\n전체 가중 평균: {combined_avg:.1f}위")
     
     # Discord 전송
-    send_discord(results, combined_avg)
+    send_discord(results, combined_avg, shed)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+트래커 히스토리 저장소 (append-only JSONL)
+rank_history.json / bestseller_history.json 처럼 매 실행마다 전체를 다시 쓰던 파일을
+  - <name>.jsonl        : 1줄 = 실행 1회 레코드 (append 전용 → 쓰기 비용 O(1), git diff 1줄)
+  - <name>.header.json  : schedule 메타 등 헤더 (바뀔 때만 다시 씀)
+로 나눠 저장합니다. <name>.jsonl 파일이 있으면 JSONL 모드, 없으면 기존 JSON 그대로.
+JSONL 모드에서는 append 때 <name>.json 을 다시 쓰지 않습니다 (남아 있으면 전환 시점 그대로).
+대시보드(index.html 등)는 <name>.jsonl + 헤더를 직접 읽고, 파이썬 쪽은 load_payload 를 씁니다.
+그 밖에 JSON 이 꼭 필요한 소비자는 compact 로 <name>.json 을 한 번 다시 만들면 됩니다.
+
+선택적으로 국가별 순위 스냅샷을 컬럼형으로 압축한 <name>.cols.json 도 지원합니다.
+  - 국가 인덱스 표는 파일에 한 번만, 각 실행은 int16 배열(base64)로 저장
+  - load_payload 가 원래 dict 형태로 복원 (plot_rankings.parse_data 그대로 사용)
+
+영상 통계 스냅샷(youtube_history.json)용 델타 인코딩 <name>.delta.jsonl:
+  - 제목은 바뀔 때만 한 줄로, 각 실행은 영상별 정수 증분 한 줄로 append
+  - DELTA_KEYFRAME_EVERY 회마다 전체 값(keyframe) 저장
+  - load_delta 가 원래 [{"timestamp", "videos": {...}}] 리스트로 복원
+
+History(path) 는 위 저장 방식을 감싼 핸들입니다. 프로세스당 한 번 로드해 수집·그래프·알림 단계가
+함께 쓰고, append 한 레코드만 flush() 때 한 번 저장합니다.
+
+CLI:
+  python history_store.py migrate rank_history.json   # 기존 JSON → JSONL + 헤더로 전환
+  python history_store.py compact rank_history.json   # 깨진 줄 정리 + 호환용 JSON 재생성
+  python history_store.py columnar rank_history.json  # 컬럼형 <name>.cols.json 생성
+  python history_store.py delta youtube_history.json  # 델타 <name>.delta.jsonl 로 전환
+"""
+
+import os
+import sys
+import json
+import base64
+from array import array
+
+JSONL_SUFFIX  = ".jsonl"
+HEADER_SUFFIX = ".header.json"
+COLS_SUFFIX   = ".cols.json"
+DELTA_SUFFIX  = ".delta.jsonl"
+
+
+# =============================================================================
+# 경로
+# =============================================================================
+
+def _base(json_path):
+    root, ext = os.path.splitext(json_path)
+    return root if ext == ".json" else json_path
+
+def jsonl_path(json_path):
+    return _base(json_path) + JSONL_SUFFIX
+
+def header_path(json_path):
+    return _base(json_path) + HEADER_SUFFIX
+
+def cols_path(json_path):
+    return _base(json_path) + COLS_SUFFIX
+
+def delta_path(json_path):
+    return _base(json_path) + DELTA_SUFFIX
+
+def is_jsonl(json_path):
+    """JSONL 모드 여부 (<name>.jsonl 존재)"""
+    return os.path.exists(jsonl_path(json_path))
+
+
+# =============================================================================
+# 읽기
+# =============================================================================
+
+def read_records(json_path):
+    """
+    JSONL 레코드 전체 읽기.
+    중간에 죽어서 잘린 마지막 줄 등 파싱 불가한 줄은 건너뜀.
+    반환: (records, bad_line_count)
+    """
+    records, bad = [], 0
+    path = jsonl_path(json_path)
+    if not os.path.exists(path):
+        return records, bad
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                bad += 1
+    if bad:
+        print(f"⚠️  {path}: 파싱 불가 {bad}줄 건너뜀 (compact 로 정리 가능)")
+    return records, bad
+
+def read_header(json_path):
+    path = header_path(json_path)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            header = json.load(f)
+        return header if isinstance(header, dict) else {}
+    except (OSError, ValueError) as e:
+        print(f"⚠️  {path} 읽기 실패: {e}")
+        return {}
+
+def load_history(json_path):
+    """
+    load_history_safe 와 같은 계약: (history 리스트, 복구 여부 bool).
+    JSONL 모드에서는 깨진 줄을 건너뛴 경우 복구 여부 True.
+    """
+    records, bad = read_records(json_path)
+    return records, bad > 0
+
+def load_payload(json_path):
+    """
+    모드와 관계없이 {"schedule": ..., "history": [...]} 형태로 반환.
+    우선순위: JSONL → JSON → 컬럼형(<name>.cols.json). 구버전 리스트 포맷 JSON 도 처리.
+    """
+    if is_jsonl(json_path):
+        records, _ = read_records(json_path)
+        payload = {"history": records}
+        schedule = read_header(json_path).get("schedule")
+        if schedule:
+            payload["schedule"] = schedule
+        return payload
+    if not os.path.exists(json_path) and os.path.exists(cols_path(json_path)):
+        with open(cols_path(json_path), "r", encoding="utf-8") as f:
+            return decode_columnar(json.load(f))
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return {"history": data}
+    return data
+
+
+# =============================================================================
+# 쓰기
+# =============================================================================
+
+def _dumps(record):
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+def append_record(json_path, record):
+    """레코드 1개를 JSONL 끝에 추가 (파일 전체를 다시 쓰지 않음)"""
+    append_lines(jsonl_path(json_path), [record])
+
+def append_lines(path, records):
+    """JSON 레코드들을 path 끝에 한 줄씩 추가"""
+    # 이전 실행이 줄 중간에서 죽었으면 줄바꿈부터 넣어 새 레코드가 깨진 줄에 붙지 않게 함
+    prefix = ""
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                prefix = "\n"
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(prefix + "".join(_dumps(r) + "\n" for r in records))
+        f.flush()
+        os.fsync(f.fileno())
+
+def write_header(json_path, **fields):
+    """헤더 필드 갱신. 값이 그대로면 파일을 건드리지 않음 (불필요한 git diff 방지)"""
+    header = read_header(json_path)
+    updated = dict(header)
+    updated.update({k: v for k, v in fields.items() if v is not None})
+    if updated == header:
+        return
+    _atomic_write(header_path(json_path), json.dumps(updated, ensure_ascii=False, indent=2))
+
+def write_compat_json(json_path):
+    """JSONL + 헤더 → 호환용 <name>.json 재생성 (JSONL 을 못 읽는 외부 소비자용, compact 에서만 호출)"""
+    if is_jsonl(json_path):
+        _atomic_write(json_path, json.dumps(load_payload(json_path), ensure_ascii=False, indent=2))
+
+def _atomic_write(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# =============================================================================
+# 컬럼형 인코딩 (국가별 순위 스냅샷)
+# =============================================================================
+
+COLS_FORMAT   = "rank-columns/1"
+EDITIONS      = ("standard", "deluxe")
+RANK_NONE     = -1       # 값이 None (미발견)
+RANK_ABSENT   = -32768   # 그 실행의 raw_results 에 국가 키 자체가 없음
+_INT16_MAX    = 32767
+
+def _pack(values):
+    arr = array("h", values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return base64.b64encode(arr.tobytes()).decode("ascii")
+
+def _unpack(text):
+    arr = array("h")
+    arr.frombytes(base64.b64decode(text))
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+def _encode_rank(value):
+    if value is None:
+        return RANK_NONE
+    if isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= _INT16_MAX:
+        return value
+    raise ValueError(value)
+
+def _decode_rank(value):
+    return None if value == RANK_NONE else value
+
+def encode_columnar(payload):
+    """
+    {"schedule", "history"} → 컬럼형 문서.
+    raw_results 가 {국가: {"standard": int|None, "deluxe": int|None}} 형태인 실행은
+    [국가0.standard, 국가0.deluxe, 국가1.standard, ...] int16 배열로 저장.
+    그 외 형태(구버전 등)는 raw_results 원본을 그대로 보관.
+    """
+    countries, index = [], {}
+    entries = []
+    for entry in payload.get("history", []):
+        raw = entry.get("raw_results") or {}
+        rest = {k: v for k, v in entry.items() if k != "raw_results"}
+        try:
+            for c, v in raw.items():
+                if not isinstance(v, dict) or set(v) - set(EDITIONS):
+                    raise ValueError(c)
+                if c not in index:
+                    index[c] = len(countries)
+                    countries.append(c)
+            values = [RANK_ABSENT] * (len(countries) * len(EDITIONS))
+            for c, v in raw.items():
+                base = index[c] * len(EDITIONS)
+                for j, ed in enumerate(EDITIONS):
+                    values[base + j] = _encode_rank(v.get(ed))
+            rest["ranks"] = _pack(values)
+            # 국가 키 순서가 표 순서와 다르면 복원 순서를 위해 기록
+            order = [index[c] for c in raw]
+            if order != sorted(order):
+                rest["order"] = order
+        except ValueError:
+            rest["raw_results"] = raw
+        entries.append(rest)
+
+    doc = {
+        "format": COLS_FORMAT,
+        "countries": countries,
+        "editions": list(EDITIONS),
+        "sentinels": {"none": RANK_NONE, "absent": RANK_ABSENT},
+        "entries": entries,
+    }
+    if payload.get("schedule"):
+        doc["schedule"] = payload["schedule"]
+    return doc
+
+def decode_columnar(doc):
+    """컬럼형 문서 → {"schedule", "history"} (raw_results 는 원래 dict 형태로 복원)"""
+    if doc.get("format") != COLS_FORMAT:
+        raise ValueError(f"지원하지 않는 컬럼형 포맷: {doc.get('format')!r}")
+    countries = doc["countries"]
+    editions = doc.get("editions", list(EDITIONS))
+    width = len(editions)
+    history = []
+    for e in doc.get("entries", []):
+        entry = {k: v for k, v in e.items() if k not in ("ranks", "order")}
+        if "ranks" in e:
+            values = _unpack(e["ranks"])
+            n = len(values) // width
+            order = e.get("order") or range(n)
+            raw = {}
+            for i in order:
+                chunk = values[i * width:(i + 1) * width]
+                if chunk[0] == RANK_ABSENT:
+                    continue
+                raw[countries[i]] = {ed: _decode_rank(v) for ed, v in zip(editions, chunk)}
+            entry["raw_results"] = raw
+        history.append(entry)
+    payload = {"history": history}
+    if doc.get("schedule"):
+        payload["schedule"] = doc["schedule"]
+    return payload
+
+def write_columnar(json_path):
+    """현재 히스토리(JSONL/JSON) → <name>.cols.json"""
+    payload = load_payload(json_path)
+    doc = encode_columnar(payload)
+    _atomic_write(cols_path(json_path), json.dumps(doc, ensure_ascii=False, separators=(",", ":")))
+    before = len(json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8"))
+    after = os.path.getsize(cols_path(json_path))
+    print(f"✅ columnar: {len(doc['entries'])}개 레코드, {len(doc['countries'])}개국 → "
+          f"{cols_path(json_path)} ({before/1024:.0f}KB → {after/1024:.0f}KB, {before/max(after, 1):.1f}x)")
+
+
+# =============================================================================
+# 델타 인코딩 (영상 통계 스냅샷)
+# =============================================================================
+# 한 줄 = 아래 중 하나
+#   {"names": [이름, ...]}                   영상 목록(순서)이 바뀔 때만
+#   {"titles": {이름: 제목}}                  제목이 처음 나오거나 바뀐 영상만
+#   {"t": ts, "k": [[views, likes, comments] | null, ...]}     keyframe (names 순서, 전체 값)
+#   {"t": ts, "d": [[Δviews, Δlikes, Δcomments] | null, ...]}  직전 값 대비 증분
+#   {"raw": entry}                            형태가 맞지 않는 레코드는 원본 그대로
+# null 은 그 실행에서 조회 실패(None). 증분의 기준은 그 영상의 마지막 유효 값.
+
+DELTA_KEY            = "videos"
+DELTA_LABEL          = "title"
+DELTA_FIELDS         = ("views", "likes", "comments")
+DELTA_KEYFRAME_EVERY = 288   # 5분 간격 기준 하루 1회
+
+def is_delta(json_path):
+    """델타 모드 여부 (<name>.delta.jsonl 존재)"""
+    return os.path.exists(delta_path(json_path))
+
+def new_delta_state():
+    """인코딩/디코딩 진행 상태: 영상 목록, 제목 표, 영상별 마지막 값, 마지막 keyframe 이후 샘플 수"""
+    return {"names": [], "titles": {}, "last": {}, "since_keyframe": None}
+
+def _delta_values(stats):
+    """영상 통계 dict → 정수 값 리스트. 형태가 다르면 None"""
+    if set(stats) != {DELTA_LABEL, *DELTA_FIELDS}:
+        return None
+    values = [stats[f] for f in DELTA_FIELDS]
+    if not all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        return None
+    if not isinstance(stats[DELTA_LABEL], str):
+        return None
+    return values
+
+def encode_delta(entry, state, keyframe_every=DELTA_KEYFRAME_EVERY):
+    """레코드 1개 → 추가할 줄 리스트 (state 갱신)"""
+    videos = entry.get(DELTA_KEY)
+    values = {}
+    if set(entry) == {"timestamp", DELTA_KEY} and isinstance(videos, dict):
+        for name, stats in videos.items():
+            if stats is None:
+                values[name] = None
+            elif isinstance(stats, dict) and _delta_values(stats) is not None:
+                values[name] = _delta_values(stats)
+            else:
+                values = None
+                break
+    else:
+        values = None
+
+    if values is None:
+        # 이후 증분이 이 레코드를 기준으로 삼지 않도록 다음 샘플은 keyframe
+        state["last"] = {}
+        state["since_keyframe"] = None
+        return [{"raw": entry}]
+
+    lines = []
+    names = list(values)
+    if names != state["names"]:
+        state["names"] = names
+        lines.append({"names": names})
+    titles = {name: videos[name][DELTA_LABEL] for name, v in values.items()
+              if v is not None and state["titles"].get(name) != videos[name][DELTA_LABEL]}
+    if titles:
+        state["titles"].update(titles)
+        lines.append({"titles": titles})
+
+    last = state["last"]
+    keyframe = (state["since_keyframe"] is None
+                or state["since_keyframe"] + 1 >= keyframe_every
+                or any(v is not None and name not in last for name, v in values.items()))
+    if keyframe:
+        lines.append({"t": entry["timestamp"], "k": [values[name] for name in names]})
+        state["last"] = {name: v for name, v in values.items() if v is not None}
+        state["since_keyframe"] = 0
+    else:
+        deltas = []
+        for name, v in values.items():
+            if v is None:
+                deltas.append(None)
+            else:
+                deltas.append([a - b for a, b in zip(v, last[name])])
+                last[name] = v
+        lines.append({"t": entry["timestamp"], "d": deltas})
+        state["since_keyframe"] += 1
+    return lines
+
+def decode_delta(lines, state=None):
+    """
+    줄 리스트 → (레코드 리스트, state). state 는 이어서 encode_delta 에 그대로 사용 가능.
+    None(깨진 줄) 이후의 증분은 기준 값을 알 수 없으므로 다음 keyframe 까지 버림.
+    """
+    state = state or new_delta_state()
+    history = []
+    skipping = False
+    for line in lines:
+        if line is None:
+            state["last"] = {}
+            state["since_keyframe"] = None
+            skipping = True
+            continue
+        if skipping and "d" in line:
+            continue
+        if "k" in line or "raw" in line:
+            skipping = False
+        if "names" in line:
+            state["names"] = line["names"]
+            continue
+        if "titles" in line:
+            state["titles"].update(line["titles"])
+            continue
+        if "raw" in line:
+            history.append(line["raw"])
+            state["last"] = {}
+            state["since_keyframe"] = None
+            continue
+
+        if "k" in line:
+            values = dict(zip(state["names"], line["k"]))
+            state["last"] = {name: list(v) for name, v in values.items() if v is not None}
+            state["since_keyframe"] = 0
+        else:
+            values = {}
+            for name, d in zip(state["names"], line["d"]):
+                if d is None:
+                    values[name] = None
+                else:
+                    state["last"][name] = [b + x for b, x in zip(state["last"][name], d)]
+                    values[name] = state["last"][name]
+            state["since_keyframe"] += 1
+
+        videos = {}
+        for name, v in values.items():
+            if v is None:
+                videos[name] = None
+            else:
+                stats = {DELTA_LABEL: state["titles"].get(name)}
+                stats.update(zip(DELTA_FIELDS, v))
+                videos[name] = stats
+        history.append({"timestamp": line["t"], DELTA_KEY: videos})
+    return history, state
+
+def load_delta(json_path):
+    """<name>.delta.jsonl → (레코드 리스트, state). 깨진 줄은 건너뜀"""
+    lines, bad = [], 0
+    path = delta_path(json_path)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    lines.append(json.loads(line))
+                except json.JSONDecodeError:
+                    lines.append(None)
+                    bad += 1
+    if bad:
+        print(f"⚠️  {path}: 파싱 불가 {bad}줄 → 다음 keyframe 까지 건너뜀")
+    return decode_delta(lines)
+
+def migrate_delta(json_path):
+    """기존 리스트 JSON → <name>.delta.jsonl. 원본 JSON 은 남겨둠"""
+    if is_delta(json_path):
+        print(f"ℹ️  {delta_path(json_path)} 이미 존재 → 전환 스킵")
+        return
+    with open(json_path, "r", encoding="utf-8") as f:
+        history = json.load(f)
+    state = new_delta_state()
+    lines = [line for entry in history for line in encode_delta(entry, state)]
+    _atomic_write(delta_path(json_path), "".join(_dumps(r) + "\n" for r in lines))
+    restored, _ = decode_delta(lines)
+    assert restored == history, "델타 복원 결과가 원본과 다름"
+    before = os.path.getsize(json_path)
+    after = os.path.getsize(delta_path(json_path))
+    print(f"✅ {json_path} → {delta_path(json_path)} ({len(history)}개 레코드, "
+          f"{before/1024:.0f}KB → {after/1024:.0f}KB, {before/max(after, 1):.1f}x)")
+
+
+# =============================================================================
+# 공유 히스토리 핸들
+# =============================================================================
+
+class History:
+    """
+    프로세스당 한 번 로드해 여러 단계가 공유하는 히스토리 (레코드 리스트).
+    저장 방식은 파일로 결정: <name>.delta.jsonl → 델타, <name>.jsonl → JSONL, 그 외 JSON 리스트.
+      - records  : 전체 레코드 (이번 실행에서 append 한 것 포함)
+      - previous : 이번 실행 전 마지막 레코드 (증감 비교용)
+      - flush()  : 새 레코드가 있을 때만 저장 (델타/JSONL 은 append, JSON 은 한 번 다시 씀)
+    """
+
+    def __init__(self, json_path):
+        self.json_path = json_path
+        self._delta_state = None
+        if is_delta(json_path):
+            self.mode = "delta"
+            self.records, self._delta_state = load_delta(json_path)
+        elif is_jsonl(json_path):
+            self.mode = "jsonl"
+            self.records, _ = read_records(json_path)
+        else:
+            self.mode = "json"
+            self.records = self._load_json(json_path)
+        self._saved = len(self.records)
+        self.previous = self.records[-1] if self.records else None
+
+    @staticmethod
+    def _load_json(json_path):
+        if not os.path.exists(json_path):
+            return []
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  {json_path} 읽기 실패: {e}")
+            return []
+        return data if isinstance(data, list) else data.get("history", [])
+
+    @property
+    def path(self):
+        """실제로 저장되는 파일"""
+        return {"delta": delta_path, "jsonl": jsonl_path}.get(self.mode, lambda p: p)(self.json_path)
+
+    @property
+    def dirty(self):
+        return len(self.records) > self._saved
+
+    def append(self, entry):
+        self.records.append(entry)
+
+    def flush(self):
+        """새 레코드 저장. 저장했으면 True"""
+        if not self.dirty:
+            return False
+        new = self.records[self._saved:]
+        if self.mode == "delta":
+            append_lines(self.path, [line for e in new for line in encode_delta(e, self._delta_state)])
+        elif self.mode == "jsonl":
+            append_lines(self.path, new)
+        else:
+            _atomic_write(self.json_path, json.dumps(self.records, ensure_ascii=False, indent=2))
+        self._saved = len(self.records)
+        return True
+
+
+# =============================================================================
+# 전환 / 정리
+# =============================================================================
+
+def migrate(json_path):
+    """기존 JSON({"schedule", "history"} 또는 리스트) → JSONL + 헤더. 원본 JSON 은 남겨둠"""
+    if is_jsonl(json_path):
+        print(f"ℹ️  {jsonl_path(json_path)} 이미 존재 → 전환 스킵")
+        return
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    history = data.get("history", []) if isinstance(data, dict) else data
+    schedule = data.get("schedule") if isinstance(data, dict) else None
+    _atomic_write(jsonl_path(json_path), "".join(_dumps(r) + "\n" for r in history))
+    write_header(json_path, schedule=schedule)
+    print(f"✅ {json_path} → {jsonl_path(json_path)} ({len(history)}개 레코드)")
+
+def compact(json_path):
+    """
+    JSONL 다시 쓰기 (깨진 줄 제거) + 호환용 JSON 재생성.
+    append 경로에서는 JSON 을 다시 쓰지 않으므로, JSONL 을 못 읽는 외부 소비자용으로 필요할 때만 실행.
+    """
+    if not is_jsonl(json_path):
+        print(f"ℹ️  {jsonl_path(json_path)} 없음 → compact 스킵")
+        return
+    records, bad = read_records(json_path)
+    if bad:
+        _atomic_write(jsonl_path(json_path), "".join(_dumps(r) + "\n" for r in records))
+    write_compat_json(json_path)
+    print(f"✅ compact: {len(records)}개 레코드 (제거 {bad}줄) → {json_path}")
+
+
+def main(argv):
+    commands = {"migrate": migrate, "compact": compact, "columnar": write_columnar,
+                "delta": migrate_delta}
+    if len(argv) < 3 or argv[1] not in commands:
+        print(f"사용법: python {os.path.basename(argv[0])} migrate|compact|columnar|delta <history.json> ...")
+        return 2
+    for path in argv[2:]:
+        commands[argv[1]](path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
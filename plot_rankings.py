@@ -3,7 +3,8 @@
 일별 국가별 S,D 순위 그래프 생성 스크립트
 """
 import json
-import copy  # ✅ FIX: deepcopy를 위해 추가
+import hashlib
+import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from datetime import datetime, timezone, timedelta
@@ -17,10 +18,13 @@ def parse_dt(ts: str) -> datetime:
         dt = dt.replace(tzinfo=KST)
     return dt
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import requests
 from pathlib import Path
 import matplotlib.font_manager as fm
 from io import BytesIO
+from history_store import load_payload, is_jsonl
 
 # 한글 폰트 설정
 def setup_korean_font():
@@ -59,9 +63,11 @@ def setup_korean_font():
         plt.rcParams['axes.unicode_minus'] = False
 
 def load_data(filepath):
-    """JSON 데이터 로드"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """
+    히스토리 레코드 리스트 로드.
+    {"schedule", "history"} JSON / 구버전 리스트 JSON / JSONL(history_store) 모두 처리
+    """
+    return load_payload(filepath)['history']
 
 # =============================================================================
 # 공통 상수 (crimson_tracker의 MARKET_WEIGHTS와 통일)
@@ -145,6 +151,14 @@ def rank_to_daily_sales(rank):
     else:
         return _A20 * _math.exp(-_k2 * (r - 20))
 
+def rank_to_daily_sales_np(ranks):
+    """rank_to_daily_sales 벡터 버전. NaN(순위 없음) → 0"""
+    r = np.asarray(ranks, dtype=float)
+    sales = np.where(r <= 20,
+                     _A1 * np.exp(-_k1 * (r - 1)),
+                     _A20 * np.exp(-_k2 * (r - 20)))
+    return np.where(np.isnan(r), 0.0, sales)
+
 def get_multiplier(country: str) -> float:
     """국가명 → PS 시장 배율 반환"""
     return PS_MARKET_MULTIPLIER.get(country, PS_MARKET_MULTIPLIER_DEFAULT)
@@ -346,48 +360,235 @@ def calculate_current_sales(rankings):
     }
 
 
-def estimate_daily_sales(data, output_dir='output'):
-    """일별 에디션별 판매량 추산 (PS 점유율 기반 가중치)"""
-    import os as os_module
+# =============================================================================
+# 증분 파싱 캐시 (output/plot_cache.json)
+# =============================================================================
+# rank_history 는 append-only 이므로 이전 실행에서 파싱·집계한 상태를 저장해 두고
+# 새로 붙은 레코드만 반영합니다. 캐시 파일을 지우면 다음 실행에서 전부 다시 계산합니다.
+#   count / tail_hash  : 반영한 레코드 수 + 마지막 레코드 해시 (불일치 → 전체 재계산)
+#   timestamps/series  : parse_data 결과 (국가별 시계열, 날짜는 timestamps 인덱스)
+#   days               : 일자별 국가별 최고 순위 (판매량 추산용)
+#   rank_sums          : 전체 Standard/Deluxe 순위 합계·개수 (rank_gap 계산용)
+#   code_hash / charts : PNG 별 입력 지문 + PNG 해시 (같으면 다시 그리지 않음)
+
+PLOT_CACHE_FILE    = os.path.join('output', 'plot_cache.json')
+PLOT_CACHE_VERSION = 1
+EDITIONS           = ('standard', 'deluxe')
+
+def _sha1(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+def _fingerprint(obj) -> str:
+    return _sha1(json.dumps(obj, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8'))
+
+def _file_hash(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return _sha1(f.read())
+
+def _code_hash():
+    """그리는 코드가 바뀌면 차트 지문을 무효화하기 위한 이 스크립트의 해시"""
+    return _file_hash(os.path.abspath(__file__))
+
+def empty_plot_state():
+    return {
+        'version':         PLOT_CACHE_VERSION,
+        'count':           0,
+        'tail_hash':       None,
+        'first_countries': [],
+        'timestamps':      [],
+        'series':          {},
+        'days':            {},
+        'rank_sums':       {'standard': [0, 0], 'deluxe': [0, 0]},
+        'code_hash':       None,
+        'charts':          {},
+    }
+
+def load_plot_state(path=PLOT_CACHE_FILE):
+    """캐시 로드. 없거나 깨졌거나 버전이 다르면 빈 상태 (= 전체 재계산)"""
+    if not os.path.exists(path):
+        return empty_plot_state()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f'⚠️  {path} 읽기 실패 → 전체 재계산: {e}')
+        return empty_plot_state()
+    if not isinstance(state, dict) or state.get('version') != PLOT_CACHE_VERSION:
+        return empty_plot_state()
+    return state
+
+def save_plot_state(state, path=PLOT_CACHE_FILE):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, path)
+
+def _record_hash(entry):
+    return _fingerprint(entry)
+
+def update_plot_state(state, data):
+    """
+    data[state['count']:] 만 state 에 반영하고 새로 반영한 레코드 수를 반환.
+    히스토리가 줄었거나 마지막으로 반영한 레코드가 바뀌었으면(재작성) 처음부터 다시 계산.
+    """
+    count = state['count']
+    if count > len(data) or (count and _record_hash(data[count - 1]) != state['tail_hash']):
+        print('ℹ️  히스토리가 캐시와 다름 → 전체 재계산')
+        state.clear()
+        state.update(empty_plot_state())
+        count = 0
+
+    if count == 0 and data:
+        state['first_countries'] = list(data[0]['raw_results'].keys())
+
+    # 새 레코드의 (레코드, 국가) 순위를 희소 형태로 모아 일자별 최소값을 한 번에 계산
+    day_keys, day_pos = [], {}
+    columns = {}
+    cells_day, cells_col, cells_rank = [], [], []
+    for entry in data[count:]:
+        ts = entry['timestamp']
+        idx = len(state['timestamps'])
+        state['timestamps'].append(ts)
+        date_str = parse_dt(ts).strftime('%Y-%m-%d')
+        if date_str not in day_pos:
+            day_pos[date_str] = len(day_keys)
+            day_keys.append((date_str, ts))
+        d = day_pos[date_str]
+
+        for country, ranks in entry['raw_results'].items():
+            std, dlx = ranks['standard'], ranks['deluxe']
+            series = state['series'].setdefault(country, {'idx': [], 'standard': [], 'deluxe': []})
+            series['idx'].append(idx)
+            series['standard'].append(std)
+            series['deluxe'].append(dlx)
+
+            cells_day.append(d)
+            cells_col.append(columns.setdefault(country, len(columns)))
+            cells_rank.append((np.nan if std is None else std,
+                               np.nan if dlx is None else dlx))
+
+    if cells_day:
+        ranks = np.array(cells_rank, dtype=float)
+        sums = state['rank_sums']
+        for j, edition in enumerate(EDITIONS):
+            valid = ranks[:, j][~np.isnan(ranks[:, j])]
+            sums[edition][0] += int(valid.sum())
+            sums[edition][1] += int(valid.size)
+
+        best, present = day_best_ranks(np.array(cells_day), np.array(cells_col), ranks,
+                                       len(day_keys), len(columns))
+        countries = list(columns)
+        for d, (date_str, ts) in enumerate(day_keys):
+            day = state['days'].setdefault(date_str, {'ts': ts, 'best': {}})
+            for c in np.flatnonzero(present[d]):
+                cur = day['best'].setdefault(countries[c], [None, None])
+                for j in range(len(EDITIONS)):
+                    rank = best[d, c, j]
+                    if not np.isnan(rank) and (cur[j] is None or rank < cur[j]):
+                        cur[j] = int(rank)
+
+    state['count'] = len(data)
+    state['tail_hash'] = _record_hash(data[-1]) if data else None
+    return len(data) - count
+
+def day_best_ranks(day_idx, cols, ranks, n_days, n_cols):
+    """
+    (레코드, 국가) 순위를 일자별 최소값으로 축약 (groupby-day min).
+    입력은 희소 형태: 셀마다 일자 인덱스, 국가 열, [std, dlx] (없으면 NaN).
+    반환: best[n_days, n_cols, 2] (NaN = 그날 순위 없음), present[n_days, n_cols]
+    """
+    best = np.full((n_days, n_cols, len(EDITIONS)), np.nan)
+    for j in range(len(EDITIONS)):
+        plane = best[:, :, j]
+        np.fmin.at(plane, (day_idx, cols), ranks[:, j])  # fmin: NaN 무시
+    present = np.zeros((n_days, n_cols), dtype=bool)
+    present[day_idx, cols] = True
+    return best, present
+
+def country_data_from_state(state):
+    """캐시 상태 → parse_data 와 같은 (country_data, dates)"""
+    stamps = [parse_dt(ts) for ts in state['timestamps']]
+    country_data = {}
+    for country in sorted(state['series']):
+        series = state['series'][country]
+        country_data[country] = {
+            'dates':    [stamps[i] for i in series['idx']],
+            'standard': list(series['standard']),
+            'deluxe':   list(series['deluxe']),
+        }
+    return country_data, sorted(stamps)
+
+def chart_is_stale(state, filename, fingerprint, output_dir='output'):
+    """입력 지문이 바뀌었거나, PNG 가 없거나, 마지막으로 그린 PNG 와 다르면 True"""
+    cached = state['charts'].get(filename)
+    if not cached or cached[0] != fingerprint:
+        return True
+    return _file_hash(os.path.join(output_dir, filename)) != cached[1]
+
+def mark_chart_rendered(state, filename, fingerprint, output_dir='output'):
+    state['charts'][filename] = [fingerprint, _file_hash(os.path.join(output_dir, filename))]
+
+def series_fingerprint(data):
+    """국가별 시계열 지문. 시계열은 append-only(앞부분은 tail_hash 로 검증)라 길이 + 마지막 값이면 충분"""
+    if not data['dates']:
+        return None
+    return _fingerprint([len(data['dates']), data['dates'][-1].isoformat(),
+                         data['standard'][-1], data['deluxe'][-1]])
+
+def country_png_name(country):
+    safe_country = country.replace('/', '_').replace('\\', '_')
+    return f'{safe_country}_ranking.png'
 
-    # ✅ FIX: 원본 data를 건드리지 않도록 deepcopy 사용
-    # 기존 data.copy()는 얕은 복사(shallow copy)라 내부 딕셔너리가
-    # 같은 참조를 공유 → is_historical 플래그 추가 시 원본이 오염되어
-    # rank_history.json이 변경된 것으로 감지 → git rebase 에러 발생
-    sales_data_raw = copy.deepcopy(data)
 
+# =============================================================================
+# 판매량 추산
+# =============================================================================
+
+def _merge_day(groups, date_str, ts, is_historical, best):
+    """일자 그룹에 국가별 최고 순위 병합 (대표 timestamp 는 먼저 들어온 쪽)"""
+    group = groups.get(date_str)
+    if group is None:
+        groups[date_str] = {
+            'ts': ts,
+            'is_historical': is_historical,
+            'best': {c: list(r) for c, r in best.items()},
+        }
+        return
+    group['is_historical'] = group['is_historical'] and is_historical
+    for country, ranks in best.items():
+        cur = group['best'].setdefault(country, [None, None])
+        for j, rank in enumerate(ranks):
+            if rank is not None and (cur[j] is None or rank < cur[j]):
+                cur[j] = rank
+
+def compute_daily_sales(state):
+    """
+    일별 에디션별 판매량 추산 (PS 점유율 기반 가중치).
+    update_plot_state 로 집계된 일자별 최고 순위 + historical_ranking_data.json 사용.
+    원본 히스토리를 복사·수정하지 않음 (is_historical 플래그는 일자 그룹에만 둠)
+    """
     historical_file = 'historical_ranking_data.json'
-    sales_data = sales_data_raw
+    groups: dict = {}
 
-    if os_module.path.exists(historical_file):
+    if os.path.exists(historical_file):
         with open(historical_file, 'r', encoding='utf-8') as f:
             historical_data = json.load(f)
-        
+
         print(f'📜 Loaded {len(historical_data)} historical ranking points for sales estimation')
-        
-        std_ranks = []
-        dlx_ranks = []
-        
-        for entry in data:
-            for country, ranks in entry['raw_results'].items():
-                if ranks['standard'] is not None:
-                    std_ranks.append(ranks['standard'])
-                if ranks['deluxe'] is not None:
-                    dlx_ranks.append(ranks['deluxe'])
-        
-        avg_std = sum(std_ranks) / len(std_ranks) if std_ranks else 15
-        avg_dlx = sum(dlx_ranks) / len(dlx_ranks) if dlx_ranks else 8
+
+        std_sum, std_n = state['rank_sums']['standard']
+        dlx_sum, dlx_n = state['rank_sums']['deluxe']
+        avg_std = std_sum / std_n if std_n else 15
+        avg_dlx = dlx_sum / dlx_n if dlx_n else 8
         rank_gap = avg_std - avg_dlx
-        
+
         print(f'   Average rank gap (Std - Dlx): {rank_gap:.1f}')
-        
-        historical_entries = []
-        
-        if data:
-            countries = list(data[0]['raw_results'].keys())
-        else:
-            countries = ['미국', '일본', '영국', '독일', '프랑스', '한국']
-        
+
+        countries = state['first_countries'] or ['미국', '일본', '영국', '독일', '프랑스', '한국']
+
         for item in historical_data:
             date_str  = item['date']
             country_ranks = item.get('country_ranks', {})
@@ -403,92 +604,70 @@ def estimate_daily_sales(data, output_dir='output'):
             else:
                 weighted_avg_rank = item.get('average_rank', 15)
 
-            raw_results = {}
+            best = {}
             for country in countries:
                 if country in country_ranks and country_ranks[country] is not None:
                     base = country_ranks[country]
                 else:
                     base = weighted_avg_rank
-                std_r = max(1, int(base + rank_gap / 2))
-                dlx_r = max(1, int(base - rank_gap / 2))
-                raw_results[country] = {
-                    'standard': std_r,
-                    'deluxe':   dlx_r
-                }
+                best[country] = [max(1, int(base + rank_gap / 2)),
+                                 max(1, int(base - rank_gap / 2))]
 
-            historical_entries.append({
-                'timestamp': f'{date_str}T08:00:00',
-                'raw_results': raw_results,
-                'is_historical': True  # ✅ FIX: 새로 만드는 객체에 직접 플래그 설정
-            })
-        
-        # ✅ FIX: deepcopy된 sales_data_raw에만 플래그 추가 (원본 data는 절대 수정 안 함)
-        for e in sales_data_raw:
-            e['is_historical'] = False
+            ts = f'{date_str}T08:00:00'
+            _merge_day(groups, parse_dt(ts).strftime('%Y-%m-%d'), ts, True, best)
 
-        sales_data = historical_entries + sales_data_raw
-        print(f'   Total data points for sales estimation: {len(sales_data)}')
-    else:
-        # historical 파일이 없는 경우에도 deepcopy 본에 플래그 추가
-        for e in sales_data_raw:
-            e['is_historical'] = False
-        sales_data = sales_data_raw
+        print(f'   Total data points for sales estimation: {len(historical_data) + state["count"]}')
 
-    os.makedirs(output_dir, exist_ok=True)
+    for date_str, day in state['days'].items():
+        _merge_day(groups, date_str, day['ts'], False, day['best'])
 
-    # 날짜별 그룹화 → 국가별 최고 순위 → 판매량 계산
-    daily_sales: list = []
-    date_groups: dict = {}
-
-    for entry in sales_data:
-        timestamp = parse_dt(entry["timestamp"])
-        date_str  = timestamp.strftime('%Y-%m-%d')
-        date_groups.setdefault(date_str, []).append({
-            'timestamp':     timestamp,
-            'raw_results':   entry['raw_results'],
-            'is_historical': entry.get('is_historical', False)
-        })
+    # 일자 × 국가 최고 순위 행렬 → 판매량 (순위 없음 = NaN → 0)
+    day_keys = sorted(groups.keys())
+    countries = sorted({c for g in groups.values() for c in g['best']})
+    col = {c: i for i, c in enumerate(countries)}
+    best = np.full((len(day_keys), len(countries), len(EDITIONS)), np.nan)
+    for i, date_str in enumerate(day_keys):
+        for country, ranks in groups[date_str]['best'].items():
+            for j, rank in enumerate(ranks):
+                if rank is not None:
+                    best[i, col[country], j] = rank
 
-    for date_str in sorted(date_groups.keys()):
-        entries = date_groups[date_str]
-        representative_timestamp = entries[0]['timestamp']
-        is_historical = all(e['is_historical'] for e in entries)
-
-        all_countries: set = set()
-        for e in entries:
-            all_countries.update(e['raw_results'].keys())
-
-        best_ranks: dict = {}
-        for country in all_countries:
-            best_std, best_dlx = None, None
-            for e in entries:
-                if country in e['raw_results']:
-                    s = e['raw_results'][country]['standard']
-                    d = e['raw_results'][country]['deluxe']
-                    if s is not None and (best_std is None or s < best_std):
-                        best_std = s
-                    if d is not None and (best_dlx is None or d < best_dlx):
-                        best_dlx = d
-            best_ranks[country] = {'standard': best_std, 'deluxe': best_dlx}
-
-        std_sales = 0.0
-        dlx_sales = 0.0
-        for country, ranks in best_ranks.items():
-            m = get_multiplier(country)
-            if ranks['standard'] is not None:
-                std_sales += rank_to_daily_sales(ranks['standard']) * m
-            if ranks['deluxe'] is not None:
-                dlx_sales += rank_to_daily_sales(ranks['deluxe']) * m
+    multipliers = np.array([get_multiplier(c) for c in countries], dtype=float)
+    sales = (rank_to_daily_sales_np(best) * multipliers[None, :, None]).sum(axis=1)
 
+    daily_sales: list = []
+    for i, date_str in enumerate(day_keys):
+        group = groups[date_str]
+        std_sales, dlx_sales = float(sales[i, 0]), float(sales[i, 1])
         daily_sales.append({
-            'date':          representative_timestamp,
+            'date':          parse_dt(group['ts']),
             'date_str':      date_str,
             'standard':      round(std_sales, 2),
             'deluxe':        round(dlx_sales, 2),
             'total':         round(std_sales + dlx_sales, 2),
-            'is_historical': is_historical
+            'is_historical': group['is_historical']
         })
-    
+
+    return daily_sales
+
+def sales_fingerprint(daily_sales):
+    return _fingerprint([[d['date_str'], d['standard'], d['deluxe'], d['is_historical']]
+                         for d in daily_sales])
+
+def estimate_daily_sales(data, output_dir='output', state=None):
+    """일별 에디션별 판매량 추산 + 표/차트 생성. state 를 주면 캐시된 집계를 사용"""
+    if state is None:
+        state = empty_plot_state()
+        update_plot_state(state, data)
+    daily_sales = compute_daily_sales(state)
+    sales_table_path = plot_sales_table(daily_sales, output_dir)
+    sales_chart_path = plot_sales_chart(daily_sales, output_dir)
+    return sales_table_path, sales_chart_path, daily_sales
+
+def plot_sales_table(daily_sales, output_dir='output'):
+    """일별 판매량 추산 표 (daily_sales_estimate.png)"""
+    os.makedirs(output_dir, exist_ok=True)
+
     # 표 데이터 생성
     table_data = []
     for item in daily_sales:
@@ -561,6 +740,12 @@ def estimate_daily_sales(data, output_dir='output'):
     
     print(f'✓ Generated: daily_sales_estimate.png')
     
+    return sales_table_path
+
+def plot_sales_chart(daily_sales, output_dir='output'):
+    """일별/누적 판매량 차트 (daily_sales_chart.png)"""
+    os.makedirs(output_dir, exist_ok=True)
+
     # 히스토리 / 실제 구간 분리
     hist_items = [item for item in daily_sales if     item['is_historical']]
     real_items = [item for item in daily_sales if not item['is_historical']]
@@ -586,13 +771,9 @@ def estimate_daily_sales(data, output_dir='output'):
 
     # 누적 계산 (전체 순서 유지)
     all_dates = [it['date'] for it in daily_sales]
-    cumulative_std   = []
-    cumulative_dlx   = []
-    cumulative_total = []
-    for i in range(len(daily_sales)):
-        cumulative_std.append(sum(it['standard'] for it in daily_sales[:i+1]))
-        cumulative_dlx.append(sum(it['deluxe']   for it in daily_sales[:i+1]))
-        cumulative_total.append(sum(it['total']  for it in daily_sales[:i+1]))
+    cumulative_std   = np.cumsum([it['standard'] for it in daily_sales]).tolist()
+    cumulative_dlx   = np.cumsum([it['deluxe']   for it in daily_sales]).tolist()
+    cumulative_total = np.cumsum([it['total']    for it in daily_sales]).tolist()
 
     # ✅ FIX: 누적 구간 분리 — len(hist_items) 인덱스 슬라이싱 대신
     # daily_sales의 is_historical 플래그 기준으로 직접 분리
@@ -823,15 +1004,17 @@ def estimate_daily_sales(data, output_dir='output'):
     
     print(f'✓ Generated: daily_sales_chart.png')
     
-    return sales_table_path, sales_chart_path, daily_sales
+    return sales_chart_path
 
-def plot_country_rankings(country_data, output_dir='output'):
-    """각 국가별 S,D 순위 그래프 생성"""
+def plot_country_rankings(country_data, output_dir='output', countries=None):
+    """각 국가별 S,D 순위 그래프 생성 (countries 를 주면 해당 국가만)"""
     os.makedirs(output_dir, exist_ok=True)
     
     for country, data in country_data.items():
         if not data['dates']:
             continue
+        if countries is not None and country not in countries:
+            continue
             
         fig, ax = plt.subplots(figsize=(14, 7))
         
@@ -851,11 +1034,11 @@ def plot_country_rankings(country_data, output_dir='output'):
         
         plt.tight_layout()
         
-        safe_country = country.replace('/', '_').replace('\\', '_')
-        plt.savefig(f'{output_dir}/{safe_country}_ranking.png', dpi=150, bbox_inches='tight')
+        png_name = country_png_name(country)
+        plt.savefig(f'{output_dir}/{png_name}', dpi=150, bbox_inches='tight')
         plt.close()
         
-        print(f'✓ Generated: {safe_country}_ranking.png')
+        print(f'✓ Generated: {png_name}')
 
 def plot_all_countries_standard(country_data, output_dir='output'):
     """모든 국가의 Standard 순위를 하나의 그래프에"""
@@ -1073,6 +1256,47 @@ def plot_top_countries(country_data, countries_to_plot, output_dir='output'):
     
     print(f'✓ Generated: top_countries_rankings.png')
 
+# =============================================================================
+# 병렬 렌더링
+# =============================================================================
+
+PLOT_WORKERS = max(1, int(os.getenv('PLOT_WORKERS', str(os.cpu_count() or 1))))
+
+def _init_render_worker():
+    """렌더링 워커 초기화: Agg 백엔드 + 한글 폰트 설정 (워커당 1회)"""
+    plt.switch_backend('Agg')
+    setup_korean_font()
+
+def render_charts(jobs, workers=PLOT_WORKERS):
+    """
+    서로 독립적인 차트들을 ProcessPoolExecutor 로 나눠 그림. 반환: 성공한 PNG 파일명 리스트.
+    각 작업은 자기 PNG 하나만 쓰고 워커마다 같은 폰트 설정을 쓰므로, 실행 순서와 무관하게 결과가 같음.
+    워커 1개 이하이거나 작업이 1개뿐이면 현재 프로세스에서 순서대로 그림.
+    """
+    done = []
+    if workers <= 1 or len(jobs) <= 1:
+        for filename, _, render, args in jobs:
+            try:
+                render(*args)
+                done.append(filename)
+            except Exception as e:
+                print(f'❌ {filename} render failed: {e}')
+        return done
+
+    # fork 대신 spawn: 부모의 matplotlib 상태(백엔드, 열린 figure)를 물려받지 않게
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=ctx,
+                             initializer=_init_render_worker) as pool:
+        futures = {pool.submit(render, *args): filename for filename, _, render, args in jobs}
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                future.result()
+                done.append(filename)
+            except Exception as e:
+                print(f'❌ {filename} render failed: {e}')
+    return done
+
 def send_latest_rankings_to_discord(webhook_url, latest_rankings, table_texts, daily_sales):
     """오늘 날짜 최신 순위를 디스코드로 전송 (텍스트 형식)"""
     if not webhook_url:
@@ -1339,7 +1563,7 @@ def main():
     data_file = 'rank_history.json'
     discord_webhook = os.environ.get('DISCORD_WEBHOOK', '')
     
-    if not os.path.exists(data_file):
+    if not os.path.exists(data_file) and not is_jsonl(data_file):
         print(f'❌ Error: {data_file} not found')
         return
     
@@ -1347,7 +1571,14 @@ def main():
     data = load_data(data_file)
     
     print('📈 Parsing data...')
-    country_data, dates = parse_data(data)
+    state = load_plot_state()
+    code_hash = _code_hash()
+    if state.get('code_hash') != code_hash:
+        state['charts'] = {}
+        state['code_hash'] = code_hash
+    new_records = update_plot_state(state, data)
+    print(f'   Cache: {new_records} new / {state["count"]} records')
+    country_data, dates = country_data_from_state(state)
     
     print(f'📅 Date range: {dates[0].date()} to {dates[-1].date()}')
     print(f'🌍 Countries: {len(country_data)}')
@@ -1363,30 +1594,49 @@ def main():
         build_historical_data_from_weekly(historical_file)
         print()
 
+    output_dir = 'output'
+
     print('💰 Estimating daily sales...')
-    sales_table_path, sales_chart_path, daily_sales = estimate_daily_sales(data)
+    daily_sales = compute_daily_sales(state)
     print()
     
     latest_rankings = get_latest_rankings(data)
     
-    print('🎨 Generating individual country plots...')
-    plot_country_rankings(country_data)
-    print()
-    
-    print('🎨 Generating combined Standard plot...')
-    plot_all_countries_standard(country_data)
-    print()
-    
-    print('🎨 Generating combined Deluxe plot...')
-    plot_all_countries_deluxe(country_data)
+    # 렌더링 작업: (PNG 파일명, 입력 지문, 그리는 함수, 인자). 오래 걸리는 차트부터
+    sales_fp = sales_fingerprint(daily_sales)
+    series_fps = {country: series_fingerprint(d) for country, d in country_data.items()}
+    all_fp = _fingerprint(series_fps)  # 전체 국가 차트는 모든 시계열에 의존
+    jobs = [
+        ('daily_sales_estimate.png',   sales_fp, plot_sales_table,            (daily_sales, output_dir)),
+        ('daily_sales_chart.png',      sales_fp, plot_sales_chart,            (daily_sales, output_dir)),
+        ('all_countries_standard.png', all_fp,   plot_all_countries_standard, (country_data, output_dir)),
+        ('all_countries_deluxe.png',   all_fp,   plot_all_countries_deluxe,   (country_data, output_dir)),
+        ('daily_averages.png',         all_fp,   plot_daily_averages,         (country_data, output_dir)),
+    ]
+    for country, fp in series_fps.items():
+        if fp:
+            jobs.append((country_png_name(country), fp, plot_country_rankings,
+                         ({country: country_data[country]}, output_dir)))
+    
+    stale = [job for job in jobs if chart_is_stale(state, job[0], job[1], output_dir)]
+    skipped = len(jobs) - len(stale)
+    
+    print(f'🎨 Rendering {len(stale)}/{len(jobs)} charts ({min(PLOT_WORKERS, max(len(stale), 1))} workers)...')
+    rendered = set(render_charts(stale))
+    for filename, fingerprint, _, _ in stale:
+        if filename in rendered:
+            mark_chart_rendered(state, filename, fingerprint, output_dir)
     print()
     
-    print('🎨 Generating daily average plots...')
-    plot_daily_averages(country_data)
-    print()
+    save_plot_state(state)
     
-    print('✅ All plots generated successfully!')
-    print(f'📁 Output directory: output/')
+    if len(rendered) == len(stale):
+        print('✅ All plots generated successfully!')
+    else:
+        print(f'⚠️  {len(stale) - len(rendered)} plots failed to render')
+    if skipped:
+        print(f'⏭️  Unchanged, not re-rendered: {skipped} charts')
+    print(f'📁 Output directory: {output_dir}/')
     print()
     
     if discord_webhook:
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PS Store browse 스냅샷 크롤러
+bestseller_tracker / ps_competitor_tracker 가 같은 슬롯에
+같은 pages/browse/{page} 를 각각 크롤링하던 것을 한 번으로 합칩니다.
+  1) 두 트래커의 locale 합집합을 (locale, page) 당 한 번씩만 요청
+  2) 정규화된 타일 목록을 ps_browse_snapshot.json 에 저장
+  3) 각 트래커는 실행 시 스냅샷이 신선하면 그대로 사용, 없으면 직접 크롤링
+경쟁작 트래커가 1페이지~Crimson Desert 페이지의 타일을 모두 쓰므로 스냅샷은 예측 탐색 없이 전부 받음
+(bestseller 의 predictive_rank 는 스냅샷이 없을 때 1개국씩 크롤링하는 경로에서만 사용).
+"""
+
+import time
+
+import bestseller_tracker
+import ps_competitor_tracker
+from ps_store import (
+    build_browse_snapshot, save_browse_snapshot, SNAPSHOT_FILE, SNAPSHOT_MAX_PAGES,
+)
+
+CONSUMERS = (bestseller_tracker, ps_competitor_tracker)
+
+
+def collect_locales():
+    locales = set()
+    for mod in CONSUMERS:
+        for country, locale in mod.LOCALE_MAP.items():
+            if country not in mod.SKIP_COUNTRIES and locale:
+                locales.add(locale)
+    return locales
+
+
+def main():
+    print("=" * 60)
+    print("📦 PS Store browse 스냅샷 크롤링")
+    print("=" * 60)
+
+    t0 = time.time()
+    locales = collect_locales()
+    snapshot = build_browse_snapshot(locales, bestseller_tracker.CONCEPT_ID, SNAPSHOT_MAX_PAGES)
+    save_browse_snapshot(snapshot)
+
+    got = snapshot["locales"]
+    n_pages = sum(len(v["pages"]) for v in got.values())
+    print(f"✅ {len(got)}/{len(locales)}개 locale, {n_pages}페이지 → {SNAPSHOT_FILE} "
+          f"({time.time() - t0:.1f}초)")
+    missing = sorted(set(locales) - set(got))
+    if missing:
+        print(f"⚠️  실패 locale (트래커가 직접 크롤링): {', '.join(missing)}")
+
+
+if __name__ == "__main__":
+    main()
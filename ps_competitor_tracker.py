@@ -14,6 +14,8 @@ import os
 import json
 import requests
 import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 
 KST = timezone(timedelta(hours=9))
@@ -26,6 +28,11 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 
+from ps_store import (
+    wait_for_grid, is_driver_alive, print_wait_stats, parse_backend_arg, http_session, fetch_grid_http,
+    load_browse_snapshot, snapshot_pages,
+)
+
 # =============================================================================
 # 설정
 # =============================================================================
@@ -102,18 +109,48 @@ def get_browse_url(country, page=1):
     return f"https://store.playstation.com/{locale}/pages/browse/{page}" if locale else None
 
 def wait_for_tiles(driver, timeout=8):
-    """타일이 최소 1개 이상 로드될 때까지 대기 (최대 timeout초)"""
-    try:
-        WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, '[data-qa*="productTile"]'))
-        )
-    except:
-        pass
+    """타일이 렌더링되고 개수가 안정될 때까지 대기 (최대 timeout초, ps_store 공용 헬퍼)"""
+    return wait_for_grid(driver, '[data-qa*="productTile"]', timeout=timeout)
 
 # =============================================================================
 # browse 페이지 파싱 (BeautifulSoup, 빠름)
 # =============================================================================
 
+# 1이면 타일 추출을 execute_script 1번으로 (실패 시 요소별 조회로 폴백)
+BULK_PARSE = os.getenv("PS_BULK_PARSE", "1") != "0"
+
+# _parse_browse_page_elements 와 같은 규칙을 브라우저 안에서 실행 → WebDriver 왕복 1회
+_PARSE_TILES_JS = """
+const tileMap = new Map();
+for (const el of document.querySelectorAll('[data-qa*="productTile"]')) {
+  const m = (el.getAttribute('data-qa') || '').match(/productTile(\\d+)$/);
+  if (!m) continue;
+  const idx = parseInt(m[1], 10);
+  if (tileMap.has(idx)) continue;
+  const text = (el.innerText || '').trim();
+  tileMap.set(idx, {url: null, title: text ? text.split('\\n')[0].trim() : null, has_discount: false});
+}
+const slots = [...tileMap.keys()].sort((a, b) => a - b);
+const links = document.querySelectorAll('a[href*="/concept/"]');
+for (let i = 0; i < Math.min(links.length, slots.length); i++) {
+  const d = tileMap.get(slots[i]);
+  const title = (links[i].innerText || '').trim();
+  d.url = links[i].href || '';
+  if (title && !d.title) d.title = title;
+}
+for (const el of document.querySelectorAll('[data-qa*="discount-badge"]')) {
+  const m = (el.getAttribute('data-qa') || '').match(/productTile(\\d+)/);
+  if (m && tileMap.has(parseInt(m[1], 10))) tileMap.get(parseInt(m[1], 10)).has_discount = true;
+}
+return slots.filter(idx => tileMap.get(idx).url).map(idx => {
+  const d = tileMap.get(idx);
+  return {tile_idx: idx, url: d.url, title: d.title || 'Unknown', has_discount: d.has_discount};
+});
+"""
+
+PARSE_STATS = {"bulk": 0, "fallback": 0}
+
+
 def parse_browse_page(driver):
     """
     browse 페이지에서 타일 정보 추출.
@@ -122,8 +159,28 @@ def parse_browse_page(driver):
       - 링크:      <a href="/concept/..."> (data-qa 없음, 페이지 순서대로)
       - 타이틀:    data-qa="ems-sdk-grid#productTileN#product-name" (span)
       - 할인 뱃지: data-qa="ems-sdk-grid#productTileN#discount-badge"
+    BULK_PARSE 면 _PARSE_TILES_JS 1번, 실패하면 요소별 조회(_parse_browse_page_elements).
     반환: list of {tile_idx, url, title, has_discount}
     """
+    if BULK_PARSE:
+        try:
+            tiles = driver.execute_script(_PARSE_TILES_JS)
+            if isinstance(tiles, list):
+                PARSE_STATS["bulk"] += 1
+                return [{
+                    'tile_idx': int(t['tile_idx']),
+                    'url': t['url'],
+                    'title': t['title'],
+                    'has_discount': bool(t['has_discount']),
+                } for t in tiles]
+        except Exception as e:
+            print(f"    ⚠️ 일괄 추출 실패 → 요소별 조회: {str(e)[:80]}")
+    PARSE_STATS["fallback"] += 1
+    return _parse_browse_page_elements(driver)
+
+
+def _parse_browse_page_elements(driver):
+    """parse_browse_page 폴백: find_elements + 요소별 get_attribute/text (요소마다 WebDriver 왕복)"""
     tile_map = {}
 
     # 1) 타일 루트 div 수집 (data-qa가 정확히 "...#productTileN"으로 끝나는 것만)
@@ -212,14 +269,252 @@ def get_discount_deadline(driver, url):
     except Exception as e:
         return f"확인 불가({str(e)[:30]})"
 
+# =============================================================================
+# 할인 종료일 캐시 — (locale, concept) → 상세 페이지에서 읽은 텍스트를 종료일까지 재사용
+# =============================================================================
+
+DEADLINE_CACHE_FILE = "competitor_deadline_cache.json"
+DEADLINE_MAX_TTL    = timedelta(hours=int(os.getenv("PS_DEADLINE_TTL_HOURS", "48")))  # 종료일이 멀어도 이 주기로 재확인
+DEADLINE_NODATE_TTL = timedelta(hours=6)   # 종료일을 못 읽은 경우 ("Save 75%", "종료일 정보 없음")
+MDY_LOCALES = {"en-us"}                    # 월/일/연 표기 (나머지 숫자 날짜는 일/월/연)
+
+def parse_offer_end(text, locale):
+    """
+    "Offer ends 4/9/2026 11:59 PM" 류 텍스트에서 종료 날짜 → 그날 00:00 UTC (보수적으로 일찍 만료).
+    연도가 앞에 오는 표기(2026/4/9, 2026年4月9日, 2026. 4. 9.)도 처리. 못 읽으면 None
+    """
+    m = re.search(r'(\d{4})\s*[./年-]\s*(\d{1,2})\s*[./月-]\s*(\d{1,2})', text)
+    if m:
+        y, mo, d = (int(g) for g in m.groups())
+    else:
+        m = re.search(r'(\d{1,2})[./-](\d{1,2})[./-](\d{2,4})', text)
+        if not m:
+            return None
+        a, b, y = (int(g) for g in m.groups())
+        y += 2000 if y < 100 else 0
+        mdy = locale in MDY_LOCALES
+        if a > 12:
+            mdy = False
+        elif b > 12:
+            mdy = True
+        mo, d = (a, b) if mdy else (b, a)
+    try:
+        return datetime(y, mo, d, tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+class DeadlineCache:
+    """
+    competitor_deadline_cache.json: {"<locale>|<concept id>": {"text", "expires", "checked"}}
+    - 종료일까지(최대 DEADLINE_MAX_TTL) 상세 페이지 방문 없이 재사용
+    - 그 국가 browse 에서 할인 뱃지가 사라진 항목은 retain() 에서 삭제
+    - "확인 불가(...)" 같은 실패 결과는 저장하지 않음
+    - 파일에서 읽은 항목 중 text/expires 가 없거나 깨진 것은 버림 (→ 캐시 미스로 다시 조회)
+    """
+
+    def __init__(self, path=DEADLINE_CACHE_FILE):
+        self.path = path
+        self.entries, invalid = self._load(path)
+        self.stats = {"hit": 0, "miss": 0, "expired": 0, "dropped": 0, "invalid": invalid}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _expires(entry):
+        """항목의 만료 시각 (timezone 포함). 형식이 잘못됐으면 None"""
+        if not isinstance(entry, dict) or not isinstance(entry.get("text"), str) or not entry["text"]:
+            return None
+        try:
+            expires = datetime.fromisoformat(entry["expires"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return expires if expires.tzinfo else None
+
+    @classmethod
+    def _load(cls, path):
+        """반환: (유효한 항목 dict, 버린 항목 수)"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}, 0
+        if not isinstance(data, dict):
+            return {}, 0
+        entries = {k: v for k, v in data.items() if cls._expires(v) is not None}
+        invalid = len(data) - len(entries)
+        if invalid:
+            print(f"⚠️ 종료일 캐시: 형식이 잘못된 항목 {invalid}개 버림")
+        return entries, invalid
+
+    @staticmethod
+    def key(locale, url):
+        m = re.search(r'/concept/(\d+)', url or "")
+        return f"{locale}|{m.group(1) if m else url}"
+
+    def get(self, locale, url, now=None):
+        now = now or datetime.now(timezone.utc)
+        key = self.key(locale, url)
+        with self._lock:
+            entry = self.entries.get(key)
+            expires = self._expires(entry)
+            if expires and expires > now:
+                self.stats["hit"] += 1
+                return entry["text"]
+            if entry is not None:
+                self.stats["expired" if expires else "invalid"] += 1
+                del self.entries[key]
+            self.stats["miss"] += 1
+            return None
+
+    def put(self, locale, url, text, now=None):
+        if not text or text.startswith("확인 불가"):
+            return
+        now = now or datetime.now(timezone.utc)
+        ends = parse_offer_end(text, locale)
+        expires = min(ends, now + DEADLINE_MAX_TTL) if ends else now + DEADLINE_NODATE_TTL
+        if expires <= now:
+            return
+        with self._lock:
+            self.entries[self.key(locale, url)] = {
+                "text": text, "expires": expires.isoformat(), "checked": now.isoformat(),
+            }
+
+    def retain(self, locale, urls):
+        """locale 항목 중 이번 browse 에서 할인 뱃지가 있던 concept 만 남김"""
+        keep = {self.key(locale, u) for u in urls}
+        prefix = f"{locale}|"
+        with self._lock:
+            for key in [k for k in self.entries if k.startswith(prefix) and k not in keep]:
+                del self.entries[key]
+                self.stats["dropped"] += 1
+
+    def save(self):
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            live = {k: v for k, v in self.entries.items() if (self._expires(v) or now) > now}
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(dict(sorted(live.items())), f, indent=1, ensure_ascii=False)
+        except OSError as e:
+            print(f"⚠️ 종료일 캐시 저장 실패: {e}")
+
+    def summary(self):
+        s = self.stats
+        total = s["hit"] + s["miss"]
+        rate = f"{s['hit'] / total * 100:.0f}%" if total else "-"
+        return (f"🗂️ 종료일 캐시: 적중 {s['hit']} / 미스 {s['miss']} (적중률 {rate}), "
+                f"만료 {s['expired']}, 뱃지 사라짐 {s['dropped']}, 잘못된 항목 {s['invalid']}, "
+                f"보관 {len(self.entries)}개")
+
+# =============================================================================
+# 상세 페이지 조회 풀 — browse 패스(메인 스레드)와 겹쳐서 실행
+# =============================================================================
+
+# 상세 페이지 전용 Chrome 수 (0 이면 기존처럼 browse 드라이버로 순차 조회)
+DETAIL_WORKERS = max(0, int(os.getenv("PS_DETAIL_WORKERS", "2")))
+
+
+class DetailPool:
+    """
+    할인 타일 상세 조회를 받아 워커 스레드(스레드마다 Chrome 1개, 필요할 때 기동)에서 처리.
+    메인 스레드는 결과를 기다리지 않고 다음 국가 browse 로 넘어가며, 국가마다 끝난 조회를
+    resolve_pending(block=False) 로 회수하고 마지막에 남은 것을 기다림.
+    Chrome 이 죽으면(is_driver_alive) 그 스레드의 드라이버를 종료 후 새로 띄움.
+    """
+
+    def __init__(self, workers=DETAIL_WORKERS, cache=None):
+        self.cache = cache
+        self._local = threading.local()
+        self._drivers = []
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="detail")
+
+    def _driver(self):
+        driver = getattr(self._local, "driver", None)
+        if driver is not None and not is_driver_alive(driver):
+            print("  ♻️ 상세 조회 드라이버 응답 없음 → 재시작")
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            with self._lock:
+                self._drivers.remove(driver)
+            driver = None
+        if driver is None:
+            driver = setup_driver()
+            self._local.driver = driver
+            with self._lock:
+                self._drivers.append(driver)
+        return driver
+
+    def _lookup(self, locale, url):
+        try:
+            text = get_discount_deadline(self._driver(), url)
+        except Exception as e:
+            text = f"확인 불가({str(e)[:30]})"
+        if self.cache is not None:
+            self.cache.put(locale, url, text)
+        return text
+
+    def submit(self, locale, url):
+        """조회 예약 → Future (결과는 get_discount_deadline 과 같은 문자열)"""
+        return self._pool.submit(self._lookup, locale, url)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        for driver in self._drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+def resolve_pending(result, block=True):
+    """
+    crawl_competitors 결과에 남은 Future(상세 조회 대기) 를 문자열로 교체.
+    block=False 면 이미 끝난 것만 교체. 반환: 아직 남은 Future 수
+    """
+    left = 0
+    for game in result.get("games", []):
+        info = game["discount_info"]
+        if not isinstance(info, Future):
+            continue
+        if block or info.done():
+            game["discount_info"] = info.result()
+        else:
+            left += 1
+    return left
+
 # =============================================================================
 # 경쟁작 크롤링 (v3.0 고속화)
 # =============================================================================
 
-def crawl_competitors(driver, country):
+def fetch_browse_tiles_http(session, url):
+    """
+    HTTP 백엔드: browse 페이지 임베디드 JSON → parse_browse_page 와 같은 타일 목록.
+    파싱 실패 시 None → 해당 페이지만 selenium 으로 fallback
+    """
+    return _to_browse_tiles(fetch_grid_http(url, session))
+
+def _to_browse_tiles(tiles):
+    """ps_store 정규화 타일 → parse_browse_page 형식 (None 은 그대로)"""
+    if tiles is None:
+        return None
+    return [{
+        'tile_idx': i,
+        'url': t['url'],
+        'title': t['title'] or 'Unknown',
+        'has_discount': t['has_discount']
+    } for i, t in enumerate(tiles) if t['kind'] == 'concept']
+
+def crawl_competitors(get_driver, country, session=None, snapshot=None, cache=None, detail_pool=None):
     """
     1단계: browse 페이지에서 Crimson Desert 앞 게임 + 할인 뱃지 여부 수집
+           (browse 스냅샷 → HTTP 백엔드 → selenium 순으로 시도)
     2단계: 할인 뱃지 있는 게임만 상세 페이지 방문 → Offer ends 추출
+           (cache(DeadlineCache) 에 유효한 항목이 있으면 방문 생략,
+            detail_pool 이 있으면 풀에 넘기고 discount_info 자리에 Future → resolve_pending 으로 회수)
+    get_driver: 호출 시 드라이버를 반환 (필요할 때만 Chrome 기동)
     """
     all_tiles = []   # Crimson Desert 도달 전 전체 타일
     page = 1
@@ -228,24 +523,36 @@ def crawl_competitors(driver, country):
 
     print(f"🔍 {country} 탐색 중...", end="", flush=True)
 
+    snap_pages = snapshot_pages(snapshot, LOCALE_MAP.get(country), MAX_PAGES)
+
     while page <= MAX_PAGES and not found_target:
         url = get_browse_url(country, page)
         if not url:
             break
 
-        try:
-            driver.get(url)
-            wait_for_tiles(driver, timeout=8)
-        except Exception:
-            break
-
-        tiles = parse_browse_page(driver)
+        if snap_pages is not None:
+            tiles = _to_browse_tiles(snap_pages[page - 1]) if page <= len(snap_pages) else []
+        elif session is not None:
+            tiles = fetch_browse_tiles_http(session, url)
+        else:
+            tiles = None
+        if tiles == [] and page == 1:
+            tiles = None   # 1페이지에 concept 없음 = 그리드를 잘못 읽음 → selenium
+        if tiles is None:
+            driver = get_driver()
+            try:
+                driver.get(url)
+                wait_for_tiles(driver, timeout=8)
+            except Exception:
+                break
 
-        if not tiles:
-            time.sleep(2)
             tiles = parse_browse_page(driver)
+
             if not tiles:
-                break
+                time.sleep(2)
+                tiles = parse_browse_page(driver)
+        if not tiles:
+            break
 
         for tile in tiles:
             if f"/concept/{CONCEPT_ID}" in tile['url']:
@@ -257,7 +564,8 @@ def crawl_competitors(driver, country):
 
         if not found_target:
             page += 1
-            time.sleep(1.5)
+            if session is None and snap_pages is None:
+                time.sleep(1.5)
 
     if not found_target:
         print(f" → 미발견 (최대 {MAX_PAGES}페이지)", flush=True)
@@ -273,12 +581,25 @@ def crawl_competitors(driver, country):
 
     print(f"   전체 {len(all_tiles)}개 중 할인 뱃지 {len(discounted)}개 → 상세 확인")
 
+    locale = LOCALE_MAP.get(country)
+    if cache is not None:
+        cache.retain(locale, [t['url'] for t in discounted])
+
     final_results = []
 
     for tile in discounted:
         rank = tile['rank']
-        print(f"   ↳ [{rank}위] {tile['title'][:40]} → Offer ends 확인...")
-        deadline = get_discount_deadline(driver, tile['url'])
+        deadline = cache.get(locale, tile['url']) if cache is not None else None
+        if deadline is not None:
+            print(f"   ↳ [{rank}위] {tile['title'][:40]} → 캐시: {deadline}")
+        elif detail_pool is not None:
+            print(f"   ↳ [{rank}위] {tile['title'][:40]} → 상세 조회 예약")
+            deadline = detail_pool.submit(locale, tile['url'])
+        else:
+            print(f"   ↳ [{rank}위] {tile['title'][:40]} → Offer ends 확인...")
+            deadline = get_discount_deadline(get_driver(), tile['url'])
+            if cache is not None:
+                cache.put(locale, tile['url'], deadline)
         final_results.append({
             "rank": rank,
             "title": tile['title'],
@@ -376,12 +697,25 @@ def send_discord(country_results):
 # =============================================================================
 
 def main():
+    backend = parse_backend_arg()
+
     print("=" * 70)
     print("⚔️ Crimson Desert 경쟁작 추적기 v3.1")
+    print(f"   backend: {backend}")
     print("=" * 70)
 
     t0 = time.time()
-    driver = setup_driver()
+    session = http_session() if backend == "http" else None
+    snapshot = load_browse_snapshot()
+    cache = DeadlineCache()
+    detail_pool = DetailPool(DETAIL_WORKERS, cache) if DETAIL_WORKERS > 0 else None
+    drivers = []  # 필요할 때만 1개 기동 (http 백엔드에서 할인 타일이 없으면 Chrome 미사용)
+
+    def get_driver():
+        if not drivers:
+            drivers.append(setup_driver())
+        return drivers[0]
+
     country_results = {}
 
     try:
@@ -389,13 +723,28 @@ def main():
         for i, country in enumerate(all_countries):
             if country in SKIP_COUNTRIES:
                 continue
-            result = crawl_competitors(driver, country)
+            result = crawl_competitors(get_driver, country, session, snapshot, cache, detail_pool)
             country_results[country] = result
+            if detail_pool is not None:
+                # browse 도중에 끝난 상세 조회는 바로 회수 (마지막 대기 시간 단축)
+                for done in country_results.values():
+                    resolve_pending(done, block=False)
             elapsed = time.time() - t0
             remaining = len(all_countries) - i - 1
             print(f"   ⏱ 경과 {elapsed:.0f}s | 남은 국가 {remaining}개")
+
+        if detail_pool is not None:
+            t_browse = time.time()
+            print(f"⏳ browse 완료 ({t_browse - t0:.0f}s) → 남은 상세 조회 대기 (workers={DETAIL_WORKERS})")
+            for result in country_results.values():
+                resolve_pending(result)
+            print(f"   상세 조회 마무리 {time.time() - t_browse:.0f}s")
     finally:
-        driver.quit()
+        if detail_pool is not None:
+            detail_pool.close()
+        for driver in drivers:
+            driver.quit()
+        cache.save()
 
     save_data({
         "timestamp": datetime.now(KST).isoformat(),
@@ -406,6 +755,10 @@ def main():
 
     total = time.time() - t0
     print(f"🎉 완료! 총 소요: {total:.0f}초 ({total/60:.1f}분)")
+    print_wait_stats()
+    if PARSE_STATS["bulk"] or PARSE_STATS["fallback"]:
+        print(f"🧩 browse 파싱: 일괄 {PARSE_STATS['bulk']}회 / 요소별 {PARSE_STATS['fallback']}회")
+    print(cache.summary())
 
 
 if __name__ == "__main__":
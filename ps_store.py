@@ -0,0 +1,723 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PS Store 크롤러 공용 헬퍼
+crimson_tracker / bestseller_tracker / bestseller2_tracker /
+crimson_competitors_tracker / ps_competitor_tracker 가 함께 사용합니다.
+
+  - load_page / wait_for_grid: 고정 time.sleep(3) 대신
+    상품 그리드가 렌더링되고 타일 개수가 안정될 때까지만 대기
+  - fetch_grid_http: Chrome 없이 requests 로 페이지를 받아
+    임베디드 JSON(__NEXT_DATA__ / Apollo state)에서 그리드 순서를 읽는 HTTP 백엔드
+  - parse_backend_arg: 실행 시 --backend http|selenium 선택
+  - crawl_concept_ranks: aiohttp 로 전 locale browse 페이지를 동시에 받아
+    concept 순위 계산 (전역 세마포어 + 호스트별 rate limit + 발견 즉시 나머지 페이지 취소)
+  - CrawlScheduler: 가중치 높은 국가부터 크롤링하고, 시간 예산을 넘길 것 같으면 나머지 국가 생략
+  - predictive_rank: 지난 순위가 있던 페이지부터 이웃 페이지만 확인 (1페이지부터 순회 대신)
+  - build/load_browse_snapshot: (locale, page)를 슬롯당 한 번만 받아 저장한 스냅샷을
+    bestseller_tracker / ps_competitor_tracker 가 함께 소비
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import heapq
+import argparse
+import itertools
+import threading
+from urllib.parse import urlsplit
+
+import requests
+
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+# =============================================================================
+# 페이지 로드 대기
+# =============================================================================
+
+# browse(/concept/) · category(/product/) 그리드 공통 셀렉터
+GRID_SELECTOR = "a[href*='/concept/'], a[href*='/product/']"
+
+PAGE_WAIT_TIMEOUT = 10    # 그리드가 뜨지 않을 때 최대 대기(초)
+PAGE_STABLE_SECS  = 0.5   # 타일 개수가 이 시간 동안 변하지 않으면 렌더링 완료로 판단
+PAGE_POLL_SECS    = 0.25  # 폴링 간격
+
+# 대기 결과 집계 (여러 워커 스레드에서 호출되므로 lock 사용)
+WAIT_STATS = {"ok": 0, "timeout": 0}
+_stats_lock = threading.Lock()
+
+_COUNT_JS = """
+if (document.readyState !== 'complete') { return 0; }
+return document.querySelectorAll(arguments[0]).length;
+"""
+
+
+def wait_for_grid(driver, selector=GRID_SELECTOR, timeout=PAGE_WAIT_TIMEOUT,
+                  stable_secs=PAGE_STABLE_SECS):
+    """
+    document.readyState == complete 이고 selector 매칭 개수가 1개 이상이며
+    stable_secs 동안 변하지 않을 때까지 대기.
+    폴링 1회 = execute_script 1번 (WebDriver 왕복 최소화).
+    반환: True(렌더링 완료) / False(timeout → WAIT_STATS["timeout"] 증가)
+    """
+    deadline = time.monotonic() + timeout
+    last_count, stable_since = -1, None
+
+    while time.monotonic() < deadline:
+        try:
+            count = driver.execute_script(_COUNT_JS, selector) or 0
+        except Exception:
+            count = 0
+        now = time.monotonic()
+        if count > 0 and count == last_count:
+            if now - stable_since >= stable_secs:
+                with _stats_lock:
+                    WAIT_STATS["ok"] += 1
+                return True
+        else:
+            last_count, stable_since = count, now
+        time.sleep(PAGE_POLL_SECS)
+
+    with _stats_lock:
+        WAIT_STATS["timeout"] += 1
+    return False
+
+
+def load_page(driver, url, selector=GRID_SELECTOR, timeout=PAGE_WAIT_TIMEOUT):
+    """driver.get(url) 후 그리드 렌더링까지 대기. 반환값은 wait_for_grid 와 동일"""
+    driver.get(url)
+    return wait_for_grid(driver, selector, timeout)
+
+
+def is_driver_alive(driver):
+    """드라이버 세션이 살아있는지 확인 (Chrome 크래시 감지용)"""
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+def print_wait_stats():
+    """실행 종료 시 페이지 대기 결과 요약 출력"""
+    total = WAIT_STATS["ok"] + WAIT_STATS["timeout"]
+    if total:
+        print(f"⏳ 페이지 대기: {total}회 중 timeout {WAIT_STATS['timeout']}회")
+
+
+# =============================================================================
+# HTTP 백엔드 (임베디드 JSON 파싱)
+# =============================================================================
+
+BACKENDS = ("http", "selenium")
+DEFAULT_BACKEND = os.getenv("PS_BACKEND", "selenium")
+
+HTTP_TIMEOUT = 15
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.8",
+}
+
+STORE_BASE = "https://store.playstation.com"
+
+_NEXT_DATA_RE = re.compile(
+    r'<script[^>]+id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S
+)
+_LOCALE_RE = re.compile(r"store\.playstation\.com/([a-z]{2}(?:-hant)?-[a-z]{2})/")
+
+
+def parse_backend_arg(default=None):
+    """
+    커맨드라인 --backend http|selenium 파싱.
+    미지정 시 env PS_BACKEND → 기본값 selenium.
+    """
+    parser = argparse.ArgumentParser(add_help=True)
+    parser.add_argument(
+        "--backend", choices=BACKENDS, default=default or DEFAULT_BACKEND,
+        help="http: 임베디드 JSON 파싱 (실패 시 selenium fallback) / selenium: 기존 Chrome 크롤링",
+    )
+    args, _ = parser.parse_known_args()
+    return args.backend
+
+
+def http_session():
+    """커넥션 재사용용 requests.Session (국가·페이지 전체에서 공유)"""
+    session = requests.Session()
+    session.headers.update(HTTP_HEADERS)
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("https://", adapter)
+    return session
+
+
+def _find_key(obj, key):
+    """중첩 dict/list 에서 key 를 처음 가진 dict 의 값 반환 (없으면 None)"""
+    stack = [obj]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, dict):
+            if key in cur:
+                return cur[key]
+            stack.extend(cur.values())
+        elif isinstance(cur, list):
+            stack.extend(cur)
+    return None
+
+
+def _ref_key(ref):
+    """Apollo 참조 → 캐시 키 ({"__ref": ".."} / {"id": "..", "type": "id"} / 문자열)"""
+    if isinstance(ref, dict):
+        return ref.get("__ref") or ref.get("id")
+    if isinstance(ref, str):
+        return ref
+    return None
+
+
+def _resolve(state, value):
+    """참조면 캐시에서 실제 객체를 꺼내고, 아니면 그대로 반환"""
+    key = _ref_key(value) if isinstance(value, dict) and len(value) <= 2 else None
+    if key and key in state:
+        return state[key]
+    return value
+
+
+def _entity_id(key, entity):
+    """'Concept:10002363' / 'Product:UP0000-...:en-us' → 순수 ID"""
+    if isinstance(entity, dict) and entity.get("id"):
+        return str(entity["id"])
+    ident = key.split(":", 1)[1] if ":" in key else key
+    return re.sub(r":[a-z]{2}(?:-hant)?-[a-z]{2}$", "", ident)
+
+
+def _has_discount(state, entity):
+    price = _resolve(state, entity.get("price")) if isinstance(entity, dict) else None
+    if not isinstance(price, dict):
+        return False
+    if price.get("discountText"):
+        return True
+    base, disc = price.get("basePrice"), price.get("discountedPrice")
+    return bool(base and disc and base != disc)
+
+
+def parse_grid_json(html, locale):
+    """
+    페이지 HTML 의 __NEXT_DATA__ 에서 Apollo state 를 꺼내 그리드 타일을 순서대로 반환.
+    그리드 = concepts/products 참조 리스트를 가진 객체 중 가장 긴 것.
+    반환: [{url, title, kind, id, has_discount}, ...]
+          그리드는 있으나 비어 있으면 [], 파싱 자체가 실패하면 None
+    """
+    m = _NEXT_DATA_RE.search(html)
+    if not m:
+        return None
+    try:
+        data = json.loads(m.group(1))
+    except ValueError:
+        return None
+
+    state = _find_key(data, "apolloState")
+    if not isinstance(state, dict) or not state:
+        return None
+
+    grid_refs = None
+    for obj in state.values():
+        if not isinstance(obj, dict):
+            continue
+        for field in ("concepts", "products"):
+            refs = obj.get(field)
+            if isinstance(refs, list) and (grid_refs is None or len(refs) > len(grid_refs)):
+                grid_refs = refs
+    if grid_refs is None:
+        return None
+
+    tiles = []
+    for ref in grid_refs:
+        key = _ref_key(ref)
+        entity = state.get(key) if key else None
+        if not key or not isinstance(entity, dict):
+            continue
+        kind = "concept" if key.startswith("Concept") else "product"
+        ident = _entity_id(key, entity)
+        tiles.append({
+            "url": f"{STORE_BASE}/{locale}/{kind}/{ident}",
+            "title": (entity.get("name") or "").strip() or None,
+            "kind": kind,
+            "id": ident,
+            "has_discount": _has_discount(state, entity),
+        })
+    return tiles
+
+
+def is_first_page(url):
+    """.../browse/1, .../category/<id>/1 처럼 목록 1페이지 URL 인지"""
+    return urlsplit(url).path.rstrip("/").endswith("/1")
+
+
+def parse_page_tiles(html, locale, url):
+    """
+    parse_grid_json + 1페이지 빈 그리드 검사.
+    추적 대상 목록의 1페이지가 비어 있을 리는 없으므로 [] 는 그리드를 잘못 짚은 것으로 보고 None
+    (→ 호출부에서 selenium fallback). 2페이지 이후의 [] 는 목록 끝.
+    """
+    tiles = parse_grid_json(html, locale)
+    if tiles == [] and is_first_page(url):
+        print(f"    ⚠️ 1페이지 그리드 비어 있음 → 파싱 실패로 처리: {url}")
+        return None
+    return tiles
+
+
+def fetch_grid_http(url, session=None, timeout=HTTP_TIMEOUT):
+    """
+    requests 로 browse/category 페이지를 받아 parse_grid_json 결과 반환.
+    HTTP 오류·파싱 실패·1페이지 빈 그리드 시 None → 호출부에서 selenium 으로 fallback.
+    """
+    m = _LOCALE_RE.search(url)
+    if not m:
+        return None
+    try:
+        resp = (session or requests).get(url, headers=HTTP_HEADERS, timeout=timeout)
+        if resp.status_code != 200:
+            print(f"    ⚠️ HTTP {resp.status_code}: {url}")
+            return None
+        return parse_page_tiles(resp.text, m.group(1), url)
+    except requests.RequestException as e:
+        print(f"    ⚠️ HTTP 요청 실패: {url} ({e})")
+        return None
+
+
+# =============================================================================
+# 비동기 browse 크롤러 (aiohttp)
+# =============================================================================
+
+ASYNC_CONCURRENCY = 16    # 전체 동시 요청 수 (전역 세마포어)
+HOST_RATE_PER_SEC = 10.0  # 호스트별 초당 요청 시작 수
+ASYNC_RETRIES     = 2     # 페이지별 재시도 횟수 (429/5xx/네트워크 오류)
+
+
+class HostRateLimiter:
+    """
+    호스트별로 요청 시작 간격을 1/rate 초 이상 벌려주는 간단한 rate limiter.
+    슬롯은 실제로 요청을 보낼 때만 잡고(미리 예약하지 않음), 빈 슬롯은 priority 가 작은 대기자부터.
+    → 페이지 번호를 priority 로 주면 모든 locale 의 앞 페이지가 먼저 나가고, concept 발견 후
+      취소된 뒤 페이지 태스크는 슬롯을 차지하지 않아 전체 일정이 실제로 줄어듦
+    """
+
+    def __init__(self, rate_per_sec=HOST_RATE_PER_SEC):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._next_slot = {}
+        self._waiting = {}    # host → [(priority, 순번)] 힙
+        self._seq = itertools.count()
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url, priority=0):
+        host = urlsplit(url).netloc
+        entry = (priority, next(self._seq))
+        queue = self._waiting.setdefault(host, [])
+        heapq.heappush(queue, entry)
+        try:
+            while True:
+                async with self._lock:
+                    now = time.monotonic()
+                    slot = self._next_slot.get(host, 0.0)
+                    if slot <= now and queue[0] == entry:
+                        heapq.heappop(queue)
+                        self._next_slot[host] = now + self.interval
+                        return
+                # 슬롯이 비었는데 차례가 아니면 앞 대기자가 가져갈 때까지 잠깐만 양보
+                await asyncio.sleep(max(slot - now, self.interval / 10, 0.001))
+        finally:
+            if entry in queue:   # 취소·예외로 빠져나가면 대기열에서 제거
+                queue.remove(entry)
+                heapq.heapify(queue)
+
+
+async def _fetch_tiles_async(session, url, sem, limiter, priority=0):
+    """browse 페이지 1개 → parse_page_tiles 결과 (실패 시 None). priority = 페이지 번호 (작을수록 먼저)"""
+    m = _LOCALE_RE.search(url)
+    if not m:
+        return None
+    for attempt in range(ASYNC_RETRIES + 1):
+        # rate limit 대기는 세마포어 밖에서 (대기 중인 태스크가 동시 요청 슬롯을 잡고 있지 않도록)
+        await limiter.wait(url, priority)
+        async with sem:
+            try:
+                async with session.get(url) as resp:
+                    status = resp.status
+                    html = await resp.text() if status == 200 else None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status, html = None, None
+                print(f"    ⚠️ HTTP 요청 실패: {url} ({e})")
+        if html is not None:
+            return parse_page_tiles(html, m.group(1), url)
+        if status is not None and status != 429 and status < 500:
+            print(f"    ⚠️ HTTP {status}: {url}")
+            return None
+        if attempt < ASYNC_RETRIES:
+            await asyncio.sleep(2 ** attempt)
+    return None
+
+
+def _concept_ids(tiles):
+    return [t["id"] for t in tiles if t["kind"] == "concept"]
+
+
+async def _crawl_locale_pages_async(session, page_urls, concept_id, sem, limiter):
+    """
+    한 locale 의 browse 페이지를 동시에 요청하고, concept_id 가 나온 페이지
+    (또는 빈 페이지) 이후는 즉시 취소.
+    반환: 1페이지부터 멈춘 페이지까지의 타일 목록 리스트 / 필요한 페이지 파싱 실패 시 None
+    """
+    tasks = {
+        asyncio.ensure_future(_fetch_tiles_async(session, url, sem, limiter, page)): page
+        for page, url in enumerate(page_urls, start=1)
+    }
+    pages = {}        # page → 타일 목록 (None = 파싱 실패)
+    stop_page = None  # 이 페이지 이후는 필요 없음 (발견 or 빈 페이지)
+
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                page = tasks[task]
+                tiles = task.result()
+                pages[page] = tiles
+                if tiles is not None:
+                    ids = _concept_ids(tiles)
+                    if (concept_id in ids or not ids) and (stop_page is None or page < stop_page):
+                        stop_page = page
+            if stop_page is not None:
+                for task in list(pending):
+                    if tasks[task] > stop_page:
+                        task.cancel()
+                        pending.discard(task)
+                if all(p in pages for p in range(1, stop_page + 1)):
+                    break
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    result = []
+    for page in range(1, (stop_page or len(page_urls)) + 1):
+        if pages.get(page) is None:
+            return None
+        result.append(pages[page])
+    return result
+
+
+def _crawl_locale_pages_sync(session, page_urls, concept_id):
+    """aiohttp 가 없을 때: 같은 규칙으로 페이지를 순서대로 요청"""
+    result = []
+    for url in page_urls:
+        tiles = fetch_grid_http(url, session)
+        if tiles is None:
+            return None
+        result.append(tiles)
+        ids = _concept_ids(tiles)
+        if concept_id in ids or not ids:
+            break
+    return result
+
+
+async def _crawl_browse_pages(page_urls_by_key, concept_id, concurrency, rate_per_sec):
+    sem = asyncio.Semaphore(concurrency)
+    limiter = HostRateLimiter(rate_per_sec)
+    timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(headers=HTTP_HEADERS, timeout=timeout, connector=connector) as session:
+        keys = list(page_urls_by_key)
+        outcomes = await asyncio.gather(*(
+            _crawl_locale_pages_async(session, page_urls_by_key[k], concept_id, sem, limiter)
+            for k in keys
+        ), return_exceptions=True)
+    results = {}
+    for key, outcome in zip(keys, outcomes):
+        if isinstance(outcome, BaseException):
+            print(f"    ⚠️ {key} 비동기 크롤링 오류: {outcome}")
+            outcome = None
+        results[key] = outcome
+    return results
+
+
+def crawl_browse_pages(page_urls_by_key, concept_id,
+                       concurrency=ASYNC_CONCURRENCY, rate_per_sec=HOST_RATE_PER_SEC):
+    """
+    {key: [page1_url, page2_url, ...]} → {key: [page1_tiles, page2_tiles, ...] or None}
+    concept_id 가 나온 페이지(또는 빈 페이지)까지만 담음.
+    aiohttp 가 있으면 전 key·전 페이지를 동시에, 없으면 requests 로 순서대로 요청.
+    """
+    if not page_urls_by_key:
+        return {}
+    if HAS_AIOHTTP:
+        return asyncio.run(_crawl_browse_pages(page_urls_by_key, concept_id, concurrency, rate_per_sec))
+    session = http_session()
+    return {k: _crawl_locale_pages_sync(session, urls, concept_id) for k, urls in page_urls_by_key.items()}
+
+
+def rank_from_pages(country, pages, concept_id, max_pages):
+    """
+    crawl_browse_pages / 스냅샷의 페이지 목록 → crawl_country 와 같은 (rank or None, status).
+    max_pages 까지만 봄. 1페이지에 concept 가 없으면 None (→ 호출부에서 직접 크롤링)
+    """
+    total_rank = 0
+    for page, tiles in enumerate(pages[:max_pages], start=1):
+        ids = _concept_ids(tiles)
+        if not ids and page == 1:
+            print(f"    ⚠️ {country}: 1페이지 concept 없음 → 직접 크롤링")
+            return None
+        if not ids:
+            print(f"    ↳ {country}: {page}p 아이템 없음 → 탐색 종료")
+            return None, "not_found"
+        if concept_id in ids:
+            rank = total_rank + ids.index(concept_id) + 1
+            print(f"    ✅ {country}: {rank}위 발견 (page {page})")
+            return rank, "found"
+        total_rank += len(ids)
+
+    print(f"    ↳ {country}: {max_pages}p({total_rank}위)까지 미발견")
+    return None, "not_found"
+
+
+# =============================================================================
+# 크롤링 스케줄 (가중치 높은 국가부터 + 시간 예산)
+# =============================================================================
+
+# 국가 크롤링에 쓸 수 있는 시간(분, 프로세스 시작 기준). 넘길 것 같으면 남은(가중치 낮은) 국가는 생략
+CRAWL_BUDGET_MIN = float(os.getenv("PS_CRAWL_BUDGET_MIN", "30"))
+SCHEDULE_MARGIN  = 1.5   # 국가 1개 예상 소요 x 이 배수만큼 남아 있어야 다음 국가를 시작
+
+
+def crawl_deadline(start, budget_min=CRAWL_BUDGET_MIN):
+    """time.time() 기준 시작 시각 → 마감 시각"""
+    return start + budget_min * 60
+
+
+class CrawlScheduler:
+    """
+    weights 가 큰 국가부터 take() 로 내주고, 남은 시간이 국가 1개 예상 소요(지금까지 평균)
+    x SCHEDULE_MARGIN 보다 적으면 더 내주지 않고 남은 국가를 shed 에 기록.
+    → 타임아웃·Chrome 중단이 나도 빠지는 건 가중치 낮은 국가 (결측률 영향 최소).
+    여러 워커 스레드가 take() / done() 을 동시에 호출해도 안전.
+    """
+
+    def __init__(self, countries, weights, deadline, margin=SCHEDULE_MARGIN):
+        # 가중치 내림차순, 같으면 원래 순서 (sorted 는 stable)
+        self.pending = sorted(countries, key=lambda c: -weights.get(c, 1.0))
+        self.deadline = deadline
+        self.margin = margin
+        self.shed = []
+        self._durations = []
+        self._lock = threading.Lock()
+
+    def estimate(self):
+        """국가 1개 예상 소요(초). 아직 끝난 국가가 없으면 0 (= 첫 국가는 항상 시작)"""
+        return sum(self._durations) / len(self._durations) if self._durations else 0.0
+
+    def take(self):
+        """다음 국가. 남은 국가가 없거나 시간 예산이 모자라면 None"""
+        with self._lock:
+            if not self.pending:
+                return None
+            remaining = self.deadline - time.time()
+            if remaining < self.estimate() * self.margin:
+                self.shed.extend(self.pending)
+                self.pending = []
+                print(f"⏱️  시간 예산 부족 (남은 {max(0.0, remaining):.0f}초, 국가당 약 {self.estimate():.0f}초) "
+                      f"→ {len(self.shed)}개국 생략: {', '.join(self.shed)}")
+                return None
+            return self.pending.pop(0)
+
+    def done(self, seconds):
+        """take() 로 받은 국가 1개를 끝내는 데 걸린 시간 기록"""
+        with self._lock:
+            self._durations.append(seconds)
+
+    def __iter__(self):
+        while True:
+            country = self.take()
+            if country is None:
+                return
+            yield country
+
+
+# =============================================================================
+# 예측 시작 페이지 탐색 (지난 순위 → 해당 페이지부터)
+# =============================================================================
+
+BROWSE_PAGE_SIZE = 24   # browse 그리드 1페이지 타일 수 (counts 가 없는 페이지의 추정치)
+PREDICT_RADIUS   = 2    # 예상 페이지 앞뒤로 살펴볼 페이지 수
+
+# 국가별 탐색 결과 요약 (print_search_stats)
+SEARCH_STATS = {"loads": 0, "predicted": 0, "fallback": 0, "predicted_loads": 0, "linear_loads": 0}
+
+
+def predict_start_page(last_rank, max_pages, counts=None, page_size=BROWSE_PAGE_SIZE):
+    """
+    지난 순위가 있던 페이지 (순위가 없으면 None).
+    counts = {page: concept 수} (지난 탐색 기록), 없는 페이지는 page_size 개로 가정.
+    """
+    if isinstance(last_rank, bool) or not isinstance(last_rank, int) or last_rank <= 0:
+        return None
+    counts = counts or {}
+    total = 0
+    for page in range(1, max_pages + 1):
+        total += counts.get(page, page_size)
+        if last_rank <= total:
+            return page
+    return max_pages
+
+
+def predictive_rank(country, load_ids, concept_id, last_rank, counts, max_pages, page_size=BROWSE_PAGE_SIZE):
+    """
+    지난 순위가 있던 페이지부터 앞뒤(PREDICT_RADIUS)를 번갈아 확인해 concept_id 를 찾음.
+      load_ids(page) → 그 페이지 concept id 목록 ([] = 목록 끝, None = 로드 실패)
+      counts         → {page: concept 수} 지난 선형 탐색에서 센 페이지별 concept 수
+    앞 페이지는 받지 않고 순위 = counts 의 앞 페이지 합 + 페이지 내 위치.
+    대신 받은 페이지마다 concept 수가 기록과 같은지 확인해, 하나라도 다르거나(product 타일 변동 등)
+    앞 페이지 기록이 빠져 있으면 포기.
+    반환: (rank, "found") / 미발견·불일치·로드 실패 시 None → 호출부에서 선형 탐색
+    (load_ids 가 캐시를 쓰면 선형 탐색은 이미 받은 페이지를 다시 받지 않음)
+    """
+    if not counts:
+        return None
+    start = predict_start_page(last_rank, max_pages, counts, page_size)
+    if start is None:
+        return None
+
+    order = [start]
+    for d in range(1, PREDICT_RADIUS + 1):
+        order += [p for p in (start - d, start + d) if 1 <= p <= max_pages]
+
+    for page in order:
+        if any(q not in counts for q in range(1, page + 1)):
+            continue   # 이 페이지까지의 기록이 없으면 검증도 순위 계산도 불가
+        ids = load_ids(page)
+        if ids is None:
+            return None
+        if len(ids) != counts[page]:
+            print(f"    ↳ {country}: page {page} concept {len(ids)}개 (기록 {counts[page]}개) → 선형 탐색")
+            return None
+        if concept_id in ids:
+            rank = sum(counts[q] for q in range(1, page)) + ids.index(concept_id) + 1
+            print(f"    ✅ {country}: {rank}위 발견 (page {page}, 예측 {start}p)")
+            return rank, "found"
+
+    print(f"    ↳ {country}: 예측 {start}p 주변 미발견 → 선형 탐색")
+    return None
+
+
+def print_search_stats():
+    """실행 종료 시 browse 페이지 로드 수 요약 출력"""
+    s = SEARCH_STATS
+    if not s["loads"]:
+        return
+    line = f"📄 browse 페이지 로드: {s['loads']}회 (예측 적중 {s['predicted']}개국 / 선형 탐색 {s['fallback']}개국)"
+    if s["predicted"]:
+        line += f" — 예측 적중분 {s['predicted_loads']}회 (선형이었다면 {s['linear_loads']}회)"
+    print(line)
+
+
+def crawl_concept_ranks(page_urls_by_country, concept_id,
+                        concurrency=ASYNC_CONCURRENCY, rate_per_sec=HOST_RATE_PER_SEC):
+    """
+    {country: [page1_url, page2_url, ...]} → {country: (rank, status) or None}
+    전 국가·전 페이지를 aiohttp 로 동시에 요청 (aiohttp 미설치 시 빈 dict → 동기 경로 사용).
+    None 인 국가는 호출부에서 동기 HTTP / selenium 으로 다시 크롤링.
+    """
+    if not HAS_AIOHTTP or not page_urls_by_country:
+        return {}
+    crawled = crawl_browse_pages(page_urls_by_country, concept_id, concurrency, rate_per_sec)
+    return {
+        c: rank_from_pages(c, pages, concept_id, len(page_urls_by_country[c])) if pages is not None else None
+        for c, pages in crawled.items()
+    }
+
+
+# =============================================================================
+# browse 스냅샷 (한 슬롯에 한 번 크롤링 → 여러 트래커가 공유)
+# =============================================================================
+
+SNAPSHOT_FILE        = "ps_browse_snapshot.json"
+SNAPSHOT_MAX_AGE_MIN = 50   # 이보다 오래된 스냅샷은 무시 (= 다음 슬롯)
+SNAPSHOT_MAX_PAGES   = 9
+
+
+def browse_url(locale, page=1):
+    return f"{STORE_BASE}/{locale}/pages/browse/{page}"
+
+
+def build_browse_snapshot(locales, concept_id, max_pages=SNAPSHOT_MAX_PAGES):
+    """
+    locale 별 browse 페이지를 (locale, page) 당 한 번씩만 받아 정규화된 스냅샷 생성.
+    locale 마다 concept_id 가 나온 페이지(또는 빈 페이지, max_pages)까지 저장.
+    complete=True 는 concept 발견 또는 목록 끝 도달 (= 더 뒤 페이지가 필요 없음).
+    """
+    locales = sorted(set(locales))
+    crawled = crawl_browse_pages(
+        {loc: [browse_url(loc, p) for p in range(1, max_pages + 1)] for loc in locales},
+        concept_id,
+    )
+    snapshot_locales = {}
+    for loc in locales:
+        pages = crawled.get(loc)
+        if pages is None:
+            continue
+        last_ids = _concept_ids(pages[-1]) if pages else []
+        snapshot_locales[loc] = {
+            "pages": pages,
+            "complete": bool(pages) and (concept_id in last_ids or not last_ids),
+        }
+    return {
+        "timestamp": time.time(),
+        "concept_id": concept_id,
+        "max_pages": max_pages,
+        "locales": snapshot_locales,
+    }
+
+
+def save_browse_snapshot(snapshot, path=SNAPSHOT_FILE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_browse_snapshot(path=SNAPSHOT_FILE, max_age_min=SNAPSHOT_MAX_AGE_MIN):
+    """같은 슬롯(max_age_min 이내)에 만든 스냅샷이면 반환, 없거나 오래됐으면 None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  {path} 로드 실패: {e}")
+        return None
+    age_min = (time.time() - snapshot.get("timestamp", 0)) / 60
+    if age_min > max_age_min:
+        print(f"ℹ️  {path} 오래됨 ({age_min:.0f}분 전) → 직접 크롤링")
+        return None
+    print(f"📦 browse 스냅샷 사용: {len(snapshot.get('locales', {}))}개 locale ({age_min:.0f}분 전)")
+    return snapshot
+
+
+def snapshot_pages(snapshot, locale, max_pages):
+    """
+    스냅샷에서 locale 의 페이지 목록 반환.
+    스냅샷이 없거나, locale 이 없거나, 미완료인데 max_pages 를 못 채우면 None (→ 직접 크롤링)
+    """
+    if not snapshot:
+        return None
+    entry = snapshot.get("locales", {}).get(locale)
+    if not entry:
+        return None
+    pages = entry.get("pages") or []
+    if entry.get("complete") or len(pages) >= max_pages:
+        return pages
+    return None
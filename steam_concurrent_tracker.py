@@ -6,19 +6,28 @@ Steam 동접 추적기 — 멀티 게임
 - 붉은사막 출시 후: 붉은사막만 추적 (비교군 게임 자동 종료)
 - cron 5분 주기 권장: */5 * * * * python3 /path/to/steam_concurrent_tracker.py
 
+[동접 수집]
+- GAMES 의 활성 게임을 스레드 풀로 동시에 조회 (steam_http 세션 + 토큰 버킷 공유)
+
 [히스토리 GitHub 자동 커밋]
 - 환경변수 GH_TOKEN, GH_OWNER, GH_REPO 설정 필요
-- 수집마다 steam_history_crimsondesert.json을 레포에 자동 커밋
+- 대시보드용 티어 파일(최근 원본 / 시간별 / 일별, ccu_retention.py)도 함께 갱신
+- 수집마다 바뀐 히스토리 파일 전부를 git tree API 로 커밋 1개에 묶어 커밋
+  (게임 수와 무관하게 GitHub API 4회)
 - GitHub Pages가 활성화된 경우 best.html에서 직접 fetch 가능
   URL: https://{GH_OWNER}.github.io/{GH_REPO}/steam_history_crimsondesert.json
 """
 
 import os
 import json
-import base64
 import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 
+from steam_http import AdaptiveTokenBucket, steam_session, get_json
+from ccu_retention import update_tiers
+
 # =============================================================================
 # 설정
 # =============================================================================
@@ -41,6 +50,11 @@ GAMES = [
 
 DISCORD_WEBHOOK = os.getenv("DISCORD_WEBHOOK")
 
+# 동접 API 동시 요청 수 / 초당 요청 수 (Web API 는 스토어 검색보다 여유가 있음)
+FETCH_WORKERS = max(1, int(os.getenv("STEAM_CCU_WORKERS", "8")))
+FETCH_RATE    = float(os.getenv("STEAM_CCU_RATE_PER_SEC", "5.0"))
+PLAYERS_URL = "https://api.steampowered.com/ISteamUserStats/GetNumberOfCurrentPlayers/v1/"
+
 # GitHub 자동 커밋 설정
 GH_TOKEN = os.getenv("GH_TOKEN")        # GitHub Personal Access Token (repo scope)
 GH_OWNER = os.getenv("GH_OWNER", "gonmau")
@@ -78,21 +92,28 @@ def format_countdown(now: datetime) -> str:
 # Steam API
 # =============================================================================
 
-def fetch_current_players(app_id: int) -> int | None:
-    url = (
-        "https://api.steampowered.com/ISteamUserStats/"
-        f"GetNumberOfCurrentPlayers/v1/?appid={app_id}"
-    )
-    try:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        result = r.json().get("response", {})
-        if result.get("result") == 1:
-            return result["player_count"]
-    except Exception as e:
-        print(f"  ❌ Steam API 오류 (appid={app_id}): {e}")
+def fetch_current_players(app_id: int, session=None, limiter=None) -> int | None:
+    session = session or steam_session()
+    limiter = limiter or AdaptiveTokenBucket(rate=FETCH_RATE, max_rate=FETCH_RATE)
+    data = get_json(session, PLAYERS_URL, {"appid": app_id}, limiter, f"Steam API (appid={app_id})")
+    result = (data or {}).get("response", {})
+    if result.get("result") == 1:
+        return result.get("player_count")
+    if data is not None:
+        print(f"  ❌ Steam API 오류 (appid={app_id}): {result}")
     return None
 
+def fetch_all_players(app_ids: list, workers: int = FETCH_WORKERS) -> dict:
+    """app_id 목록을 동시에 조회. 반환: {app_id: 동접 또는 None}"""
+    if not app_ids:
+        return {}
+    workers = min(workers, len(app_ids))
+    session = steam_session(pool_size=workers)
+    limiter = AdaptiveTokenBucket(rate=FETCH_RATE, max_rate=FETCH_RATE)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        counts = pool.map(lambda a: fetch_current_players(a, session, limiter), app_ids)
+        return dict(zip(app_ids, counts))
+
 # =============================================================================
 # 히스토리 로컬 관리
 # =============================================================================
@@ -115,16 +136,104 @@ def save_history(path: str, history: list):
     except Exception as e:
         print(f"  ⚠️ 히스토리 저장 실패 ({path}): {e}")
 
-def peak_all_time(history: list) -> int:
-    return max((h["players"] for h in history), default=0)
+def append_history(path: str, record: dict):
+    """
+    히스토리 JSON 배열 끝에 레코드 1개를 이어 씀 (파일 전체를 파싱/재작성하지 않음).
+    결과는 json.dump(indent=2) 와 같은 모양. 끝이 ']' 가 아니면 전체 로드/저장으로 대체.
+    """
+    item = json.dumps(record, indent=2, ensure_ascii=False).replace("\n", "\n  ").encode("utf-8")
+    try:
+        with open(path, "r+b") as f:
+            end = f.seek(0, os.SEEK_END)
+            f.seek(max(0, end - 256))
+            tail = f.read()
+            body = tail.rstrip()
+            if not body.endswith(b"]"):
+                raise ValueError("JSON 배열 끝이 아님")
+            body = body[:-1].rstrip()
+            if not body.endswith((b"}", b"[")):
+                raise ValueError("예상하지 못한 배열 끝")
+            sep = b",\n  " if body.endswith(b"}") else b"\n  "
+            f.seek(end - len(tail) + len(body))
+            f.truncate()
+            f.write(sep + item + b"\n]")
+        return
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"  ⚠️ 히스토리 이어쓰기 실패 ({path}): {e} → 전체 저장")
+    history = load_history(path)
+    history.append(record)
+    save_history(path, history)
+
+# =============================================================================
+# 집계 사이드카 — 피크/마일스톤을 전체 히스토리 스캔 없이 계산
+#   {history}.agg.json : 역대 최고, 도달한 최대 마일스톤, 최근 24h 단조 감소 덱
+#   히스토리 파일 크기가 기록과 다르면(수동 편집 등) 히스토리에서 1회 재생성
+# =============================================================================
 
-def peak_24h(history: list, now: datetime) -> int:
-    cutoff = (now - timedelta(hours=24)).isoformat()
-    vals = [h["players"] for h in history if h["timestamp"] >= cutoff]
-    return max(vals, default=0)
+AGG_VERSION = 1
+WINDOW_24H = 24 * 3600
+
+def agg_path(history_path: str) -> str:
+    root, ext = os.path.splitext(history_path)
+    return f"{root}.agg{ext}"
+
+def new_agg() -> dict:
+    return {"version": AGG_VERSION, "size": 0, "count": 0, "last_players": None,
+            "peak_all": 0, "milestone": 0, "window": deque()}
+
+def agg_push(agg: dict, ts: float, players: int, thresholds: list):
+    """샘플 1개 반영. window 는 (ts, players) 를 players 내림차순으로 유지 → 맨 앞이 24h 최고"""
+    window = agg["window"]
+    while window and window[-1][1] <= players:
+        window.pop()
+    window.append((ts, players))
+    while window[0][0] < ts - WINDOW_24H:
+        window.popleft()
+    agg["count"] += 1
+    agg["last_players"] = players
+    agg["peak_all"] = max(agg["peak_all"], players)
+    agg["milestone"] = max([t for t in thresholds if t <= agg["peak_all"]], default=agg["milestone"])
+
+def agg_peak_24h(agg: dict, ts: float) -> int:
+    window = agg["window"]
+    while window and window[0][0] < ts - WINDOW_24H:
+        window.popleft()
+    return window[0][1] if window else 0
+
+def rebuild_agg(history: list, thresholds: list) -> dict:
+    agg = new_agg()
+    for h in history:
+        agg_push(agg, datetime.fromisoformat(h["timestamp"]).timestamp(), h["players"], thresholds)
+    return agg
+
+def load_agg(history_path: str, thresholds: list) -> dict:
+    size = os.path.getsize(history_path) if os.path.exists(history_path) else 0
+    try:
+        with open(agg_path(history_path), "r", encoding="utf-8") as f:
+            agg = json.load(f)
+        if agg.get("version") == AGG_VERSION and agg.get("size") == size:
+            agg["window"] = deque(tuple(w) for w in agg["window"])
+            return agg
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    history = load_history(history_path)
+    print(f"  🔄 집계 재생성 ({len(history)}개 샘플)")
+    agg = rebuild_agg(history, thresholds)
+    agg["size"] = size
+    return agg
+
+def save_agg(history_path: str, agg: dict):
+    agg["size"] = os.path.getsize(history_path)
+    data = dict(agg, window=[list(w) for w in agg["window"]])
+    try:
+        with open(agg_path(history_path), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    except Exception as e:
+        print(f"  ⚠️ 집계 저장 실패 ({agg_path(history_path)}): {e}")
 
-def check_milestone(current: int, history: list, thresholds: list) -> int | None:
-    prev_max = max((h["players"] for h in history), default=0)
+def check_milestone(current: int, prev_max: int, thresholds: list) -> int | None:
     for t in sorted(thresholds):
         if prev_max < t <= current:
             return t
@@ -134,78 +243,88 @@ def check_milestone(current: int, history: list, thresholds: list) -> int | None
 # GitHub 자동 커밋
 # =============================================================================
 
-def commit_to_github(local_path: str, repo_path: str, commit_message: str) -> bool:
+def _gh_headers() -> dict:
+    return {
+        "Authorization": f"token {GH_TOKEN}",
+        "Accept": "application/vnd.github+json",
+        "X-GitHub-Api-Version": "2022-11-28",
+    }
+
+def commit_files_to_github(paths: list, commit_message: str, retries: int = 1) -> bool:
     """
-    로컬 파일을 GitHub API를 통해 레포에 커밋합니다.
+    로컬 파일 여러 개를 git tree API 로 커밋 1개에 묶어 커밋합니다.
+    (브랜치 HEAD 조회 → tree 생성(내용 인라인) → commit 생성 → ref 이동, 파일 수 무관 4회)
 
     Args:
-        local_path:     로컬 파일 경로 (예: 'steam_history_crimsondesert.json')
-        repo_path:      레포 내 경로 (예: 'steam_history_crimsondesert.json')
+        paths:          로컬 경로 = 레포 내 경로 (레포 루트 기준)
         commit_message: 커밋 메시지
+        retries:        ref 이동이 fast-forward 가 아닐 때(동시 커밋) 처음부터 다시 시도할 횟수
     Returns:
         True if success, False otherwise
     """
     if not GH_TOKEN:
         print("  ⚠️ GH_TOKEN 미설정 → GitHub 커밋 스킵")
         return False
-
-    headers = {
-        "Authorization": f"token {GH_TOKEN}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
-    api_base = f"https://api.github.com/repos/{GH_OWNER}/{GH_REPO}"
-
-    # 1) 현재 파일의 SHA 가져오기 (업데이트 시 필요)
-    sha = None
-    try:
-        r = requests.get(
-            f"{api_base}/contents/{repo_path}",
-            headers=headers,
-            params={"ref": GH_BRANCH},
-            timeout=15,
-        )
-        if r.status_code == 200:
-            sha = r.json().get("sha")
-        elif r.status_code != 404:
-            print(f"  ⚠️ SHA 조회 실패 ({r.status_code}): {r.text[:200]}")
-    except Exception as e:
-        print(f"  ⚠️ SHA 조회 오류: {e}")
-
-    # 2) 파일 내용을 base64 인코딩
-    try:
-        with open(local_path, "rb") as f:
-            content_b64 = base64.b64encode(f.read()).decode("utf-8")
-    except Exception as e:
-        print(f"  ❌ 파일 읽기 실패 ({local_path}): {e}")
+    if not paths:
         return False
 
-    # 3) PUT으로 생성/업데이트
-    payload = {
-        "message": commit_message,
-        "content": content_b64,
-        "branch": GH_BRANCH,
-    }
-    if sha:
-        payload["sha"] = sha  # 기존 파일 업데이트 시 SHA 필수
+    tree = []
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                tree.append({"path": path, "mode": "100644", "type": "blob", "content": f.read()})
+        except Exception as e:
+            print(f"  ❌ 파일 읽기 실패 ({path}): {e}")
+            return False
 
-    try:
-        r = requests.put(
-            f"{api_base}/contents/{repo_path}",
-            headers=headers,
-            json=payload,
-            timeout=20,
-        )
-        if r.status_code in (200, 201):
-            action = "업데이트" if r.status_code == 200 else "생성"
-            print(f"  ✅ GitHub 커밋 {action} 완료: {repo_path}")
-            return True
-        else:
-            print(f"  ❌ GitHub 커밋 실패 ({r.status_code}): {r.text[:300]}")
+    headers = _gh_headers()
+    api_base = f"https://api.github.com/repos/{GH_OWNER}/{GH_REPO}"
+
+    for attempt in range(retries + 1):
+        try:
+            # 1) 브랜치 HEAD 커밋 + tree SHA
+            r = requests.get(f"{api_base}/commits/{GH_BRANCH}", headers=headers, timeout=15)
+            if r.status_code != 200:
+                print(f"  ❌ HEAD 조회 실패 ({r.status_code}): {r.text[:200]}")
+                return False
+            head = r.json()
+            parent_sha, base_tree = head["sha"], head["commit"]["tree"]["sha"]
+
+            # 2) 바뀐 파일만 덮어쓴 tree
+            r = requests.post(f"{api_base}/git/trees", headers=headers,
+                              json={"base_tree": base_tree, "tree": tree}, timeout=30)
+            if r.status_code != 201:
+                print(f"  ❌ tree 생성 실패 ({r.status_code}): {r.text[:200]}")
+                return False
+            tree_sha = r.json()["sha"]
+            if tree_sha == base_tree:
+                print("  ℹ️ 변경 없음 → 커밋 스킵")
+                return True
+
+            # 3) 커밋
+            r = requests.post(f"{api_base}/git/commits", headers=headers,
+                              json={"message": commit_message, "tree": tree_sha, "parents": [parent_sha]},
+                              timeout=15)
+            if r.status_code != 201:
+                print(f"  ❌ 커밋 생성 실패 ({r.status_code}): {r.text[:200]}")
+                return False
+            commit_sha = r.json()["sha"]
+
+            # 4) 브랜치 이동 (fast-forward 만)
+            r = requests.patch(f"{api_base}/git/refs/heads/{GH_BRANCH}", headers=headers,
+                               json={"sha": commit_sha, "force": False}, timeout=15)
+            if r.status_code == 200:
+                print(f"  ✅ GitHub 커밋 완료: {', '.join(paths)}")
+                return True
+            if r.status_code == 422 and attempt < retries:
+                print("  ⚠️ 브랜치가 그 사이 바뀜 → 다시 시도")
+                continue
+            print(f"  ❌ 브랜치 갱신 실패 ({r.status_code}): {r.text[:300]}")
             return False
-    except Exception as e:
-        print(f"  ❌ GitHub 커밋 오류: {e}")
-        return False
+        except Exception as e:
+            print(f"  ❌ GitHub 커밋 오류: {e}")
+            return False
+    return False
 
 # =============================================================================
 # Discord
@@ -295,7 +414,8 @@ def send_countdown(countdown_str: str, now: datetime):
 # 게임별 처리
 # =============================================================================
 
-def process_game(game: dict, now: datetime):
+def process_game(game: dict, now: datetime, current: int | None) -> tuple | None:
+    """동접 1건 기록 + Discord. 반환: (커밋 메시지용 요약, 바뀐 파일들) (기록 안 했으면 None)"""
     print(f"\n{'─' * 40}")
     print(f"{game['emoji']} {game['name']} (appid: {game['app_id']})")
 
@@ -304,22 +424,25 @@ def process_game(game: dict, now: datetime):
             print("  ⏹️ 추적 종료")
         else:
             print("  ⏳ 추적 대기 중 (출시 전)")
-        return
+        return None
 
-    current = fetch_current_players(game["app_id"])
     if current is None:
         print("  ❌ 동접 수집 실패, 스킵")
-        return
-
-    history  = load_history(game["history_file"])
-    prev     = history[-1]["players"] if history else None
-    p_all    = max(peak_all_time(history), current)
-    p_24     = max(peak_24h(history, now), current)
-    milestone = check_milestone(current, history, game["milestones"])
-
-    # 로컬 히스토리에 추가 & 저장
-    history.append({"timestamp": now.isoformat(), "players": current})
-    save_history(game["history_file"], history)
+        return None
+
+    path     = game["history_file"]
+    agg      = load_agg(path, game["milestones"])
+    prev     = agg["last_players"]
+    milestone = check_milestone(current, agg["peak_all"], game["milestones"])
+    agg_push(agg, now.timestamp(), current, game["milestones"])
+    p_all    = agg["peak_all"]
+    p_24     = agg_peak_24h(agg, now.timestamp())
+
+    # 로컬 히스토리에 추가 & 집계/티어 저장
+    sample = {"timestamp": now.isoformat(), "players": current}
+    append_history(path, sample)
+    save_agg(path, agg)
+    tier_files = update_tiers(path, sample, agg["count"])
 
     diff_str = format_diff(current, prev).strip()
     print(f"  현재: {current:,}명 {diff_str}")
@@ -327,19 +450,14 @@ def process_game(game: dict, now: datetime):
     if milestone:
         print(f"  🏆 {milestone:,}명 마일스톤 돌파!")
 
-    # ── GitHub 자동 커밋 ──────────────────────────────────────────
-    commit_msg = (
-        f"ccu: {game['name']} {current:,}명 "
-        f"({now.strftime('%m/%d %H:%M')} KST)"
-    )
-    commit_to_github(
-        local_path=game["history_file"],
-        repo_path=game["history_file"],   # 레포 루트에 저장
-        commit_message=commit_msg,
-    )
-    # ──────────────────────────────────────────────────────────────
-
     send_active(game, current, prev, p_all, p_24, milestone, now)
+    return f"{game['name']} {current:,}명", [path, agg_path(path)] + tier_files
+
+def build_commit_message(summaries: list, now: datetime) -> str:
+    stamp = f"({now.strftime('%m/%d %H:%M')} KST)"
+    if len(summaries) <= 3:
+        return f"ccu: {', '.join(summaries)} {stamp}"
+    return f"ccu: {len(summaries)}개 게임 {stamp}\n\n" + "\n".join(summaries)
 
 # =============================================================================
 # 메인
@@ -367,8 +485,21 @@ def main():
         else:
             print("  ⏳ 카운트다운 전송 시간 아님 → 스킵")
 
+    active = [g for g in GAMES if is_active(g, now)]
+    players = fetch_all_players([g["app_id"] for g in active])
+
+    changed, summaries = [], []
     for game in GAMES:
-        process_game(game, now)
+        result = process_game(game, now, players.get(game["app_id"]))
+        if result:
+            summary, files = result
+            changed += files   # 레포 루트에 저장
+            summaries.append(summary)
+
+    # ── GitHub 자동 커밋 (실행당 1회) ─────────────────────────────
+    if changed:
+        print(f"\n{'─' * 40}")
+        commit_files_to_github(changed, build_commit_message(summaries, now))
 
     print(f"\n{'=' * 40}")
     print("완료")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Steam HTTP 공통 (steam_topseller_tracker / steam_concurrent_tracker 공용)
+- 커넥션 풀을 공유하는 requests.Session
+- 429 / Retry-After 에 맞춰 속도를 줄이고, 성공이 이어지면 다시 올리는 토큰 버킷
+  (여러 스레드가 같은 버킷을 공유 → 국가/앱을 병렬로 돌려도 호스트 전체 요청 속도는 일정)
+"""
+
+import os
+import time
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+STEAM_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Accept": "application/json",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+HTTP_TIMEOUT = 20
+
+# 토큰 버킷 (초당 요청 수). 429 마다 절반, 성공마다 RATE_STEP 씩 회복
+RATE_PER_SEC = float(os.getenv("STEAM_RATE_PER_SEC", "2.0"))
+RATE_MIN     = 0.2
+RATE_MAX     = 5.0
+RATE_STEP    = 0.05
+RATE_BURST   = 2
+
+DEFAULT_RETRY_DELAYS = [5, 15, 30]   # Retry-After 가 없을 때 429 재시도 대기(초)
+
+
+# ======================
+# 세션 / rate limiter
+# ======================
+def steam_session(pool_size=8):
+    """스레드 간 공유하는 requests.Session (커넥션 재사용)"""
+    session = requests.Session()
+    session.headers.update(STEAM_HEADERS)
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    return session
+
+
+class AdaptiveTokenBucket:
+    """스레드 안전 토큰 버킷. 429 를 받으면 속도를 절반으로 + Retry-After 동안 전체 일시정지"""
+
+    def __init__(self, rate=RATE_PER_SEC, burst=RATE_BURST,
+                 min_rate=RATE_MIN, max_rate=RATE_MAX, step=RATE_STEP):
+        self.rate = rate
+        self.capacity = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.step = step
+        self.tokens = float(burst)
+        self.throttled = 0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 1개를 얻을 때까지 대기"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.step)
+
+    def on_throttle(self, pause=None):
+        """
+        429 수신: 속도 절반, pause 초 동안 모든 요청 정지. 바뀐 속도 반환.
+        이미 정지 중(이전 429 의 pause 창 안)에 도착한 429 는 같은 스로틀로 보고 속도를 다시 줄이지 않음
+        """
+        with self._lock:
+            self.throttled += 1
+            now = time.monotonic()
+            if now >= self._paused_until:
+                self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            self._updated = now
+            if pause:
+                self._paused_until = max(self._paused_until, now + pause)
+            return self.rate
+
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초 또는 HTTP-date) → 초. 해석 불가면 None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+# ======================
+# 요청
+# ======================
+def get_json(session, url, params, limiter, label, retry_delays=DEFAULT_RETRY_DELAYS):
+    """
+    limiter 토큰을 받아 GET → JSON. 실패 시 None.
+    429 는 Retry-After(없으면 retry_delays) 만큼 limiter 전체를 멈춘 뒤 재시도.
+    """
+    for attempt in range(len(retry_delays) + 1):
+        limiter.acquire()
+        try:
+            r = session.get(url, params=params, timeout=HTTP_TIMEOUT)
+        except requests.RequestException as e:
+            print(f"  ❌ {label} 오류: {e}")
+            return None
+
+        if r.status_code == 200:
+            limiter.on_success()
+            try:
+                return r.json()
+            except ValueError as e:
+                print(f"  ❌ {label} JSON 파싱 실패: {e}")
+                return None
+
+        if r.status_code == 429:
+            if attempt == len(retry_delays):
+                print(f"  ❌ {label} 재시도 초과, 포기")
+                return None
+            retry_after = parse_retry_after(r.headers.get("Retry-After"))
+            pause = retry_after if retry_after is not None else retry_delays[attempt]
+            rate = limiter.on_throttle(pause)
+            print(f"  ⚠️ {label} 429 Rate Limited → {pause:.0f}초 대기 후 재시도 "
+                  f"({attempt + 1}/{len(retry_delays)}, 속도 {rate:.2f}/s)")
+            continue
+
+        print(f"  ⚠️ {label} 응답 실패: {r.status_code}")
+        return None
+    return None
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Steam 추적 국가 / 시장 가중치
+steam_topseller_tracker 와 build_dashboard_data 가 함께 씀.
+대시보드 집계가 트래커 모듈(matplotlib 등)을 import 하지 않도록 상수만 따로 둠.
+"""
+
+TARGET_COUNTRIES = {
+    # 기존 (미주/유럽/아시아 핵심)
+    "us": "미국",
+    "gb": "영국",
+    "de": "독일",
+    "fr": "프랑스",
+    "ca": "캐나다",
+    "br": "브라질",
+    "jp": "일본",
+    "kr": "한국",
+    "cn": "중국",
+    "ru": "러시아",
+    "au": "호주",
+    "es": "스페인",
+    "it": "이탈리아",
+    "pl": "폴란드",
+    "tr": "터키",
+    # 유럽 추가
+    "nl": "네덜란드",
+    "se": "스웨덴",
+    "no": "노르웨이",
+    "dk": "덴마크",
+    "fi": "핀란드",
+    "at": "오스트리아",
+    "ch": "스위스",
+    "cz": "체코",
+    "sg": "싱가포르",
+    # 공식 차트 지원국 추가
+    "be": "벨기에",
+    "hk": "홍콩",
+    "nz": "뉴질랜드",
+    "tw": "대만",
+    "th": "태국",
+}
+
+# Steam 시장 가중치 (index.html의 STS_W 와 동기화)
+STEAM_WEIGHTS = {
+    # 기존
+    "us":  30.0,
+    "gb":  5.0,
+    "de":  5.5,
+    "fr":  4.0,
+    "ca":  3.5,
+    "br":  4.5,
+    "jp":  3.5,
+    "kr":  4.2,
+    "cn":  28.0,
+    "ru":  6.0,
+    "au":  2.5,
+    "es":  2.0,
+    "it":  1.8,
+    "pl":  2.0,
+    "tr":  2.0,
+    # 신규
+    "nl":  0.8,
+    "se":  0.7,
+    "no":  0.5,
+    "dk":  0.5,
+    "fi":  0.4,
+    "at":  0.6,
+    "ch":  0.7,
+    "cz":  0.4,
+    "sg":  0.5,
+    "be":  0.8,
+    "hk":  0.7,
+    "nz":  0.4,
+    "tw":  0.8,
+    "th":  0.8,
+}
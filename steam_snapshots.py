@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Steam Top Seller 전체 순위 스냅샷 (steam_topseller_tracker 의 선택 기능, STEAM_SNAPSHOT=1)
+실행마다 국가별 중복 제거된 top-N appid 순서를 uint32 배열로 저장해 두고,
+다시 크롤링하지 않고 임의 앱의 순위 추이를 조회합니다.
+
+  steam_topseller_snapshots.jsonl : 1줄 = 실행 1회
+    {"t": timestamp, "cc": [국가코드...], "n": [국가별 개수...], "z": base64(zlib(uint32 LE 배열 이어붙임))}
+
+CLI:
+  python steam_snapshots.py rank 582660          # 전체 국가 순위 추이
+  python steam_snapshots.py rank 582660 us jp    # 특정 국가만
+  python steam_snapshots.py top us 20            # 최신 스냅샷 상위 N
+"""
+
+import os
+import sys
+import json
+import zlib
+import base64
+from array import array
+
+from history_store import append_lines
+
+SNAPSHOT_FILE = "steam_topseller_snapshots.jsonl"
+
+# 4바이트 부호 없는 정수 typecode (플랫폼마다 I/L 크기가 다름)
+_U32 = "I" if array("I").itemsize == 4 else "L"
+
+
+# ======================
+# 인코딩
+# ======================
+def encode_run(timestamp, orders):
+    """{국가코드: [appid 순서]} → 스냅샷 1줄"""
+    ccs = list(orders)
+    arr = array(_U32)
+    for cc in ccs:
+        arr.extend(int(a) for a in orders[cc])
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return {
+        "t": timestamp,
+        "cc": ccs,
+        "n": [len(orders[cc]) for cc in ccs],
+        "z": base64.b64encode(zlib.compress(arr.tobytes(), 9)).decode("ascii"),
+    }
+
+def decode_run(line):
+    """스냅샷 1줄 → (timestamp, {국가코드: array(uint32)})"""
+    arr = array(_U32)
+    arr.frombytes(zlib.decompress(base64.b64decode(line["z"])))
+    if sys.byteorder != "little":
+        arr.byteswap()
+    orders, pos = {}, 0
+    for cc, n in zip(line["cc"], line["n"]):
+        orders[cc] = arr[pos:pos + n]
+        pos += n
+    return line["t"], orders
+
+def append_snapshot(timestamp, orders, path=SNAPSHOT_FILE):
+    append_lines(path, [encode_run(timestamp, orders)])
+
+
+# ======================
+# 조회
+# ======================
+def iter_snapshots(path=SNAPSHOT_FILE):
+    """(timestamp, {국가코드: appid 배열}) 를 오래된 순으로. 깨진 줄은 건너뜀"""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for raw in f:
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                yield decode_run(json.loads(raw))
+            except (ValueError, KeyError, zlib.error):
+                continue
+
+def rank_history(appid, countries=None, path=SNAPSHOT_FILE):
+    """
+    앱 순위 추이. 반환: [(timestamp, {국가코드: 순위 또는 None}), ...]
+    None = 그 실행에서 수집한 top-N 밖 (수집된 국가만 포함)
+    """
+    appid = int(appid)
+    rows = []
+    for ts, orders in iter_snapshots(path):
+        ranks = {}
+        for cc, arr in orders.items():
+            if countries and cc not in countries:
+                continue
+            try:
+                ranks[cc] = arr.index(appid) + 1
+            except ValueError:
+                ranks[cc] = None
+        rows.append((ts, ranks))
+    return rows
+
+def latest_top(cc, n=20, path=SNAPSHOT_FILE):
+    """최신 스냅샷에서 국가의 상위 n개 appid"""
+    latest = None
+    for ts, orders in iter_snapshots(path):
+        if cc in orders:
+            latest = (ts, list(orders[cc][:n]))
+    return latest
+
+
+def main(argv):
+    if len(argv) >= 3 and argv[1] == "rank":
+        countries = set(argv[3:]) or None
+        rows = rank_history(argv[2], countries)
+        for ts, ranks in rows:
+            cells = " ".join(f"{cc}:{r if r else '-'}" for cc, r in ranks.items())
+            print(f"{ts}  {cells}")
+        print(f"📊 {len(rows)}개 스냅샷")
+        return 0
+    if len(argv) >= 3 and argv[1] == "top":
+        found = latest_top(argv[2], int(argv[3]) if len(argv) > 3 else 20)
+        if not found:
+            print(f"⚠️  {argv[2]} 스냅샷 없음")
+            return 1
+        ts, appids = found
+        print(f"📅 {ts}")
+        for i, appid in enumerate(appids, 1):
+            print(f"  #{i:<3} {appid}")
+        return 0
+    print(f"사용법: python {os.path.basename(argv[0])} rank <appid> [cc ...] | top <cc> [n]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -3,7 +3,7 @@
 
 """
 Steam 국가별 Top Seller 순위 추적기 (29개국)
-- Steam 공식 API: search/results (Crimson Desert 발견 시 즉시 중단)
+- Steam 공식 API: search/results (감시 앱을 모두 찾으면 즉시 중단)
 - 디스코드: 텍스트 embed + 꺾은선 그래프 + 막대 그래프
 """
 
@@ -12,6 +12,7 @@ import json
 import os
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 
 import matplotlib
@@ -21,10 +22,28 @@ import matplotlib.dates
 import matplotlib.ticker as ticker
 import requests
 
+from steam_http import AdaptiveTokenBucket, steam_session, get_json
+from steam_snapshots import append_snapshot, SNAPSHOT_FILE
+from history_store import append_lines
+from steam_markets import TARGET_COUNTRIES, STEAM_WEIGHTS
+
 DISCORD_WEBHOOK = os.environ.get("DISCORD_WEBHOOK")
-STEAM_APP_IDS = {"3321460"}  # Crimson Desert
+STEAM_APP_ID = "3321460"  # Crimson Desert (results 의 rank)
+
+# 같은 페이지 순회에서 순위를 함께 기록할 앱 (경쟁작 등). WATCHLIST_FILE 에 실행당 1줄 append
+# 모두 찾거나 MAX_PAGES 에 닿으면 중단 (Crimson Desert 이후 추가 페이지는 WATCHLIST_MAX_PAGES 로 제한)
+# 환경변수로 추가 가능: STEAM_WATCHLIST="appid:이름,appid:이름"
+STEAM_WATCHLIST = {
+    STEAM_APP_ID: "Crimson Desert",
+    "582660":     "Black Desert",
+}
+for _item in filter(None, os.environ.get("STEAM_WATCHLIST", "").split(",")):
+    _appid, _, _name = _item.partition(":")
+    if _appid.strip().isdigit():
+        STEAM_WATCHLIST[_appid.strip()] = _name.strip() or _appid.strip()
 
 HISTORY_FILE  = "steam_topseller_history.json"
+WATCHLIST_FILE = "steam_watchlist_history.jsonl"  # {"timestamp", "ranks": {appid: {국가명: 순위}}}
 BASELINE_FILE = "steam_topseller_baseline.json"  # 마지막 알림 발송 시점 기준값
 WORKFLOW_FILE = ".github/workflows/steam_topseller_tracker.yml"  # 스케줄 소스
 KST = timezone(timedelta(hours=9))
@@ -97,41 +116,6 @@ def read_schedule_meta() -> dict:
         print(f"⚠️  스케줄 파싱 오류: {e}")
         return None
 
-TARGET_COUNTRIES = {
-    # 기존 (미주/유럽/아시아 핵심)
-    "us": "미국",
-    "gb": "영국",
-    "de": "독일",
-    "fr": "프랑스",
-    "ca": "캐나다",
-    "br": "브라질",
-    "jp": "일본",
-    "kr": "한국",
-    "cn": "중국",
-    "ru": "러시아",
-    "au": "호주",
-    "es": "스페인",
-    "it": "이탈리아",
-    "pl": "폴란드",
-    "tr": "터키",
-    # 유럽 추가
-    "nl": "네덜란드",
-    "se": "스웨덴",
-    "no": "노르웨이",
-    "dk": "덴마크",
-    "fi": "핀란드",
-    "at": "오스트리아",
-    "ch": "스위스",
-    "cz": "체코",
-    "sg": "싱가포르",
-    # 공식 차트 지원국 추가
-    "be": "벨기에",
-    "hk": "홍콩",
-    "nz": "뉴질랜드",
-    "tw": "대만",
-    "th": "태국",
-}
-
 COUNTRY_COLORS = {
     # 기존
     "US": "#4A90D9",
@@ -166,40 +150,6 @@ COUNTRY_COLORS = {
     "TH": "#A51931",
 }
 
-# Steam 시장 가중치 (index.html의 STS_W 와 동기화)
-STEAM_WEIGHTS = {
-    # 기존
-    "us":  30.0,
-    "gb":  5.0,
-    "de":  5.5,
-    "fr":  4.0,
-    "ca":  3.5,
-    "br":  4.5,
-    "jp":  3.5,
-    "kr":  4.2,
-    "cn":  28.0,
-    "ru":  6.0,
-    "au":  2.5,
-    "es":  2.0,
-    "it":  1.8,
-    "pl":  2.0,
-    "tr":  2.0,
-    # 신규
-    "nl":  0.8,
-    "se":  0.7,
-    "no":  0.5,
-    "dk":  0.5,
-    "fi":  0.4,
-    "at":  0.6,
-    "ch":  0.7,
-    "cz":  0.4,
-    "sg":  0.5,
-    "be":  0.8,
-    "hk":  0.7,
-    "nz":  0.4,
-    "tw":  0.8,
-    "th":  0.8,
-}
 
 def calc_weighted_avg(results):
     """추적국 가중평균 순위 계산 (STEAM_WEIGHTS 기준, 미진입 국가 제외 후 정규화)"""
@@ -222,61 +172,45 @@ RETRY_DELAYS = {
 }
 DEFAULT_RETRY_DELAYS = [5, 15, 30]
 
-COUNTRY_SLEEP = {
-    "cn": 5,
-    "ru": 5,
-}
-DEFAULT_COUNTRY_SLEEP = 1.5
+# 국가 병렬 수집 (페이지 간격은 steam_http 의 공유 토큰 버킷이 조절)
+FETCH_WORKERS = max(1, int(os.getenv("STEAM_FETCH_WORKERS", "4")))
+MAX_PAGES     = 10
+# Crimson Desert 를 찾은 뒤 나머지 감시 앱 때문에 더 넘기는 페이지 상한 (기본 MAX_PAGES = 제한 없음)
+WATCHLIST_MAX_PAGES = min(MAX_PAGES, max(1, int(os.getenv("STEAM_WATCHLIST_MAX_PAGES", str(MAX_PAGES)))))
+SEARCH_URL    = "https://store.steampowered.com/search/results/"
+
+# 1 이면 감시 앱을 다 찾아도 MAX_PAGES 까지 돌고, 국가별 전체 appid 순서를
+# steam_topseller_snapshots.jsonl 에 저장 (steam_snapshots.py 로 임의 앱 순위 추이 조회)
+SNAPSHOT_ENABLED = os.environ.get("STEAM_SNAPSHOT", "0") == "1"
 
 STORE_LINKS = {
     cc: f"https://store.steampowered.com/charts/topselling/{cc.upper()}"
     for cc in TARGET_COUNTRIES
 }
 
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-    "Accept": "application/json",
-    "Accept-Language": "en-US,en;q=0.9",
-}
-
 # ======================
 # Steam API 호출
 # ======================
-def fetch_page(cc, page, retry_delays):
-    url = "https://store.steampowered.com/search/results/"
+def fetch_page(session, limiter, cc, page, retry_delays):
     params = {"filter": "topsellers", "cc": cc, "l": "en", "json": 1, "page": page}
+    return get_json(session, SEARCH_URL, params, limiter, f"{cc} p{page}", retry_delays)
 
-    for attempt, delay in enumerate([0] + retry_delays):
-        if delay > 0:
-            print(f"  ⏳ {cc} p{page} {delay}초 후 재시도 ({attempt}/{len(retry_delays)})...")
-            time.sleep(delay)
-        try:
-            r = requests.get(url, params=params, headers=HEADERS, timeout=20)
-            if r.status_code == 200:
-                return r.json()
-            elif r.status_code == 429:
-                print(f"  ⚠️ {cc} p{page} 429 Rate Limited")
-                if attempt == len(retry_delays):
-                    print(f"  ❌ {cc} p{page} 재시도 초과, 포기")
-                    return None
-                continue
-            else:
-                print(f"  ⚠️ {cc} p{page} 응답 실패: {r.status_code}")
-                return None
-        except Exception as e:
-            print(f"  ❌ {cc} p{page} 오류: {e}")
-            return None
-    return None
-
-def get_top_sellers(cc):
+def get_top_sellers(session, limiter, cc):
+    """
+    국가 1개 페이지 순회. STEAM_WATCHLIST 의 앱을 모두 찾으면 즉시 중단 (없으면 MAX_PAGES 까지).
+    Crimson Desert 를 찾은 뒤에는 WATCHLIST_MAX_PAGES 페이지까지만 나머지 앱을 찾음.
+    SNAPSHOT_ENABLED 면 중단하지 않고 끝까지 순회.
+    반환: {"rank": Crimson Desert 순위, "watch": {appid: 순위 또는 None}, "order": [appid 순서]}
+    """
     retry_delays = RETRY_DELAYS.get(cc, DEFAULT_RETRY_DELAYS)
-    rank = None
+    watch = {appid: None for appid in STEAM_WATCHLIST}
     seen = set()
+    order = []
     real_rank = 0
-    found = False
+    remaining = len(watch)
 
-    for page in range(1, 11):
-        data = fetch_page(cc, page, retry_delays)
+    for page in range(1, MAX_PAGES + 1):
+        data = fetch_page(session, limiter, cc, page, retry_delays)
         if data is None:
             break
         items = data.get("items", [])
@@ -290,21 +224,65 @@ def get_top_sellers(cc):
             if not appid or appid in seen:
                 continue
             seen.add(appid)
+            order.append(int(appid))
             real_rank += 1
-            if appid in STEAM_APP_IDS:
-                rank = real_rank
-                found = True
+            if appid in watch and watch[appid] is None:
+                watch[appid] = real_rank
+                remaining -= 1
 
-        if found:
+        if SNAPSHOT_ENABLED:
+            continue
+        if remaining == 0:
+            break
+        if watch[STEAM_APP_ID] is not None and page >= WATCHLIST_MAX_PAGES:
             break
-        time.sleep(1.0)
 
     if real_rank == 0:
         print(f"  ⚠️ {cc} 데이터 없음")
         return None
 
-    print(f"  ✅ {cc}: 총 {real_rank}개 파싱, Crimson Desert {'#' + str(rank) if rank else '순위권 밖'}")
-    return {"rank": rank}
+    rank = watch[STEAM_APP_ID]
+    others = ", ".join(f"{STEAM_WATCHLIST[a]} #{r}" for a, r in watch.items() if a != STEAM_APP_ID and r)
+    print(f"  ✅ {cc}: 총 {real_rank}개 파싱, Crimson Desert {'#' + str(rank) if rank else '순위권 밖'}"
+          + (f" | {others}" if others else ""))
+    return {"rank": rank, "watch": watch, "order": order}
+
+def collect_all(countries, workers=FETCH_WORKERS):
+    """
+    국가들을 스레드 풀로 병렬 수집. 세션 1개와 토큰 버킷 1개를 모든 스레드가 공유.
+    반환: ({국가명: {"rank"}}, {appid: {국가명: 순위 또는 None}}, {국가코드: [appid 순서]})
+          (countries 순서 유지, 실패 국가 제외)
+    """
+    session = steam_session(pool_size=workers)
+    limiter = AdaptiveTokenBucket()
+    start = time.time()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {cc: pool.submit(get_top_sellers, session, limiter, cc) for cc in countries}
+
+    results = {}
+    watchlist = {appid: {} for appid in STEAM_WATCHLIST}
+    orders = {}
+    for cc, future in futures.items():
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"  ❌ {cc} 수집 오류: {e}")
+            result = None
+        if result:
+            name = countries[cc]
+            results[name] = {"rank": result["rank"]}
+            for appid, rank in result["watch"].items():
+                watchlist[appid][name] = rank
+            orders[cc] = result["order"]
+
+    print(f"\n⏱️ {len(results)}/{len(countries)}개국 수집, {time.time() - start:.1f}초 "
+          f"(workers={workers}, 429 {limiter.throttled}회, 최종 속도 {limiter.rate:.2f}/s)")
+    for appid, ranks in watchlist.items():
+        ranked = [r for r in ranks.values() if r]
+        best = f", 최고 #{min(ranked)}" if ranked else ""
+        print(f"  👀 {STEAM_WATCHLIST[appid]} ({appid}): {len(ranked)}/{len(ranks)}개국 순위권{best}")
+    return results, watchlist, orders
 
 # ======================
 # 히스토리 관리
@@ -352,6 +330,19 @@ def save_history(history, schedule_meta=None):
     with open(HISTORY_FILE, "w", encoding="utf-8") as f:
         json.dump(payload, f, indent=2, ensure_ascii=False)
 
+def save_watchlist(timestamp, watchlist):
+    """
+    워치리스트 앱 순위를 WATCHLIST_FILE 에 1줄 append (대시보드가 읽는 히스토리와 분리).
+    순위를 찾은 국가만 저장 — 조기 중단으로 못 본 페이지의 '순위권 밖' 과 구분되지 않기 때문
+    """
+    ranks = {appid: {name: r for name, r in by_country.items() if r}
+             for appid, by_country in watchlist.items() if appid != STEAM_APP_ID}
+    ranks = {appid: by_country for appid, by_country in ranks.items() if by_country}
+    if not ranks:
+        return
+    append_lines(WATCHLIST_FILE, [{"timestamp": timestamp, "ranks": ranks}])
+    print(f"👀 워치리스트 순위 저장: {WATCHLIST_FILE} ({len(ranks)}개 앱)")
+
 # ======================
 # 그래프 생성
 # ======================
@@ -678,22 +669,17 @@ def main():
 
     now_kst = datetime.now(KST)
     timestamp = now_kst.isoformat()
-    results = {}
-
-    for cc, name in TARGET_COUNTRIES.items():
-        print(f"\n🔍 {name} ({cc}) 수집 중...")
-        result = get_top_sellers(cc)
-        if result:
-            results[name] = result
-
-        sleep_sec = COUNTRY_SLEEP.get(cc, DEFAULT_COUNTRY_SLEEP)
-        print(f"  💤 다음 국가까지 {sleep_sec}초 대기...")
-        time.sleep(sleep_sec)
+    print(f"\n🔍 {len(TARGET_COUNTRIES)}개국 수집 중 (병렬 {FETCH_WORKERS})...")
+    results, watchlist, orders = collect_all(TARGET_COUNTRIES)
 
     if not results:
         print("❌ 수집 실패")
         return
 
+    if SNAPSHOT_ENABLED:
+        append_snapshot(timestamp, orders)
+        print(f"📸 전체 순위 스냅샷 저장: {SNAPSHOT_FILE} ({sum(map(len, orders.values()))}개 appid)")
+
     # 히스토리 저장 (이전 레코드 먼저 가져오기)
     history = load_history()
     # 이전 레코드 추출 — 국가 수 무관하게 가장 최근 유효 레코드 사용
@@ -707,6 +693,7 @@ def main():
     history.append({"timestamp": timestamp, "results": results})
     save_history(history, schedule_meta)
     print(f"\n✅ 히스토리 저장 완료 (총 {len(history)}개)")
+    save_watchlist(timestamp, watchlist)
 
     # 가중평균 계산 + 변동량
     wavg = calc_weighted_avg(results)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+plot_rankings 판매량 추산 회귀 테스트
+벡터화 경로(rank_to_daily_sales_np / compute_daily_sales / np.cumsum)가
+벡터화 이전의 행 단위 계산과 같은 값을 내는지, 커밋된 rank_history.json 으로 확인.
+
+  python -m pytest tests/test_plot_rankings.py
+"""
+
+import copy
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import plot_rankings as pr  # noqa: E402
+
+DATA_FILE = ROOT / "rank_history.json"
+
+
+# =============================================================================
+# 기준 구현 (벡터화 이전 코드)
+# =============================================================================
+
+def reference_daily_sales(data):
+    """
+    벡터화 이전의 행 단위 판매량 추산 (compute_daily_sales 회귀 비교용 기준 구현).
+    히스토리를 deepcopy 해 historical 항목과 합치고, 일자×국가 중첩 루프로 최고 순위를 찾음
+    """
+    sales_data = copy.deepcopy(data)
+    for e in sales_data:
+        e['is_historical'] = False
+
+    historical_file = 'historical_ranking_data.json'
+    if os.path.exists(historical_file):
+        with open(historical_file, 'r', encoding='utf-8') as f:
+            historical_data = json.load(f)
+
+        std_ranks, dlx_ranks = [], []
+        for entry in data:
+            for country, ranks in entry['raw_results'].items():
+                if ranks['standard'] is not None:
+                    std_ranks.append(ranks['standard'])
+                if ranks['deluxe'] is not None:
+                    dlx_ranks.append(ranks['deluxe'])
+        avg_std = sum(std_ranks) / len(std_ranks) if std_ranks else 15
+        avg_dlx = sum(dlx_ranks) / len(dlx_ranks) if dlx_ranks else 8
+        rank_gap = avg_std - avg_dlx
+
+        countries = list(data[0]['raw_results'].keys()) if data else ['미국', '일본', '영국', '독일', '프랑스', '한국']
+        historical_entries = []
+        for item in historical_data:
+            country_ranks = item.get('country_ranks', {})
+            wa_num, wa_den = 0.0, 0.0
+            for c, v in country_ranks.items():
+                if v is not None:
+                    m = pr.get_multiplier(c)
+                    wa_num += v * m
+                    wa_den += m
+            weighted_avg_rank = wa_num / wa_den if wa_den > 0 else item.get('average_rank', 15)
+
+            raw_results = {}
+            for country in countries:
+                if country in country_ranks and country_ranks[country] is not None:
+                    base = country_ranks[country]
+                else:
+                    base = weighted_avg_rank
+                raw_results[country] = {'standard': max(1, int(base + rank_gap / 2)),
+                                        'deluxe':   max(1, int(base - rank_gap / 2))}
+            historical_entries.append({'timestamp': f"{item['date']}T08:00:00",
+                                       'raw_results': raw_results, 'is_historical': True})
+        sales_data = historical_entries + sales_data
+
+    date_groups: dict = {}
+    for entry in sales_data:
+        timestamp = pr.parse_dt(entry['timestamp'])
+        date_groups.setdefault(timestamp.strftime('%Y-%m-%d'), []).append({
+            'timestamp': timestamp, 'raw_results': entry['raw_results'],
+            'is_historical': entry.get('is_historical', False)})
+
+    daily_sales = []
+    for date_str in sorted(date_groups.keys()):
+        entries = date_groups[date_str]
+        all_countries = set()
+        for e in entries:
+            all_countries.update(e['raw_results'].keys())
+
+        std_sales = dlx_sales = 0.0
+        for country in all_countries:
+            best_std, best_dlx = None, None
+            for e in entries:
+                if country in e['raw_results']:
+                    s = e['raw_results'][country]['standard']
+                    d = e['raw_results'][country]['deluxe']
+                    if s is not None and (best_std is None or s < best_std):
+                        best_std = s
+                    if d is not None and (best_dlx is None or d < best_dlx):
+                        best_dlx = d
+            m = pr.get_multiplier(country)
+            if best_std is not None:
+                std_sales += pr.rank_to_daily_sales(best_std) * m
+            if best_dlx is not None:
+                dlx_sales += pr.rank_to_daily_sales(best_dlx) * m
+
+        daily_sales.append({
+            'date':          entries[0]['timestamp'],
+            'date_str':      date_str,
+            'standard':      round(std_sales, 2),
+            'deluxe':        round(dlx_sales, 2),
+            'total':         round(std_sales + dlx_sales, 2),
+            'is_historical': all(e['is_historical'] for e in entries)
+        })
+    return daily_sales
+
+
+# =============================================================================
+# 테스트
+# =============================================================================
+
+@pytest.fixture
+def history(monkeypatch):
+    """커밋된 히스토리. compute_daily_sales 가 historical_ranking_data.json 을 cwd 에서 읽으므로 루트로 이동"""
+    if not DATA_FILE.exists():
+        pytest.skip("rank_history.json 없음")
+    monkeypatch.chdir(ROOT)
+    return pr.load_data(str(DATA_FILE))
+
+
+def test_rank_to_daily_sales_np_matches_scalar():
+    ranks = [None, 1, 2, 19, 20, 21, 57, 100, 150, 300]
+    expected = [pr.rank_to_daily_sales(r) for r in ranks]
+    got = pr.rank_to_daily_sales_np([np.nan if r is None else r for r in ranks]).tolist()
+    assert np.allclose(got, expected, rtol=1e-12, atol=0)
+
+
+def test_compute_daily_sales_matches_reference(history):
+    state = pr.empty_plot_state()
+    pr.update_plot_state(state, history)
+    new = pr.compute_daily_sales(state)
+    old = reference_daily_sales(history)
+
+    assert len(new) == len(old)
+    keys = ("date", "date_str", "standard", "deluxe", "total", "is_historical")
+    for a, b in zip(new, old):
+        assert {k: a[k] for k in keys} == {k: b[k] for k in keys}, b["date_str"]
+
+
+@pytest.mark.parametrize("key", ["standard", "deluxe", "total"])
+def test_cumsum_matches_running_sum(history, key):
+    values = [it[key] for it in reference_daily_sales(history)]
+    slow = [sum(values[:i + 1]) for i in range(len(values))]
+    assert np.allclose(np.cumsum(values), slow, rtol=1e-9, atol=1e-6)
@@ -7,6 +7,7 @@ import time
 import requests
 from datetime import datetime
 from io import BytesIO
+from history_store import History
 
 try:
     from pytrends.request import TrendReq
@@ -40,6 +41,8 @@ CONSOLE_MARKETS = {
     'France': 'FR'
 }
 
+HISTORY_FILE = "trends_history.json"
+
 # =============================================================================
 # 함수들
 # =============================================================================
@@ -209,22 +212,23 @@ def get_console_markets_trends():
     return results
 
 
+_history = None
+
+def get_history():
+    """프로세스당 한 번만 로드하는 히스토리 핸들 (저장·그래프·알림 단계 공유)"""
+    global _history
+    if _history is None:
+        _history = History(HISTORY_FILE)
+    return _history
+
+
 def load_history():
-    """기존 히스토리 로드"""
-    history_file = "trends_history.json"
-    if os.path.exists(history_file):
-        try:
-            with open(history_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return []
-    return []
+    """히스토리 레코드 리스트 (이번 실행에서 추가한 레코드 포함)"""
+    return get_history().records
 
 
 def save_history(google_data, console_data):
-    """히스토리 저장"""
-    history = load_history()
-    
+    """이번 실행 결과를 히스토리에 추가 (파일 저장은 main 끝에서 flush 로 한 번)"""
     # Google 데이터
     google_entry = None
     if google_data:
@@ -245,12 +249,7 @@ def save_history(google_data, console_data):
         "console_markets": console_entry
     }
     
-    history.append(entry)
-
-    with open("trends_history.json", "w", encoding="utf-8") as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
-    
-    print("✅ trends_history.json 저장 완료")
+    get_history().append(entry)
 
 
 def create_trends_graph():
@@ -386,8 +385,7 @@ def send_discord(google_data, console_data):
         print("⚠️ DISCORD_WEBHOOK 환경변수 없음")
         return
     
-    history = load_history()
-    prev_data = history[-1] if history else {}
+    prev_data = get_history().previous or {}
     
     # Discord 메시지 구성
     lines = []
@@ -396,7 +394,7 @@ def send_discord(google_data, console_data):
     if google_data:
         g_score = google_data['score']
         g_avg = google_data['avg_7d']
-        prev_g_score = prev_data.get('google', {}).get('score')
+        prev_g_score = (prev_data.get('google') or {}).get('score')
         g_diff = format_diff(g_score, prev_g_score)
         
         lines.append(f"**🔍 Google 검색 (글로벌, 최근 3개월)**")
@@ -409,7 +407,7 @@ def send_discord(google_data, console_data):
     if console_data:
         lines.append(f"\n**🎮 콘솔게임 주요 5개국 (최근 1개월)**")
         
-        prev_console = prev_data.get('console_markets', {})
+        prev_console = prev_data.get('console_markets') or {}
         
         success_count = sum(1 for d in console_data.values() if d)
         lines.append(f"_수집 성공: {success_count}/5개국_\n")
@@ -526,11 +524,17 @@ def main():
             else:
                 print(f"  • {country}: 수집 실패")
     
-    # 히스토리 저장
-    save_history(google_data, console_data)
-    
-    # Discord 전송 (비활성화)
-    # send_discord(google_data, console_data)
+    history = get_history()
+    try:
+        # 히스토리 추가
+        save_history(google_data, console_data)
+        
+        # Discord 전송 (비활성화)
+        # send_discord(google_data, console_data)
+    finally:
+        # 히스토리는 한 번만 저장
+        if history.flush():
+            print(f"✅ {history.path} 저장 완료")
 
 
 if __name__ == "__main__":
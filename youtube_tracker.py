@@ -6,6 +6,7 @@ import json
 import requests
 from datetime import datetime
 from io import BytesIO
+from history_store import History
 
 try:
     import matplotlib
@@ -38,6 +39,18 @@ VIDEO_IDS = {
     "Trailer - IGN": "M8GCqJMulr8",
 }
 
+# YouTube Data API (videos.list 는 id 를 최대 50개까지 한 번에 조회 가능)
+YOUTUBE_API_URL = "https://www.googleapis.com/youtube/v3/videos"
+API_BATCH_SIZE = 50
+API_TIMEOUT = 15
+
+# 히스토리 파일. youtube_history.delta.jsonl 이 있으면 델타 모드
+# (python history_store.py delta youtube_history.json 으로 전환)
+HISTORY_FILE = "youtube_history.json"
+
+# ETag 캐시: 응답이 그대로면 304 → 이전 결과 재사용 (워크플로에서 히스토리와 함께 커밋)
+ETAG_CACHE_FILE = "youtube_etag_cache.json"
+
 # 그래프에 표시할 영상 그룹
 TRAILER_VIDEOS = [
     "Trailer - PS",
@@ -49,70 +62,128 @@ TRAILER_VIDEOS = [
 # 함수들
 # =============================================================================
 
-def get_video_stats(video_id):
-    """YouTube API로 조회수, 좋아요 수 가져오기"""
+_session = None
+
+def get_session():
+    """실행 동안 재사용하는 requests.Session (커넥션 풀)"""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+def load_etag_cache():
+    if os.path.exists(ETAG_CACHE_FILE):
+        try:
+            with open(ETAG_CACHE_FILE, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            if isinstance(cache, dict):
+                return cache
+        except (OSError, ValueError):
+            pass
+    return {}
+
+def save_etag_cache(cache):
+    with open(ETAG_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+
+def parse_video_item(item):
+    stats = item["statistics"]
+    snippet = item["snippet"]
+    return {
+        "title": snippet["title"],
+        "views": int(stats.get("viewCount", 0)),
+        "likes": int(stats.get("likeCount", 0)),
+        "comments": int(stats.get("commentCount", 0))
+    }
+
+def get_videos_stats(video_ids):
+    """
+    YouTube API로 여러 영상의 조회수, 좋아요 수를 한 번에 가져오기.
+    API_BATCH_SIZE 개씩 묶어 요청하고, 배치별 ETag 를 If-None-Match 로 보내
+    304(변경 없음)이면 캐시된 결과를 그대로 사용.
+    반환: {video_id: stats 또는 None}
+    """
     if not YOUTUBE_API_KEY:
         print("⚠️  YOUTUBE_API_KEY 환경변수 없음")
-        return None
-    
-    url = "https://www.googleapis.com/youtube/v3/videos"
-    params = {
-        "part": "statistics,snippet",
-        "id": video_id,
-        "key": YOUTUBE_API_KEY
-    }
-    
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        
-        if not data.get("items"):
-            print(f"⚠️  영상을 찾을 수 없음: {video_id}")
-            return None
-        
-        item = data["items"][0]
-        stats = item["statistics"]
-        snippet = item["snippet"]
-        
-        return {
-            "title": snippet["title"],
-            "views": int(stats.get("viewCount", 0)),
-            "likes": int(stats.get("likeCount", 0)),
-            "comments": int(stats.get("commentCount", 0))
+        return {vid: None for vid in video_ids}
+
+    session = get_session()
+    cache = load_etag_cache()
+    cache_dirty = False
+    results = {}
+
+    unique_ids = list(dict.fromkeys(video_ids))
+    for i in range(0, len(unique_ids), API_BATCH_SIZE):
+        batch = unique_ids[i:i + API_BATCH_SIZE]
+        key = ",".join(batch)
+        cached = cache.get(key)
+
+        params = {
+            "part": "statistics,snippet",
+            "id": key,
+            "key": YOUTUBE_API_KEY
         }
-    except Exception as e:
-        print(f"❌ YouTube API 오류: {e}")
-        return None
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
 
-def load_history():
-    """기존 히스토리 데이터 로드"""
-    history_file = "youtube_history.json"
-    if os.path.exists(history_file):
         try:
-            with open(history_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return []
-    return []
+            response = session.get(YOUTUBE_API_URL, params=params, headers=headers, timeout=API_TIMEOUT)
+            if response.status_code == 304 and cached:
+                print(f"  ♻️  변경 없음 (304) - 캐시 사용 ({len(batch)}개)")
+                items = cached.get("items", {})
+            else:
+                response.raise_for_status()
+                data = response.json()
+                items = {item["id"]: parse_video_item(item) for item in data.get("items", [])}
+                etag = response.headers.get("ETag") or data.get("etag")
+                if etag:
+                    cache[key] = {"etag": etag, "items": items}
+                    cache_dirty = True
+        except Exception as e:
+            print(f"❌ YouTube API 오류: {e}")
+            items = {}
+
+        for vid in batch:
+            stats = items.get(vid)
+            if stats is None:
+                print(f"⚠️  영상을 찾을 수 없음: {vid}")
+            results[vid] = stats
+
+    if cache_dirty:
+        # 현재 VIDEO_IDS 구성에 해당하지 않는 오래된 배치는 정리
+        batch_keys = {",".join(unique_ids[i:i + API_BATCH_SIZE])
+                      for i in range(0, len(unique_ids), API_BATCH_SIZE)}
+        save_etag_cache({k: v for k, v in cache.items() if k in batch_keys})
+
+    return results
+
+def get_video_stats(video_id):
+    """YouTube API로 조회수, 좋아요 수 가져오기 (영상 1개)"""
+    return get_videos_stats([video_id]).get(video_id)
+
+_history = None
+
+def get_history():
+    """프로세스당 한 번만 로드하는 히스토리 핸들 (저장·그래프·알림 단계 공유)"""
+    global _history
+    if _history is None:
+        _history = History(HISTORY_FILE)
+    return _history
+
+def load_history():
+    """히스토리 레코드 리스트 (이번 실행에서 추가한 레코드 포함)"""
+    return get_history().records
 
 def save_history(stats_all):
-    """히스토리 저장"""
-    history = load_history()
-    
+    """이번 실행 결과를 히스토리에 추가 (파일 저장은 main 끝에서 flush 로 한 번)"""
     entry = {
         "timestamp": datetime.now().isoformat(),
         "videos": stats_all
     }
     
-    history.append(entry)
-    
     # 모든 히스토리 유지 (제한 없음)
-    
-    with open("youtube_history.json", "w", encoding="utf-8") as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
-    
-    print("✅ youtube_history.json 저장 완료")
+    get_history().append(entry)
 
 def create_views_graph():
     """조회수 변화 그래프 생성 (Trailer)"""
@@ -244,7 +315,7 @@ def format_diff(current, previous):
 
 def check_milestones(stats_all):
     """전체 트레일러 합산 조회수가 마일스톤을 새로 넘었는지 확인"""
-    history = load_history()
+    previous = get_history().previous
     
     # 현재 합산 조회수
     current_total = sum(
@@ -254,8 +325,8 @@ def check_milestones(stats_all):
     
     # 이전 합산 조회수
     prev_total = 0
-    if history:
-        prev_videos = history[-1].get('videos', {})
+    if previous:
+        prev_videos = previous.get('videos', {})
         prev_total = sum(
             v.get('views', 0) for name, v in prev_videos.items()
             if v and name.startswith("Trailer")
@@ -284,8 +355,8 @@ def send_discord(stats_all):
     # 마일스톤 체크
     crossed_milestones, current_total = check_milestones(stats_all)
     
-    history = load_history()
-    prev_data = history[-1]['videos'] if history else {}
+    previous = get_history().previous
+    prev_data = previous['videos'] if previous else {}
     
     # 영상별 통계 라인 생성
     lines = []
@@ -308,7 +379,7 @@ def send_discord(stats_all):
         total_likes += likes
         
         # 이전 데이터와 비교
-        prev_stats = prev_data.get(name, {})
+        prev_stats = prev_data.get(name) or {}
         prev_views = prev_stats.get('views')
         prev_likes = prev_stats.get('likes')
         
@@ -381,9 +452,12 @@ def main():
     
     stats_all = {}
     
+    print(f"\n📡 {len(VIDEO_IDS)}개 영상 조회 중...")
+    stats_by_id = get_videos_stats(list(VIDEO_IDS.values()))
+    
     for name, video_id in VIDEO_IDS.items():
-        print(f"\n[{name}] 조회 중...")
-        stats = get_video_stats(video_id)
+        print(f"\n[{name}]")
+        stats = stats_by_id.get(video_id)
         
         if stats:
             print(f"  ✅ 조회수: {stats['views']:,}")
@@ -408,11 +482,17 @@ def main():
     print(f"  조회수: {trailer_views:,}")
     print(f"  좋아요: {trailer_likes:,}")
     
-    # 히스토리 저장
-    save_history(stats_all)
-    
-    # Discord 전송
-    send_discord(stats_all)
+    history = get_history()
+    try:
+        # 히스토리 추가
+        save_history(stats_all)
+        
+        # Discord 전송
+        send_discord(stats_all)
+    finally:
+        # 히스토리는 한 번만 저장
+        if history.flush():
+            print(f"✅ {history.path} 저장 완료")
 
 if __name__ == "__main__":
     main()